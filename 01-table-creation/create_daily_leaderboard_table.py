@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.dynamodb_helper import get_dynamodb_resource
+from utils.daily_leaderboard import LEADERBOARD_TABLE_NAME
+
+def create_daily_leaderboard_table():
+    """Create the DailyLeaderboard table holding one top-K item per day and game mode."""
+    
+    dynamodb = get_dynamodb_resource()
+    
+    # Check if table already exists
+    existing_tables = [table.name for table in dynamodb.tables.all()]
+    if LEADERBOARD_TABLE_NAME in existing_tables:
+        print(f"{LEADERBOARD_TABLE_NAME} table already exists.")
+        return dynamodb.Table(LEADERBOARD_TABLE_NAME)
+    
+    # Create table
+    table = dynamodb.create_table(
+        TableName=LEADERBOARD_TABLE_NAME,
+        KeySchema=[
+            {
+                'AttributeName': 'leaderboard_id',
+                'KeyType': 'HASH'  # Partition key: <game_date>#<game_mode>
+            }
+        ],
+        AttributeDefinitions=[
+            {
+                'AttributeName': 'leaderboard_id',
+                'AttributeType': 'S'
+            }
+        ],
+        ProvisionedThroughput={
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    )
+    
+    # Wait until the table exists
+    table.meta.client.get_waiter('table_exists').wait(TableName=LEADERBOARD_TABLE_NAME)
+    print(f"{LEADERBOARD_TABLE_NAME} table created successfully!")
+    return table
+
+if __name__ == '__main__':
+    create_daily_leaderboard_table()
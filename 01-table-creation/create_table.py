@@ -2,6 +2,43 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import get_game_date_shard_count, SHARDED_INDEX_NAME, SHARD_ATTRIBUTE
+from utils.expiration_index import (
+    get_expiry_bucket_seconds, expiration_index_definition, expiration_index_attribute_definitions, EXPIRATION_INDEX_NAME
+)
+
+def game_date_index_definition(shard_count):
+    """Return the GSI used for date-based leaderboards.
+
+    With sharding enabled, the GSI is keyed on `game_date#shard` instead of
+    `game_date` so a single day's writes spread over `shard_count` partitions.
+    """
+    
+    if shard_count:
+        index_name, hash_key = SHARDED_INDEX_NAME, SHARD_ATTRIBUTE
+    else:
+        index_name, hash_key = 'GameDateIndex', 'game_date'
+    
+    return {
+        'IndexName': index_name,
+        'KeySchema': [
+            {
+                'AttributeName': hash_key,
+                'KeyType': 'HASH'
+            },
+            {
+                'AttributeName': 'score',
+                'KeyType': 'RANGE'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'ALL'
+        },
+        'ProvisionedThroughput': {
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    }
 
 def create_game_leaderboard_table():
     dynamodb = get_dynamodb_resource()
@@ -12,6 +49,17 @@ def create_game_leaderboard_table():
         print("Table already exists.")
         return
     
+    shard_count = get_game_date_shard_count()
+    if shard_count:
+        print(f"Creating {SHARDED_INDEX_NAME} with {shard_count} shards per game_date")
+    
+    global_indexes = [game_date_index_definition(shard_count)]
+    extra_attributes = []
+    if get_expiry_bucket_seconds():
+        print(f"Creating sparse {EXPIRATION_INDEX_NAME} on expiring items")
+        global_indexes.append(expiration_index_definition())
+        extra_attributes = expiration_index_attribute_definitions()
+    
     table = dynamodb.create_table(
         TableName='GameLeaderboard',
         KeySchema=[
@@ -38,10 +86,10 @@ def create_game_leaderboard_table():
                 'AttributeType': 'N'
             },
             {
-                'AttributeName': 'game_date',
+                'AttributeName': SHARD_ATTRIBUTE if shard_count else 'game_date',
                 'AttributeType': 'S'
             }
-        ],
+        ] + extra_attributes,
         LocalSecondaryIndexes=[
             {
                 'IndexName': 'ScoreIndex',
@@ -60,28 +108,7 @@ def create_game_leaderboard_table():
                 }
             }
         ],
-        GlobalSecondaryIndexes=[
-            {
-                'IndexName': 'GameDateIndex',
-                'KeySchema': [
-                    {
-                        'AttributeName': 'game_date',
-                        'KeyType': 'HASH'
-                    },
-                    {
-                        'AttributeName': 'score',
-                        'KeyType': 'RANGE'
-                    }
-                ],
-                'Projection': {
-                    'ProjectionType': 'ALL'
-                },
-                'ProvisionedThroughput': {
-                    'ReadCapacityUnits': 5,
-                    'WriteCapacityUnits': 5
-                }
-            }
-        ],
+        GlobalSecondaryIndexes=global_indexes,
         ProvisionedThroughput={
             'ReadCapacityUnits': 20,
             'WriteCapacityUnits': 20
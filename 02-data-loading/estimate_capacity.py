@@ -0,0 +1,166 @@
+import sys
+import os
+import json
+import math
+import argparse
+from collections import defaultdict
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.capacity_units import TableCapacityModel, item_size, attribute_value_size
+from utils.game_date_shards import add_game_date_shard, get_game_date_shard_count, SHARDED_INDEX_NAME, SHARD_ATTRIBUTE
+from utils.expiration_index import add_expiry_bucket, get_expiry_bucket_seconds, expiration_index_definition
+from utils.autoscaling_simulator import demand_from_profile
+
+# Limits used by the load profiles' query and scan operations (utils/load_profiles.py)
+QUERY_LIMIT = 10
+SCAN_LIMIT = 50
+
+def key_element(name, key_type):
+    return {'AttributeName': name, 'KeyType': key_type}
+
+def game_leaderboard_description(shard_count, expiration_index=False):
+    """Keys and indexes of GameLeaderboard as created in Lab 1, without calling describe_table."""
+    date_index, date_key = (SHARDED_INDEX_NAME, SHARD_ATTRIBUTE) if shard_count else ('GameDateIndex', 'game_date')
+    description = {
+        'KeySchema': [key_element('player_id', 'HASH'), key_element('game_id', 'RANGE')],
+        'LocalSecondaryIndexes': [{
+            'IndexName': 'ScoreIndex',
+            'KeySchema': [key_element('player_id', 'HASH'), key_element('score', 'RANGE')],
+            'Projection': {'ProjectionType': 'ALL'}
+        }],
+        'GlobalSecondaryIndexes': [{
+            'IndexName': date_index,
+            'KeySchema': [key_element(date_key, 'HASH'), key_element('score', 'RANGE')],
+            'Projection': {'ProjectionType': 'ALL'}
+        }]
+    }
+    if expiration_index:
+        description['GlobalSecondaryIndexes'].append(expiration_index_definition())
+    return description
+
+def average(values):
+    values = list(values)
+    return sum(values) / len(values) if values else 0
+
+def print_item_sizes(items):
+    sizes = sorted(item_size(item) for item in items)
+    print(f"=== Item Sizes ({len(items)} items) ===")
+    print(f"Min: {sizes[0]} bytes  Average: {average(sizes):.1f} bytes  "
+          f"p99: {sizes[min(len(sizes) - 1, int(len(sizes) * 0.99))]} bytes  Max: {sizes[-1]} bytes")
+
+    # Where the bytes go: attribute names count as much as their values
+    attribute_bytes = defaultdict(list)
+    for item in items:
+        for name, value in item.items():
+            attribute_bytes[name].append((len(name.encode('utf-8')), attribute_value_size(value)))
+    print(f"\n{'Attribute':<18} {'Name bytes':>10} {'Avg value bytes':>16}")
+    for name, sizes in sorted(attribute_bytes.items(), key=lambda entry: -average(n + v for n, v in entry[1])):
+        print(f"{name:<18} {sizes[0][0]:>10} {average(v for _, v in sizes):>16.1f}")
+
+def estimate_operations(model, items, date_index):
+    """Average capacity units per call of each operation, over the sample items."""
+    by_player, by_date = defaultdict(list), defaultdict(list)
+    for item in items:
+        by_player[item['player_id']].append(item)
+        by_date[item['game_date']].append(item)
+
+    player_pages = [sorted(games, key=lambda g: g['game_id'])[:QUERY_LIMIT] for games in by_player.values()]
+    date_pages = [sorted(games, key=lambda g: -g['score'])[:QUERY_LIMIT] for games in by_date.values()]
+    scan_pages = [items[start:start + SCAN_LIMIT] for start in range(0, len(items), SCAN_LIMIT)]
+    updated = [(item, {**item, 'score': item['score'] + 100}) for item in items]
+
+    puts = [model.put_item(item) for item in items]
+    transactional_puts = [model.put_item(item, transactional=True) for item in items]
+    updates = [model.write(new, old) for old, new in updated]
+    deletes = [model.delete_item(item) for item in items]
+
+    def pools(estimates):
+        return {'table': average(e['table'] for e in estimates),
+                'index': average(e.get(date_index, 0) for e in estimates)}
+
+    return [
+        ('GetItem (eventually consistent)', average(model.get_item(item) for item in items), None),
+        ('GetItem (strongly consistent)', average(model.get_item(item, consistent=True) for item in items), None),
+        ('TransactGetItems (per item)', average(model.get_item(item, transactional=True) for item in items), None),
+        (f'Query player_id, Limit {QUERY_LIMIT}', average(model.query(page) for page in player_pages), None),
+        (f'Query {date_index}, Limit {QUERY_LIMIT}',
+         average(model.query(page, date_index) for page in date_pages), None),
+        (f'Scan page, Limit {SCAN_LIMIT}', average(model.scan(page) for page in scan_pages), None),
+        ('BatchGetItem (per item)', average(model.get_item(item) for item in items), None),
+        ('PutItem / BatchWriteItem (per item)', None, pools(puts)),
+        ('TransactWriteItems (per item)', None, pools(transactional_puts)),
+        ('UpdateItem score', None, pools(updates)),
+        ('DeleteItem', None, pools(deletes))
+    ]
+
+def print_operations(estimates, date_index):
+    print("\n=== Capacity Units per Operation ===")
+    print(f"{'Operation':<38} {'RCU':>6} {'WCU':>6} {date_index + ' WCU':>{max(10, len(date_index) + 4)}}")
+    for name, reads, writes in estimates:
+        if writes is None:
+            print(f"{name:<38} {reads:>6.2f}")
+        else:
+            print(f"{name:<38} {'':>6} {writes['table']:>6.2f} {writes['index']:>{max(10, len(date_index) + 4)}.2f}")
+    print("\nTable WCU include writes to the ScoreIndex local secondary index; "
+          f"{date_index} has its own write capacity.")
+    print("Changing score changes both indexes' sort key, so each of them pays for a delete and a put.")
+
+def forecast_profile(profile_name, estimates, target):
+    """Per-second capacity a load profile needs with the estimated units, and capacity to provision for it."""
+    from utils.load_profiles import load_profile
+    units = {name: reads for name, reads, _ in estimates if reads is not None}
+    writes = {name: writes for name, _, writes in estimates if writes is not None}
+    units_per_operation = {
+        'read': units['GetItem (eventually consistent)'],
+        'query': units[f'Query player_id, Limit {QUERY_LIMIT}'],
+        'scan': units[f'Scan page, Limit {SCAN_LIMIT}'],
+        'write': writes['PutItem / BatchWriteItem (per item)']['table']
+    }
+    index_units = {'read': 0, 'query': 0, 'scan': 0, 'write': writes['PutItem / BatchWriteItem (per item)']['index']}
+
+    profile = load_profile(profile_name)
+    reads, table_writes = demand_from_profile(profile, units_per_operation=units_per_operation)
+    _, index_writes = demand_from_profile(profile, units_per_operation=index_units)
+
+    print(f"\n=== Forecast for load profile '{profile.get('name', profile_name)}' ({len(reads)} s) ===")
+    print("Units per operation: " + ", ".join(f"{name} {value:.2f}" for name, value in units_per_operation.items()))
+    print(f"{'Capacity':<18} {'Average/s':>10} {'Peak/s':>8} {f'Provision at {target:.0f}%':>18}")
+    for name, demand in (('Table RCU', reads), ('Table WCU', table_writes), ('GSI WCU', index_writes)):
+        peak = max(demand) if demand else 0
+        print(f"{name:<18} {average(demand):>10.1f} {peak:>8.1f} {math.ceil(peak * 100 / target):>18}")
+
+def estimate_capacity(data_file, describe=False, profile=None, target=70):
+    """Estimate item sizes and capacity units for the sample game data, offline unless describe is set."""
+    with open(data_file, 'r') as f:
+        items = json.load(f)
+
+    # Size items as load_data.py writes them, with the shard and expiry bucket attributes when enabled
+    shard_count = get_game_date_shard_count()
+    bucket_seconds = get_expiry_bucket_seconds()
+    for item in items:
+        add_expiry_bucket(add_game_date_shard(item, shard_count), bucket_seconds)
+
+    if describe:
+        from utils.dynamodb_helper import get_dynamodb_client
+        description = get_dynamodb_client().describe_table(TableName='GameLeaderboard')['Table']
+    else:
+        description = game_leaderboard_description(shard_count, bool(bucket_seconds))
+    model = TableCapacityModel(description)
+    date_index = next((name for name, index in model.indexes.items() if index['global']), None)
+
+    print_item_sizes(items)
+    estimates = estimate_operations(model, items, date_index)
+    print_operations(estimates, date_index)
+    if profile:
+        forecast_profile(profile, estimates, target)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Predict item sizes and consumed capacity units without calling DynamoDB.")
+    parser.add_argument('--data', default=os.path.join(os.path.dirname(__file__), 'game_data.json'),
+                        help="JSON file of items (default: game_data.json)")
+    parser.add_argument('--describe', action='store_true',
+                        help="Read keys and indexes from the live table instead of the Lab 1 definition")
+    parser.add_argument('--profile', help="Forecast the capacity a load profile needs (file or name in load-profiles/)")
+    parser.add_argument('--target', type=float, default=70, help="Target utilization for the forecast (default: 70)")
+    args = parser.parse_args()
+
+    estimate_capacity(args.data, args.describe, args.profile, args.target)
@@ -5,6 +5,9 @@ import time
 from decimal import Decimal
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import add_game_date_shard, get_game_date_shard_count
+from utils.expiration_index import add_expiry_bucket, get_expiry_bucket_seconds
+from utils.daily_leaderboard import get_daily_leaderboard_aggregator
 
 def load_data_to_dynamodb(filename="game_data.json"):
     """Load game data from JSON file to DynamoDB table."""
@@ -14,10 +17,14 @@ def load_data_to_dynamodb(filename="game_data.json"):
         game_data = json.load(f)
     
     # Convert to DynamoDB format (Decimal for numbers)
+    shard_count = get_game_date_shard_count()
+    bucket_seconds = get_expiry_bucket_seconds()
     for item in game_data:
         item['score'] = Decimal(str(item['score']))
         item['game_duration'] = Decimal(str(item['game_duration']))
         item['expiration_time'] = Decimal(str(item['expiration_time']))
+        add_game_date_shard(item, shard_count)
+        add_expiry_bucket(item, bucket_seconds)
     
     # Initialize DynamoDB resource
     dynamodb = get_dynamodb_resource()
@@ -42,6 +49,13 @@ def load_data_to_dynamodb(filename="game_data.json"):
                 items_per_second = loaded_items / elapsed_time if elapsed_time > 0 else 0
                 print(f"Loaded {loaded_items}/{total_items} items ({items_per_second:.2f} items/second)")
     
+    # Fold the loaded games into the materialized daily leaderboards
+    aggregator = get_daily_leaderboard_aggregator(dynamodb)
+    if aggregator:
+        updated = aggregator.record_games(game_data)
+        print(f"\nUpdated {updated} daily leaderboards "
+              f"({aggregator.stats['skipped']} games below the current top {aggregator.top_k})")
+    
     # Final stats
     total_time = time.time() - start_time
     final_rate = total_items / total_time if total_time > 0 else 0
@@ -5,6 +5,7 @@ from decimal import Decimal
 import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.item_cache import get_cached_table
 
 class DecimalEncoder(json.JSONEncoder):
     """Helper class to convert Decimal to float for JSON serialization."""
@@ -44,5 +45,31 @@ def get_item():
     else:
         print("\nItem not found")
 
+def get_item_cached(repeat=20):
+    """Read the same game record repeatedly through the read-through item cache."""
+    
+    table = get_cached_table('GameLeaderboard', max_size=1000, ttl=30)
+    key = {
+        'player_id': 'p12345678',
+        'game_id': 'g87654321'
+    }
+    
+    print(f"\n=== Reading the same key {repeat} times through the item cache ===")
+    
+    # Start timing
+    start_time = time.time()
+    
+    for _ in range(repeat):
+        table.get_item(Key=key)
+    
+    # Calculate execution time
+    execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    stats = table.cache.stats
+    print(f"{repeat} cached Get Item calls executed in {execution_time:.2f} ms")
+    print(f"Cache hits: {stats['hits']}, misses: {stats['misses']} (hit rate {stats['hit_rate']:.0%})")
+    print(f"Only {stats['misses']} request(s) reached DynamoDB and consumed RCUs")
+
 if __name__ == "__main__":
-    get_item()
\ No newline at end of file
+    get_item()
+    get_item_cached()
\ No newline at end of file
@@ -4,6 +4,8 @@ from decimal import Decimal
 import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import add_game_date_shard
+from utils.daily_leaderboard import get_daily_leaderboard_aggregator
 
 def put_item():
     """Create a new game record in the GameLeaderboard table."""
@@ -15,20 +17,19 @@ def put_item():
     start_time = time.time()
     
     # Put item operation
-    response = table.put_item(
-        Item={
-            'player_id': 'p12345678',
-            'game_id': 'g87654321',
-            'player_name': 'NewPlayer123',
-            'game_date': '2023-06-01',
-            'score': Decimal('9500'),
-            'game_duration': Decimal('450'),
-            'achievements': ['FirstBlood', 'Survivor'],
-            'game_mode': 'battle-royale',
-            'expiration_time': Decimal('0'),
-            'last_updated': '2023-06-01T10:15:30Z'
-        }
-    )
+    item = add_game_date_shard({
+        'player_id': 'p12345678',
+        'game_id': 'g87654321',
+        'player_name': 'NewPlayer123',
+        'game_date': '2023-06-01',
+        'score': Decimal('9500'),
+        'game_duration': Decimal('450'),
+        'achievements': ['FirstBlood', 'Survivor'],
+        'game_mode': 'battle-royale',
+        'expiration_time': Decimal('0'),
+        'last_updated': '2023-06-01T10:15:30Z'
+    })
+    response = table.put_item(Item=item)
     
     # Calculate execution time
     execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
@@ -37,6 +38,11 @@ def put_item():
     print(f"HTTP Status Code: {response['ResponseMetadata']['HTTPStatusCode']}")
     print(f"Request ID: {response['ResponseMetadata']['RequestId']}")
     
+    # Keep the materialized daily leaderboard in sync
+    aggregator = get_daily_leaderboard_aggregator(dynamodb)
+    if aggregator and aggregator.record_game(item):
+        print(f"Daily leaderboard updated for {item['game_date']} / {item['game_mode']}")
+    
     # Return the item we just created for verification
     get_response = table.get_item(
         Key={
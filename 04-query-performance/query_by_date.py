@@ -6,6 +6,7 @@ from decimal import Decimal
 from boto3.dynamodb.conditions import Key
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import get_game_date_shard_count, query_game_date_shards, SHARDED_INDEX_NAME
 
 class DecimalEncoder(json.JSONEncoder):
     """Helper class to convert Decimal to float for JSON serialization."""
@@ -77,6 +78,34 @@ def query_by_date_gsi(game_date):
         'consumed_capacity': response['ConsumedCapacity']['CapacityUnits']
     }
 
+def query_by_date_sharded_gsi(game_date, shard_count):
+    """Query games by date by fanning out across the write-sharded GSI."""
+    
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table('GameLeaderboard')
+    
+    print(f"\n=== Querying games for date {game_date} using {SHARDED_INDEX_NAME} ({shard_count} shards) ===")
+    
+    # Start timing
+    start_time = time.time()
+    
+    # Query every shard in parallel and merge by score
+    response = query_game_date_shards(table.name, game_date, shard_count)
+    
+    # Calculate execution time
+    execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    # Print results
+    print(f"Sharded GSI Query executed in {execution_time:.2f} ms")
+    print(f"Items found: {len(response['Items'])}")
+    print(f"Consumed capacity: {response['ConsumedCapacity']['CapacityUnits']} RCUs")
+    
+    return {
+        'execution_time': execution_time,
+        'items_count': len(response['Items']),
+        'consumed_capacity': response['ConsumedCapacity']['CapacityUnits']
+    }
+
 def compare_performance():
     """Compare performance between GSI query and scan for date-based queries."""
     
@@ -94,7 +123,11 @@ def compare_performance():
     
     # Run both query methods
     scan_results = query_by_date_scan(game_date)
-    gsi_results = query_by_date_gsi(game_date)
+    shard_count = get_game_date_shard_count()
+    if shard_count:
+        gsi_results = query_by_date_sharded_gsi(game_date, shard_count)
+    else:
+        gsi_results = query_by_date_gsi(game_date)
     
     # Compare results
     time_diff = scan_results['execution_time'] / gsi_results['execution_time']
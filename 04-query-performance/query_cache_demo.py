@@ -0,0 +1,92 @@
+import sys
+import os
+import time
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.item_cache import get_cached_table
+from utils.game_date_shards import (
+    add_game_date_shard, game_date_shard_key, get_game_date_shard_count, SHARDED_INDEX_NAME, SHARD_ATTRIBUTE
+)
+
+def date_queries(game_date, shard_count):
+    """Query arguments for a day's games: one query, or one per shard when the date index is sharded."""
+    if shard_count:
+        return [
+            dict(IndexName=SHARDED_INDEX_NAME,
+                 KeyConditionExpression=Key(SHARD_ATTRIBUTE).eq(game_date_shard_key(game_date, shard)))
+            for shard in range(shard_count)
+        ]
+    return [dict(IndexName='GameDateIndex', KeyConditionExpression=Key('game_date').eq(game_date))]
+
+def timed_query(table, label, queries):
+    """Run queries through the cache and print their total latency and consumed capacity."""
+    
+    items = 0
+    consumed_capacity = 0
+    start_time = time.time()
+    for kwargs in queries:
+        response = table.query(ReturnConsumedCapacity='TOTAL', **kwargs)
+        items += len(response['Items'])
+        consumed_capacity += response['ConsumedCapacity']['CapacityUnits']
+    execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    print(f"{label}: {items} items in {execution_time:.2f} ms, {consumed_capacity} RCUs")
+
+def query_cache_demo(repeat=5):
+    """Show repeated leaderboard queries served from the query cache and invalidated by writes."""
+    
+    table = get_cached_table('GameLeaderboard', query_ttl=10)
+    
+    # Get a sample player_id and game_date from the table
+    response = table.scan(Limit=1)
+    if len(response['Items']) == 0:
+        print("No items found in the table. Please load data first.")
+        return
+    
+    sample = response['Items'][0]
+    player_id = sample['player_id']
+    game_date = sample['game_date']
+    player_queries = [dict(KeyConditionExpression=Key('player_id').eq(player_id))]
+    # With sharding, the shards are queried one after another through the
+    # cache (query_game_date_shards reads DynamoDB directly)
+    shard_count = get_game_date_shard_count()
+    queries = date_queries(game_date, shard_count)
+    
+    print(f"=== Repeating the player query for {player_id} {repeat} times ===")
+    for attempt in range(repeat):
+        timed_query(table, f"Attempt {attempt + 1}", player_queries)
+    
+    print(f"\n=== Repeating the date query for {game_date} {repeat} times"
+          + (f" ({shard_count} shards)" if shard_count else "") + " ===")
+    for attempt in range(repeat):
+        timed_query(table, f"Attempt {attempt + 1}", queries)
+    
+    # A write for the same player and date invalidates both cached queries
+    print(f"\n=== Writing a new game for {player_id} on {game_date} ===")
+    item = add_game_date_shard({
+        'player_id': player_id,
+        'game_id': f"cache-g{int(time.time())}",
+        'player_name': sample.get('player_name', 'CachePlayer'),
+        'game_date': game_date,
+        'score': Decimal('5000'),
+        'game_mode': sample.get('game_mode', 'battle-royale'),
+        'expiration_time': Decimal('0'),
+        'last_updated': time.strftime("%Y-%m-%dT%H:%M:%SZ")
+    })
+    try:
+        table.put_item(Item=item)
+        
+        timed_query(table, "Player query after write", player_queries)
+        timed_query(table, "Date query after write", queries)
+        
+        stats = table.query_cache.stats
+        print("\n=== Query Cache Statistics ===")
+        print(f"Hits: {stats['hits']}, misses: {stats['misses']} (hit rate {stats['hit_rate']:.0%})")
+        print(f"Invalidations: {stats['invalidations']}")
+    finally:
+        # Remove the demo game so the sample data is left unchanged
+        table.delete_item(Key={'player_id': item['player_id'], 'game_id': item['game_id']})
+
+if __name__ == "__main__":
+    query_cache_demo()
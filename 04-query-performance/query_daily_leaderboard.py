@@ -0,0 +1,123 @@
+import sys
+import os
+import time
+from boto3.dynamodb.conditions import Key, Attr
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import get_game_date_shard_count, query_game_date_shards, SHARDED_INDEX_NAME
+from utils.daily_leaderboard import LEADERBOARD_TABLE_NAME, get_daily_leaderboard_settings, leaderboard_id
+
+def top_games_from_gsi(game_date, game_mode, top_k):
+    """Build the day's top-K for a game mode by querying GameDateIndex (or every shard of GameDateShardIndex)."""
+    
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table('GameLeaderboard')
+    shard_count = get_game_date_shard_count()
+    index_name = SHARDED_INDEX_NAME if shard_count else 'GameDateIndex'
+    
+    print(f"\n=== Top {top_k} for {game_date} / {game_mode} using {index_name} query ===")
+    
+    # Start timing
+    start_time = time.time()
+    
+    # Highest scores first; the game mode is filtered after the read
+    if shard_count:
+        response = query_game_date_shards(table.name, game_date, shard_count, limit=top_k,
+                                          FilterExpression=Attr('game_mode').eq(game_mode))
+        items = response['Items']
+        consumed_capacity = response['ConsumedCapacity']['CapacityUnits']
+    else:
+        kwargs = dict(
+            IndexName=index_name,
+            KeyConditionExpression=Key('game_date').eq(game_date),
+            FilterExpression=Attr('game_mode').eq(game_mode),
+            ScanIndexForward=False,
+            ReturnConsumedCapacity='TOTAL'
+        )
+        items = []
+        consumed_capacity = 0
+        
+        while len(items) < top_k:
+            response = table.query(**kwargs)
+            items.extend(response['Items'])
+            consumed_capacity += response['ConsumedCapacity']['CapacityUnits']
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    # Calculate execution time
+    execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    print(f"GSI Query executed in {execution_time:.2f} ms")
+    print(f"Entries returned: {len(items[:top_k])}")
+    print(f"Consumed capacity: {consumed_capacity} RCUs")
+    
+    return {
+        'execution_time': execution_time,
+        'items_count': len(items[:top_k]),
+        'consumed_capacity': consumed_capacity
+    }
+
+def top_games_from_leaderboard(game_date, game_mode):
+    """Read the day's top-K for a game mode from the materialized leaderboard item."""
+    
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table(LEADERBOARD_TABLE_NAME)
+    
+    print(f"\n=== Top entries for {game_date} / {game_mode} using {LEADERBOARD_TABLE_NAME} GetItem ===")
+    
+    # Start timing
+    start_time = time.time()
+    
+    response = table.get_item(
+        Key={'leaderboard_id': leaderboard_id(game_date, game_mode)},
+        ReturnConsumedCapacity='TOTAL'
+    )
+    
+    # Calculate execution time
+    execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+    
+    entries = response.get('Item', {}).get('entries', [])
+    print(f"GetItem executed in {execution_time:.2f} ms")
+    print(f"Entries returned: {len(entries)}")
+    print(f"Consumed capacity: {response['ConsumedCapacity']['CapacityUnits']} RCUs")
+    
+    for rank, entry in enumerate(entries[:5], start=1):
+        print(f"  #{rank} {entry.get('player_name', entry['player_id'])}: {entry['score']}")
+    
+    return {
+        'execution_time': execution_time,
+        'items_count': len(entries),
+        'consumed_capacity': response['ConsumedCapacity']['CapacityUnits']
+    }
+
+def compare_performance():
+    """Compare building a daily leaderboard from the GSI with reading the materialized item."""
+    
+    settings = get_daily_leaderboard_settings()
+    if not settings['enabled']:
+        print("The daily leaderboard is disabled. Set daily_leaderboard.enabled in config.json,")
+        print("create the table with 01-table-creation/create_daily_leaderboard_table.py and reload the data.")
+        return
+    
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table('GameLeaderboard')
+    
+    # Get a sample game_date and game_mode from the table
+    response = table.scan(Limit=1)
+    if len(response['Items']) == 0:
+        print("No items found in the table. Please load data first.")
+        return
+    
+    game_date = response['Items'][0]['game_date']
+    game_mode = response['Items'][0]['game_mode']
+    
+    gsi_results = top_games_from_gsi(game_date, game_mode, settings['top_k'])
+    leaderboard_results = top_games_from_leaderboard(game_date, game_mode)
+    
+    print("\n=== Performance Comparison ===")
+    print(f"GSI Query: {gsi_results['execution_time']:.2f} ms, {gsi_results['consumed_capacity']} RCUs")
+    print(f"Materialized GetItem: {leaderboard_results['execution_time']:.2f} ms, {leaderboard_results['consumed_capacity']} RCUs")
+
+if __name__ == "__main__":
+    compare_performance()
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.dynamodb_helper import get_dynamodb_resource
+from utils.retry import RetryPolicy, RetryBudget, CircuitBreaker, CircuitOpenError, get_table_rate_limiter
+
+def run_with_adaptive_retry(num_threads=8, rounds=3):
+    """Run concurrent get_item operations through the client-side adaptive retry policy."""
+    
+    retry_policy = RetryPolicy(
+        max_attempts=10,
+        retry_budget=RetryBudget(ratio=0.1),
+        circuit_breaker=CircuitBreaker(threshold=0.5, reset_timeout=5.0)
+    )
+    dynamodb = get_dynamodb_resource(retry_policy=retry_policy)
+    table = dynamodb.Table('GameLeaderboard')
+    
+    print("=== Running Get Item Operations with Adaptive Client-side Retry ===")
+    print("Policy: per-table AIMD rate limiter, decorrelated-jitter backoff, "
+          "10% retry budget, circuit breaker at 50% throttles")
+    
+    # First, get some sample keys from the table
+    try:
+        response = table.scan(Limit=100, ProjectionExpression="player_id, game_id")
+        items = response.get('Items', [])
+    except ClientError as e:
+        print(f"Error scanning table: {e}")
+        return
+    
+    if not items:
+        print("No items found in table. Please load data first.")
+        return
+    
+    keys = [{'player_id': item['player_id'], 'game_id': item['game_id']} for item in items] * rounds
+    print(f"Performing {len(keys)} get_item operations from {num_threads} threads...")
+    
+    def get_item(key):
+        try:
+            table.get_item(Key=key)
+            return 'success'
+        except CircuitOpenError:
+            return 'shed'
+        except ClientError:
+            return 'failed'
+    
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        outcomes = list(executor.map(get_item, keys))
+    execution_time = time.time() - start_time
+    
+    stats = retry_policy.stats
+    limiter = get_table_rate_limiter('GameLeaderboard')
+    
+    print("\n=== Results with Adaptive Retry Policy ===")
+    print(f"Total requests: {len(keys)}")
+    print(f"Successful requests: {outcomes.count('success')}")
+    print(f"Failed requests: {outcomes.count('failed')}")
+    print(f"Shed by circuit breaker: {outcomes.count('shed')}")
+    print(f"Attempts sent: {stats['attempts']}")
+    print(f"Throttled attempts: {stats['throttles']}")
+    print(f"Retries: {stats['retries']} (budget refused {stats['budget_exhausted']})")
+    print(f"Time spent in backoff: {stats['backoff_time']:.2f} seconds")
+    print(f"Time spent waiting on the rate limiter (all threads): {stats['rate_limit_wait']:.2f} seconds")
+    if limiter.rate:
+        print(f"Client-side rate settled at: {limiter.rate:.2f} requests/second")
+    else:
+        print("Client-side rate limiter never engaged (no throttling observed)")
+    print(f"Total execution time: {execution_time:.2f} seconds")
+    print(f"Effective throughput: {outcomes.count('success') / execution_time:.2f} requests/second")
+
+if __name__ == "__main__":
+    run_with_adaptive_retry()
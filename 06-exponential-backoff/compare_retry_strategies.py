@@ -0,0 +1,117 @@
+import sys
+import os
+import time
+import argparse
+from botocore.config import Config
+from botocore.exceptions import ClientError
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.dynamodb_helper import get_dynamodb_resource
+from utils.retry import RetryPolicy, RetryBudget, CircuitBreaker
+from utils.key_distributions import make_key_sampler, DISTRIBUTIONS
+from utils.load_driver import run_load, load_key_pool
+
+def retry_strategies():
+    """The retry configurations to compare, as (name, boto_config, retry_policy)."""
+    return [
+        ('no-retry', Config(retries={'total_max_attempts': 1, 'mode': 'standard'}), False),
+        ('legacy', Config(retries={'max_attempts': 10, 'mode': 'legacy'}), False),
+        ('standard', Config(retries={'max_attempts': 10, 'mode': 'standard'}), False),
+        ('sdk-adaptive', Config(retries={'max_attempts': 10, 'mode': 'adaptive'}), False),
+        ('client-policy', None, RetryPolicy(
+            max_attempts=10,
+            retry_budget=RetryBudget(ratio=0.1),
+            circuit_breaker=CircuitBreaker()
+        ))
+    ]
+
+def print_comparison(results):
+    """Print one column per strategy."""
+    rows = [
+        ('Requests', 'requests', '{:.0f}'),
+        ('Succeeded', 'succeeded', '{:.0f}'),
+        ('Throttled (gave up)', 'throttled', '{:.0f}'),
+        ('Shed by breaker', 'shed', '{:.0f}'),
+        ('Other errors', 'errors', '{:.0f}'),
+        ('Success rate', 'success_rate', '{:.1%}'),
+        ('Retries', 'retries', '{:.0f}'),
+        ('Attempts/s', 'attempts_per_second', '{:.1f}'),
+        ('Goodput (ok/s)', 'goodput', '{:.1f}'),
+        ('p50 latency (ms)', 'p50', '{:.1f}'),
+        ('p90 latency (ms)', 'p90', '{:.1f}'),
+        ('p99 latency (ms)', 'p99', '{:.1f}')
+    ]
+    names = list(results)
+    width = max(14, max(len(name) for name in names) + 2)
+    
+    print("\n=== Retry Strategy Comparison ===")
+    print(f"{'':22}" + ''.join(f"{name:>{width}}" for name in names))
+    for label, field, fmt in rows:
+        values = []
+        for name in names:
+            value = results[name][field]
+            if field in ('p50', 'p90', 'p99'):
+                value *= 1000
+            values.append(fmt.format(value))
+        print(f"{label:22}" + ''.join(f"{value:>{width}}" for value in values))
+
+def compare_retry_strategies(mode, target_rps, duration, concurrency, distribution, max_keys, cooldown, only=None):
+    """Run the same read load against each retry strategy and compare the outcomes."""
+    
+    table = get_dynamodb_resource(retry_policy=False).Table('GameLeaderboard')
+    try:
+        keys = load_key_pool(table, max_keys)
+    except ClientError as e:
+        print(f"Error scanning table: {e}")
+        return
+    
+    if not keys:
+        print("No items found in table. Please load data first.")
+        return
+    
+    print("=== Comparing Retry Strategies Under Identical Load ===")
+    rate = f"{target_rps} requests/second target" if target_rps else "unpaced"
+    print(f"Load: {mode}-loop, {rate}, {concurrency} workers, {duration}s per strategy")
+    print(f"Keys: {len(keys)} ({distribution} distribution)")
+    
+    results = {}
+    strategies = [strategy for strategy in retry_strategies() if not only or strategy[0] in only]
+    for index, (name, boto_config, retry_policy) in enumerate(strategies):
+        if index and cooldown:
+            # Let the table's burst capacity refill so every strategy starts from the same state
+            print(f"Cooling down for {cooldown}s...")
+            time.sleep(cooldown)
+        
+        print(f"\nRunning strategy: {name}")
+        strategy_table = get_dynamodb_resource(boto_config=boto_config, retry_policy=retry_policy).Table('GameLeaderboard')
+        # Same seed for every strategy so each one reads the same key sequence
+        next_key = make_key_sampler(keys, distribution, seed=42)
+        
+        result = run_load(
+            lambda: strategy_table.get_item(Key=next_key()),
+            mode=mode,
+            target_rps=target_rps,
+            duration=duration,
+            concurrency=concurrency
+        )
+        results[name] = result.summary()
+        print(f"Done: {results[name]['succeeded']}/{results[name]['requests']} succeeded "
+              f"in {results[name]['duration']:.2f} seconds")
+    
+    print_comparison(results)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare retry strategies under identical concurrent read load.")
+    parser.add_argument('--mode', choices=['open', 'closed'], default='open',
+                        help="open: fixed arrival rate; closed: each worker waits for its previous request")
+    parser.add_argument('--rps', type=float, default=50, help="Target requests per second")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds of load per strategy")
+    parser.add_argument('--concurrency', type=int, default=32, help="Worker threads")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform', help="Key access distribution")
+    parser.add_argument('--keys', type=int, default=500, help="Number of distinct keys to read")
+    parser.add_argument('--cooldown', type=float, default=30, help="Seconds to wait between strategies")
+    parser.add_argument('--strategies', nargs='*', help="Only run these strategies")
+    args = parser.parse_args()
+    
+    compare_retry_strategies(args.mode, args.rps, args.duration, args.concurrency,
+                             args.distribution, args.keys, args.cooldown, args.strategies)
@@ -7,6 +7,7 @@ from botocore.config import Config
 from botocore.exceptions import ClientError
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.instrumentation import get_metrics_registry, enable_instrumentation
 
 class DecimalEncoder(json.JSONEncoder):
     """Helper class to convert Decimal to float for JSON serialization."""
@@ -26,16 +27,10 @@ def run_with_retry():
         }
     )
     
-    # Initialize DynamoDB with retry configuration
-    # The helper function doesn't support custom config, so we'll use boto3 directly here
-    from utils.dynamodb_helper import load_config
-    config_data = load_config()
-    import boto3
-    session = boto3.Session(profile_name=config_data['aws_profile'])
-    if config_data['dynamodb']['use_local_endpoint']:
-        dynamodb = session.resource('dynamodb', region_name=config_data['aws_region'], endpoint_url=config_data['dynamodb']['endpoint_url'], config=retry_config)
-    else:
-        dynamodb = session.resource('dynamodb', region_name=config_data['aws_region'], config=retry_config)
+    # Initialize DynamoDB with retry configuration (and the SDK's own retry handling),
+    # instrumented so the retries can be counted
+    enable_instrumentation()
+    dynamodb = get_dynamodb_resource(boto_config=retry_config, retry_policy=False)
     table = dynamodb.Table('GameLeaderboard')
     
     print("=== Running Get Item Operations with SDK Retry Configuration ===")
@@ -60,17 +55,9 @@ def run_with_retry():
     failed_requests = 0
     start_time = time.time()
     
-    # Set up retry event listener to count retries
-    total_retries = 0
-    
-    def count_retries(attempts, **kwargs):
-        nonlocal total_retries
-        if attempts > 0:
-            total_retries += 1
-            print(f"Request throttled. Retry attempt {attempts}")
-    
-    # Register the retry event listener
-    dynamodb.meta.client.meta.events.register('after-retry.dynamodb', count_retries)
+    # Start counting from zero for this run
+    metrics = get_metrics_registry()
+    metrics.reset()
     
     # Run each get_item operation 3 times to increase load
     for _ in range(3):
@@ -92,9 +79,6 @@ def run_with_retry():
                 print(f"Failed after all retries: {e}")
                 failed_requests += 1
     
-    # Unregister the event listener
-    dynamodb.meta.client.meta.events.unregister('after-retry.dynamodb', count_retries)
-    
     # Calculate execution time
     execution_time = time.time() - start_time
     
@@ -102,9 +86,13 @@ def run_with_retry():
     print(f"Total requests: {len(items) * 3}")
     print(f"Successful requests: {successful_requests}")
     print(f"Failed requests: {failed_requests}")
-    print(f"Total retries needed: {total_retries}")
+    print(f"Throttled attempts: {metrics.counter_total('dynamodb_throttles_total', operation='GetItem'):.0f}")
+    print(f"Total retries needed: {metrics.counter_total('dynamodb_retries_total', operation='GetItem'):.0f}")
+    print(f"Time spent backing off: {metrics.counter_total('dynamodb_backoff_seconds_total', operation='GetItem'):.2f} seconds")
     print(f"Total execution time: {execution_time:.2f} seconds")
     
+    metrics.report()
+    
     if successful_requests == len(items) * 3:
         print("\n✅ All requests eventually succeeded with retry logic!")
         print("This demonstrates how AWS SDK's built-in exponential backoff helps handle throttling.")
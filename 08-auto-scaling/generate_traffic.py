@@ -3,18 +3,18 @@ import os
 import time
 import random
 import uuid
-import threading
+import argparse
 from decimal import Decimal
-from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import add_game_date_shard
+from utils.load_profiles import run_profile
 
 def generate_game_record():
     """Generate a random game record."""
     player_id = f"p{uuid.uuid4().hex[:8]}"
     game_id = f"g{uuid.uuid4().hex[:8]}"
     
-    return {
+    return add_game_date_shard({
         'player_id': player_id,
         'game_id': game_id,
         'player_name': f"Player{random.randint(1, 999)}",
@@ -26,74 +26,63 @@ def generate_game_record():
         'game_mode': random.choice(['battle-royale', 'team-deathmatch', 'capture-the-flag']),
         'expiration_time': Decimal('0'),
         'last_updated': time.strftime("%Y-%m-%dT%H:%M:%SZ")
-    }
+    })
 
-def write_items(dynamodb, count):
-    """Write items to the table."""
-    table = dynamodb.Table('GameLeaderboard')
-    
-    for _ in range(count):
-        item = generate_game_record()
-        table.put_item(Item=item)
-
-def read_items(dynamodb, count):
-    """Read random items from the table."""
-    table = dynamodb.Table('GameLeaderboard')
-    
-    # Get some sample keys
-    response = table.scan(Limit=min(count, 20), ProjectionExpression="player_id, game_id")
-    items = response.get('Items', [])
+def ramp_profile(start_rps=5, step_rps=5, step_seconds=30, max_rps=100, read_ratio=0.7,
+                 max_workers=64, key_pool_size=1000, report_interval=5, hot_keys_skew=None):
+    """Build the load profile for a staircase ramp that holds at max_rps until stopped.
     
-    if not items:
-        print("No items found in table. Cannot perform reads.")
-        return
-    
-    # Perform reads
-    for _ in range(count):
-        item = random.choice(items)
-        table.get_item(Key={
-            'player_id': item['player_id'],
-            'game_id': item['game_id']
-        })
+    With hot_keys_skew, keys follow a Zipf distribution with that skew, so a
+    few star players receive most of the reads and writes.
+    """
+    return {
+        'name': 'autoscaling-ramp',
+        'table': 'GameLeaderboard',
+        'workers': max_workers,
+        'key_pool_size': key_pool_size,
+        'report_interval': report_interval,
+        # Concurrent reads of the same key share one in-flight GetItem; only
+        # hot keys are read by several workers at once often enough to matter
+        'coalesce_reads': bool(hot_keys_skew),
+        'mix': {'read': read_ratio, 'write': 1 - read_ratio},
+        'key_distribution': {'type': 'zipf', 'skew': hot_keys_skew} if hot_keys_skew else {'type': 'uniform'},
+        'phases': [
+            {'name': 'ramp', 'type': 'step', 'from': start_rps, 'step': step_rps,
+             'step_duration': step_seconds, 'to': max_rps}
+        ]
+    }
 
-def generate_traffic():
-    """Generate increasing traffic to trigger auto-scaling."""
+def generate_traffic(profile=None):
+    """Generate increasing traffic to trigger auto-scaling.
     
-    dynamodb = get_dynamodb_resource()
+    The load profile (by default a ramp from 5 to 100 operations per second)
+    is replayed open-loop at exact target rates by a persistent worker pool,
+    reading from a key pool loaded once up front. Every report interval the
+    achieved rate and latency are printed next to the target, so you can see
+    the load the table actually received.
+    """
     
     print("Starting traffic generation to trigger auto-scaling...")
-    print("Press Ctrl+C to stop")
-    
-    try:
-        # Start with low traffic
-        operations_per_second = 5
-        
-        while True:
-            print(f"Generating {operations_per_second} operations per second...")
-            
-            # Use ThreadPoolExecutor to parallelize operations
-            with ThreadPoolExecutor(max_workers=operations_per_second) as executor:
-                # Mix of reads and writes
-                read_count = int(operations_per_second * 0.7)  # 70% reads
-                write_count = operations_per_second - read_count  # 30% writes
-                
-                # Submit tasks
-                read_future = executor.submit(read_items, dynamodb, read_count)
-                write_future = executor.submit(write_items, dynamodb, write_count)
-                
-                # Wait for completion
-                read_future.result()
-                write_future.result()
-            
-            # Increase traffic every 30 seconds
-            if operations_per_second < 100:
-                operations_per_second += 5
-            
-            # Wait before next batch
-            time.sleep(1)
-            
-    except KeyboardInterrupt:
-        print("\nTraffic generation stopped.")
+    run_profile(profile or ramp_profile(), generate_game_record)
 
 if __name__ == "__main__":
-    generate_traffic()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate a ramping open-loop read/write load to trigger auto-scaling.")
+    parser.add_argument('--profile', help="Load profile file or name in load-profiles/ (overrides the ramp options)")
+    parser.add_argument('--start-rps', type=float, default=5, help="Initial operations per second")
+    parser.add_argument('--step-rps', type=float, default=5, help="Operations per second added at each step")
+    parser.add_argument('--step-seconds', type=float, default=30, help="Seconds between steps")
+    parser.add_argument('--max-rps', type=float, default=100, help="Rate to hold once reached")
+    parser.add_argument('--read-ratio', type=float, default=0.7, help="Fraction of operations that are reads")
+    parser.add_argument('--workers', type=int, default=64, help="Worker threads in the persistent pool")
+    parser.add_argument('--keys', type=int, default=1000, help="Keys to preload into the read pool")
+    parser.add_argument('--report-interval', type=float, default=5, help="Seconds between progress lines")
+    parser.add_argument('--hot-keys', type=float, nargs='?', const=1.2, metavar='SKEW',
+                        help="Hot-key mode: pick keys from a Zipf distribution (default skew 1.2)")
+    args = parser.parse_args()
+    
+    if args.profile:
+        generate_traffic(args.profile)
+    else:
+        generate_traffic(ramp_profile(args.start_rps, args.step_rps, args.step_seconds, args.max_rps,
+                                      args.read_ratio, args.workers, args.keys, args.report_interval,
+                                      args.hot_keys))
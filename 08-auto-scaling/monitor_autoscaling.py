@@ -1,110 +1,133 @@
 import sys
 import os
 import time
-from datetime import datetime, timedelta
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_client
+from utils.cloudwatch_metrics import RollingMetrics, metric_query, sparkline
+
+# (key, CloudWatch metric, statistic) polled for every table and global secondary index
+MONITORED_METRICS = [
+    ('consumed_read', 'ConsumedReadCapacityUnits', 'Sum'),
+    ('consumed_write', 'ConsumedWriteCapacityUnits', 'Sum'),
+    ('provisioned_read', 'ProvisionedReadCapacityUnits', 'Average'),
+    ('provisioned_write', 'ProvisionedWriteCapacityUnits', 'Average'),
+    ('read_throttles', 'ReadThrottleEvents', 'Sum'),
+    ('write_throttles', 'WriteThrottleEvents', 'Sum')
+]
+
+def resource_dimensions(table_name, index_name=None):
+    dimensions = {'TableName': table_name}
+    if index_name:
+        dimensions['GlobalSecondaryIndexName'] = index_name
+    return dimensions
+
+def build_queries(resources):
+    """One query per monitored metric of every (table, index) pair; returns (queries, {id: (resource, key)})."""
+    queries, query_keys = [], {}
+    for resource in resources:
+        for key, metric_name, stat in MONITORED_METRICS:
+            query_id = f"q{len(queries)}"
+            queries.append(metric_query(query_id, metric_name, resource_dimensions(*resource), stat))
+            query_keys[query_id] = (resource, key)
+    return queries, query_keys
+
+def print_status(tables, metrics, query_ids, activities):
+    """Clear the screen and print capacity, consumption, throttling and scaling activity per table and GSI."""
+    print("\033[H\033[J")
+    print(f"=== DynamoDB Auto-scaling Monitor ({datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}) ===")
+
+    for table_name, table in tables.items():
+        resources = [(table_name, None, table['ProvisionedThroughput'])]
+        resources += [
+            (table_name, index['IndexName'], index.get('ProvisionedThroughput', {}))
+            for index in table.get('GlobalSecondaryIndexes', [])
+        ]
+        for _, index_name, throughput in resources:
+            resource = (table_name, index_name)
+            print(f"\n{table_name}" + (f" / {index_name}" if index_name else ""))
+            for dimension in ('read', 'write'):
+                # Consumed capacity is a per-minute sum; show it per second like provisioned capacity
+                consumed = [value / 60 for value in metrics.values(query_ids[(resource, f'consumed_{dimension}')])]
+                throttles = metrics.values(query_ids[(resource, f'{dimension}_throttles')])
+                provisioned_history = metrics.values(query_ids[(resource, f'provisioned_{dimension}')])
+                provisioned = throughput.get(f"{dimension.capitalize()}CapacityUnits", 0)
+                latest = f"{consumed[-1]:.1f}" if consumed else "-"
+                utilization = f"{100 * consumed[-1] / provisioned:.0f}%" if consumed and provisioned else "-"
+                print(f"  {dimension.capitalize():<5} provisioned {provisioned:>6} {sparkline(provisioned_history, 15):<15} "
+                      f"| consumed/s {latest:>7} ({utilization:>4}) {sparkline(consumed):<30} "
+                      f"| throttles {sum(throttles):>5.0f} {sparkline(throttles, 15)}")
+
+        table_activities = [a for a in activities if a['ResourceId'].startswith(f"table/{table_name}")]
+        if table_activities:
+            print("  Recent scaling activities:")
+            for activity in table_activities[:3]:
+                print(f"  - {activity['StartTime'].strftime('%H:%M:%S')}: {activity['StatusMessage']}")
+
+def monitor_autoscaling(table_names=('GameLeaderboard',), interval=10):
+    """Monitor auto-scaling activities and metrics.
+
+    Each poll runs describe_table for every table, one GetMetricData call for
+    all tables and GSIs, and one describe_scaling_activities call
+    concurrently. Metrics are fetched incrementally (only the window since the
+    previous poll) into a rolling 30-minute series drawn as sparklines.
+    """
 
-def monitor_autoscaling():
-    """Monitor auto-scaling activities and metrics."""
-    
     # Initialize clients
     dynamodb = get_dynamodb_client()
     import boto3
     cloudwatch = boto3.client('cloudwatch')
     application_autoscaling = boto3.client('application-autoscaling')
-    
-    table_name = 'GameLeaderboard'
-    
-    print(f"Monitoring auto-scaling for table: {table_name}")
+
+    metrics = RollingMetrics(cloudwatch)
+    query_ids = {}
+    resources = None
+
+    print(f"Monitoring auto-scaling for tables: {', '.join(table_names)}")
     print("Press Ctrl+C to stop")
-    
-    try:
-        while True:
-            # Get current table capacity
-            table = dynamodb.describe_table(TableName=table_name)['Table']
-            read_capacity = table['ProvisionedThroughput']['ReadCapacityUnits']
-            write_capacity = table['ProvisionedThroughput']['WriteCapacityUnits']
-            
-            # Get consumed capacity metrics
-            end_time = datetime.utcnow()
-            start_time = end_time - timedelta(minutes=5)
-            
-            metrics = cloudwatch.get_metric_data(
-                MetricDataQueries=[
-                    {
-                        'Id': 'readCapacity',
-                        'MetricStat': {
-                            'Metric': {
-                                'Namespace': 'AWS/DynamoDB',
-                                'MetricName': 'ConsumedReadCapacityUnits',
-                                'Dimensions': [{'Name': 'TableName', 'Value': table_name}]
-                            },
-                            'Period': 60,
-                            'Stat': 'Sum'
-                        }
-                    },
-                    {
-                        'Id': 'writeCapacity',
-                        'MetricStat': {
-                            'Metric': {
-                                'Namespace': 'AWS/DynamoDB',
-                                'MetricName': 'ConsumedWriteCapacityUnits',
-                                'Dimensions': [{'Name': 'TableName', 'Value': table_name}]
-                            },
-                            'Period': 60,
-                            'Stat': 'Sum'
-                        }
-                    }
-                ],
-                StartTime=start_time,
-                EndTime=end_time
-            )
-            
-            # Get recent scaling activities
-            read_activities = application_autoscaling.describe_scaling_activities(
-                ServiceNamespace='dynamodb',
-                ResourceId=f'table/{table_name}',
-                ScalableDimension='dynamodb:table:ReadCapacityUnits',
-                MaxResults=5
-            )
-            
-            write_activities = application_autoscaling.describe_scaling_activities(
-                ServiceNamespace='dynamodb',
-                ResourceId=f'table/{table_name}',
-                ScalableDimension='dynamodb:table:WriteCapacityUnits',
-                MaxResults=5
-            )
-            
-            # Clear screen
-            print("\033[H\033[J")
-            
-            # Print current status
-            print(f"=== DynamoDB Auto-scaling Monitor ({datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}) ===")
-            print(f"\nProvisioned Capacity:")
-            print(f"- Read Capacity Units: {read_capacity}")
-            print(f"- Write Capacity Units: {write_capacity}")
-            
-            print(f"\nRecent Consumed Capacity (last datapoint):")
-            if metrics['MetricDataResults'][0]['Values']:
-                print(f"- Read Capacity: {metrics['MetricDataResults'][0]['Values'][-1]:.2f} RCUs")
-            if metrics['MetricDataResults'][1]['Values']:
-                print(f"- Write Capacity: {metrics['MetricDataResults'][1]['Values'][-1]:.2f} WCUs")
-            
-            print("\nRecent Scaling Activities:")
-            print("Read Capacity:")
-            for activity in read_activities['ScalingActivities'][:3]:
-                print(f"- {activity['StartTime'].strftime('%H:%M:%S')}: {activity['StatusMessage']}")
-            
-            print("\nWrite Capacity:")
-            for activity in write_activities['ScalingActivities'][:3]:
-                print(f"- {activity['StartTime'].strftime('%H:%M:%S')}: {activity['StatusMessage']}")
-            
-            # Wait before next update
-            time.sleep(10)
-            
-    except KeyboardInterrupt:
-        print("\nMonitoring stopped.")
+
+    with ThreadPoolExecutor(max_workers=len(table_names) + 2) as executor:
+        try:
+            while True:
+                described = {name: executor.submit(dynamodb.describe_table, TableName=name) for name in table_names}
+                # Poll with the current queries; if the set of indexes changed, poll again below
+                metrics_done = executor.submit(metrics.poll) if resources is not None else None
+                activities = executor.submit(
+                    application_autoscaling.describe_scaling_activities, ServiceNamespace='dynamodb', MaxResults=50
+                )
+
+                tables = {name: future.result()['Table'] for name, future in described.items()}
+                current = [
+                    (name, index['IndexName'] if index else None)
+                    for name, table in tables.items()
+                    for index in [None] + table.get('GlobalSecondaryIndexes', [])
+                ]
+                if current != resources:
+                    # Let the poll with the old queries finish first, so it
+                    # cannot overwrite the state of the new ones
+                    if metrics_done:
+                        metrics_done.result()
+                    resources = current
+                    queries, query_keys = build_queries(resources)
+                    query_ids = {value: query_id for query_id, value in query_keys.items()}
+                    metrics.set_queries(queries)
+                    metrics_done = executor.submit(metrics.poll)
+                metrics_done.result()
+
+                print_status(tables, metrics, query_ids, activities.result()['ScalingActivities'])
+
+                # Wait before next update
+                time.sleep(interval)
+
+        except KeyboardInterrupt:
+            print("\nMonitoring stopped.")
 
 if __name__ == "__main__":
-    monitor_autoscaling()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Monitor auto-scaling, capacity and throttling for tables and GSIs.")
+    parser.add_argument('--tables', nargs='+', default=['GameLeaderboard'], help="Tables to monitor")
+    parser.add_argument('--interval', type=float, default=10, help="Seconds between polls")
+    args = parser.parse_args()
+
+    monitor_autoscaling(args.tables, args.interval)
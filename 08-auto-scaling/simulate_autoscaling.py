@@ -0,0 +1,136 @@
+import sys
+import os
+import csv
+import argparse
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.autoscaling_simulator import (
+    TargetTrackingPolicy, simulate, demand_from_profile, demand_from_csv, RCU_HOUR_PRICE, WCU_HOUR_PRICE
+)
+from utils.load_profiles import load_profile, validate_profile
+from generate_traffic import ramp_profile
+
+def export_consumed_capacity(table_name, hours, path):
+    """Record the table's per-minute consumed capacity from CloudWatch into a CSV timeline."""
+    import boto3
+    cloudwatch = boto3.client('cloudwatch')
+    end_time = datetime.utcnow()
+    start_time = end_time - timedelta(hours=hours)
+
+    queries = [
+        {
+            'Id': metric_id,
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': 'AWS/DynamoDB',
+                    'MetricName': metric_name,
+                    'Dimensions': [{'Name': 'TableName', 'Value': table_name}]
+                },
+                'Period': 60,
+                'Stat': 'Sum'
+            }
+        }
+        for metric_id, metric_name in (('read', 'ConsumedReadCapacityUnits'), ('write', 'ConsumedWriteCapacityUnits'))
+    ]
+    values = {'read': {}, 'write': {}}
+    paginator = cloudwatch.get_paginator('get_metric_data')
+    for page in paginator.paginate(MetricDataQueries=queries, StartTime=start_time, EndTime=end_time,
+                                   ScanBy='TimestampAscending'):
+        for result in page['MetricDataResults']:
+            for timestamp, value in zip(result['Timestamps'], result['Values']):
+                values[result['Id']][timestamp.replace(tzinfo=None)] = value
+
+    # Minutes without datapoints had no traffic
+    minute = start_time.replace(second=0, microsecond=0)
+    rows = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp', 'read_units', 'write_units'])
+        while minute < end_time.replace(second=0, microsecond=0):
+            writer.writerow([minute.isoformat(), values['read'].get(minute, 0.0), values['write'].get(minute, 0.0)])
+            minute += timedelta(minutes=1)
+            rows += 1
+    print(f"Wrote {rows} minutes of consumed capacity for {table_name} to {path}")
+
+def print_timeline(label, result):
+    """Print the per-minute provisioned capacity next to demand and throttling."""
+    print(f"\n{label} timeline (per minute, units/second):")
+    print(f"{'Minute':>6} {'Provisioned':>11} {'Demand':>8} {'Consumed':>9} {'Throttled units':>16}")
+    for row in result['timeline']:
+        print(f"{row['minute']:>6} {row['capacity']:>11.1f} {row['demand']:>8.1f} "
+              f"{row['consumed']:>9.1f} {row['throttled']:>16.0f}")
+
+def simulate_autoscaling(reads, writes, policies, read_units_per_request=0.5, show_timeline=False):
+    """Run the read and write timelines through each policy and print a comparison."""
+    minutes = len(reads) / 60
+    print(f"Simulating {minutes:.0f} minutes of traffic "
+          f"(peak demand {max(reads, default=0):.1f} RCU/s, {max(writes, default=0):.1f} WCU/s)")
+
+    print(f"\n{'Policy':<56} {'Dim':<5} {'Throttled':>10} {'Throttled reqs':>15} {'Scale out/in':>13} "
+          f"{'Unit-hours':>11} {'Unused':>8} {'Cost':>9} {'Wasted':>9}")
+    for policy in policies:
+        for dimension, demand, units_per_request, price in (
+            ('read', reads, read_units_per_request, RCU_HOUR_PRICE),
+            ('write', writes, 1.0, WCU_HOUR_PRICE)
+        ):
+            result = simulate(demand, policy, units_per_request=units_per_request)
+            print(f"{policy.describe():<56} {dimension:<5} {result['throttled_fraction']:>10.2%} "
+                  f"{result['throttled_requests']:>15.0f} "
+                  f"{result['scale_outs']:>6}/{result['scale_ins']:<6} "
+                  f"{result['provisioned_unit_hours']:>11.1f} {result['unused_unit_hours']:>8.1f} "
+                  f"${result['provisioned_unit_hours'] * price:>8.4f} ${result['unused_unit_hours'] * price:>8.4f}")
+            if show_timeline:
+                print_timeline(f"{policy.describe()} [{dimension}]", result)
+
+    print("\nThrottled: share of demanded capacity units that burst capacity could not absorb.")
+    print("Unused: provisioned unit-hours not consumed; Wasted is their cost at us-east-1 prices.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate target-tracking auto-scaling policies offline.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--profile', help="Load profile file or name in load-profiles/ (default: the Lab 8 ramp)")
+    source.add_argument('--csv', help="Recorded timeline with columns timestamp, read_units, write_units")
+    source.add_argument('--export-cloudwatch', type=float, metavar='HOURS',
+                        help="Record the last HOURS of consumed capacity from CloudWatch to --output and exit")
+    parser.add_argument('--output', default='consumed_capacity.csv', help="CSV file written by --export-cloudwatch")
+    parser.add_argument('--table', default='GameLeaderboard', help="Table to export from CloudWatch")
+    parser.add_argument('--period', type=int, default=60, help="Seconds covered by each CSV row")
+    parser.add_argument('--duration', type=int, default=3600,
+                        help="Seconds to simulate from a profile (caps a final phase without a duration)")
+    parser.add_argument('--targets', type=float, nargs='+', default=[70], help="Target utilizations to compare")
+    parser.add_argument('--min-capacity', type=int, default=5)
+    parser.add_argument('--max-capacity', type=int, default=100)
+    parser.add_argument('--scale-out-cooldown', type=int, default=60, help="Seconds")
+    parser.add_argument('--scale-in-cooldown', type=int, default=60, help="Seconds")
+    parser.add_argument('--metric-delay', type=int, default=60,
+                        help="Seconds before a one-minute datapoint reaches the alarms")
+    parser.add_argument('--update-delay', type=int, default=30, help="Seconds for a capacity change to apply")
+    parser.add_argument('--no-scale-in-limits', action='store_true',
+                        help="Ignore DynamoDB's limit on capacity decreases per day")
+    parser.add_argument('--timeline', action='store_true', help="Print the per-minute timeline of each run")
+    args = parser.parse_args()
+
+    if args.export_cloudwatch:
+        export_consumed_capacity(args.table, args.export_cloudwatch, args.output)
+        sys.exit(0)
+
+    if args.csv:
+        reads, writes = demand_from_csv(args.csv, args.period)
+    else:
+        profile = load_profile(args.profile) if args.profile else validate_profile(ramp_profile())
+        reads, writes = demand_from_profile(profile, args.duration)
+
+    policies = [
+        TargetTrackingPolicy(
+            target=target,
+            min_capacity=args.min_capacity,
+            max_capacity=args.max_capacity,
+            scale_out_cooldown=args.scale_out_cooldown,
+            scale_in_cooldown=args.scale_in_cooldown,
+            metric_delay=args.metric_delay,
+            update_delay=args.update_delay,
+            scale_in_limits=not args.no_scale_in_limits
+        )
+        for target in args.targets
+    ]
+    simulate_autoscaling(reads, writes, policies, show_timeline=args.timeline)
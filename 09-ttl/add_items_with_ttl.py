@@ -6,6 +6,8 @@ import random
 from decimal import Decimal
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import add_game_date_shard, get_game_date_shard_count
+from utils.expiration_index import add_expiry_bucket
 
 def add_items_with_ttl():
     """Add items with various TTL expiration times."""
@@ -28,6 +30,8 @@ def add_items_with_ttl():
     # Game modes for our test data
     game_modes = ['seasonal-event', 'regular-match', 'tournament']
     
+    shard_count = get_game_date_shard_count()
+    
     print("Adding items with different TTL values...")
     
     # Add 5 items for each expiration time
@@ -55,7 +59,7 @@ def add_items_with_ttl():
             }
             
             # Add item to table
-            table.put_item(Item=item)
+            table.put_item(Item=add_expiry_bucket(add_game_date_shard(item, shard_count)))
             
             # Print item details
             expiry_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(expiration_time)) if expiration_time > 0 else 'Never'
@@ -3,6 +3,7 @@ import os
 import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_client
+from utils.expiration_index import get_expiry_bucket_seconds, create_expiration_index, EXPIRATION_INDEX_NAME
 
 def enable_ttl():
     """Enable Time to Live (TTL) on the GameLeaderboard table."""
@@ -18,6 +19,7 @@ def enable_ttl():
     
     if 'TimeToLiveDescription' in ttl_status and ttl_status['TimeToLiveDescription'].get('TimeToLiveStatus') == 'ENABLED':
         print(f"TTL is already enabled on {table_name} with attribute: {ttl_status['TimeToLiveDescription'].get('AttributeName')}")
+        enable_expiration_index(dynamodb, table_name)
         return
     
     # Enable TTL
@@ -44,6 +46,18 @@ def enable_ttl():
         
         print(f"Current TTL status: {status}. Waiting...")
         time.sleep(5)
+    
+    enable_expiration_index(dynamodb, table_name)
+
+def enable_expiration_index(dynamodb, table_name):
+    """Add the sparse expiration index when it is enabled in config.json and the table lacks it."""
+    if not get_expiry_bucket_seconds():
+        return
+    print(f"Creating {EXPIRATION_INDEX_NAME} (this can take a few minutes)...")
+    if create_expiration_index(dynamodb, table_name):
+        print(f"{EXPIRATION_INDEX_NAME} is active.")
+    else:
+        print(f"{EXPIRATION_INDEX_NAME} already exists.")
 
 if __name__ == "__main__":
     enable_ttl()
\ No newline at end of file
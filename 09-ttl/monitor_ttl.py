@@ -1,12 +1,118 @@
 import sys
 import os
 import time
+import bisect
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from boto3.dynamodb.conditions import Key, Attr
+from decimal import Decimal
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.dynamodb_helper import get_dynamodb_resource
+from utils.dynamodb_helper import get_dynamodb_resource, get_shared_dynamodb_client, paginate_with_client
+from utils.expiration_index import query_expiration_times, EXPIRATION_INDEX_NAME
 
-def monitor_ttl():
+TTL_ATTRIBUTE = 'expiration_time'
+
+# Upper edges (seconds from now) and labels of the buckets for items that have not expired yet
+EXPIRATION_BUCKETS = [
+    (600, 'next 10 min'),
+    (3600, '10 min - 1 hour'),
+    (86400, '1 hour - 1 day'),
+    (7 * 86400, '1 - 7 days'),
+    (None, 'more than 7 days')
+]
+
+def count_items_by_expiration(table, current_time, total_segments=1, client=None):
+    """Build a histogram of items by expiration time with a single scan of the table.
+
+    The scan projects only the TTL attribute and follows LastEvaluatedKey,
+    so it counts every item whatever the table size, and each item is read
+    once. With total_segments > 1 the segments are scanned in parallel,
+    through a shared low-level client since boto3 resources are not
+    thread-safe. Items without the attribute, or with 0, count as 'no_ttl'.
+    """
+    client = client or get_shared_dynamodb_client()
+    edges = [edge for edge, _ in EXPIRATION_BUCKETS if edge is not None]
+
+    def scan_segment(segment):
+        buckets = [0] * len(EXPIRATION_BUCKETS)
+        counts = {'expired': 0, 'no_ttl': 0}
+        kwargs = dict(
+            ProjectionExpression='#ttl',
+            ExpressionAttributeNames={'#ttl': TTL_ATTRIBUTE}
+        )
+        if total_segments > 1:
+            kwargs.update(TotalSegments=total_segments, Segment=segment)
+        response = paginate_with_client(client, 'scan', table.name, **kwargs)
+        counts['scanned'] = response['ScannedCount']
+        counts['read_capacity'] = float(response['ConsumedCapacity'])
+        for item in response['Items']:
+            expiration_time = item.get(TTL_ATTRIBUTE)
+            if not isinstance(expiration_time, Decimal) or expiration_time <= 0:
+                counts['no_ttl'] += 1  # missing, 0 or not a number: TTL ignores the item
+            elif expiration_time < current_time:
+                counts['expired'] += 1
+            else:
+                buckets[bisect.bisect_right(edges, expiration_time - current_time)] += 1
+        return counts, buckets
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        results = list(executor.map(scan_segment, range(total_segments)))
+
+    histogram = {'expired': 0, 'no_ttl': 0, 'scanned': 0, 'read_capacity': 0.0}
+    buckets = [0] * len(EXPIRATION_BUCKETS)
+    for counts, segment_buckets in results:
+        for name, value in counts.items():
+            histogram[name] += value
+        buckets = [total + count for total, count in zip(buckets, segment_buckets)]
+    histogram['buckets'] = [(label, count) for (_, label), count in zip(EXPIRATION_BUCKETS, buckets)]
+    histogram['expiring_soon'] = buckets[0]
+    histogram['future'] = sum(buckets[1:])
+    return histogram
+
+def count_items_by_expiration_index(table, current_time, lookback=86400, horizon=86400):
+    """Build the expiration histogram from the sparse expiration index instead of scanning the table.
+
+    Only items expiring between `lookback` seconds ago and `horizon`
+    seconds from now are read; future buckets beyond the horizon and items
+    without a TTL (which are not in the index) are not counted.
+    """
+    result = query_expiration_times(table, current_time - lookback, current_time + horizon)
+    edges = [edge for edge, _ in EXPIRATION_BUCKETS if edge is not None]
+    buckets = [0] * len(EXPIRATION_BUCKETS)
+    expired = 0
+    for expiration_time in result['ExpirationTimes']:
+        if expiration_time < current_time:
+            expired += 1
+        else:
+            buckets[bisect.bisect_right(edges, expiration_time - current_time)] += 1
+
+    # Drop the buckets that start beyond the horizon
+    starts = [0] + edges
+    shown = [index for index, start in enumerate(starts) if start < horizon]
+    return {
+        'expired': expired,
+        'no_ttl': None,
+        'buckets': [(EXPIRATION_BUCKETS[index][1], buckets[index]) for index in shown],
+        'expiring_soon': buckets[0],
+        'future': sum(buckets[1:]),
+        'index_queries': result['Buckets'],
+        'read': len(result['ExpirationTimes']),
+        'read_capacity': result['ConsumedCapacity']
+    }
+
+def print_expiration_histogram(counts):
+    print(f"- Items that should be expired: {counts['expired']}")
+    for label, count in counts['buckets']:
+        print(f"- Expiring in {label}: {count}")
+    if counts['no_ttl'] is not None:
+        print(f"- Items with no TTL: {counts['no_ttl']}")
+    if 'scanned' in counts:
+        print(f"  (one scan: {counts['scanned']} items read, {counts['read_capacity']:.1f} RCUs)")
+    else:
+        print(f"  ({EXPIRATION_INDEX_NAME}: {counts['index_queries']} bucket queries, "
+              f"{counts['read']} items read, {counts['read_capacity']:.1f} RCUs)")
+
+def monitor_ttl(total_segments=1, interval=60, use_index=False, lookback_hours=24, horizon_hours=24):
     """Monitor TTL deletions and metrics."""
     
     # Initialize clients
@@ -23,39 +129,10 @@ def monitor_ttl():
     print(f"=== Monitoring TTL for table: {table_name} ===")
     print(f"Current time: {datetime.fromtimestamp(current_time).strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Count items by expiration status
-    def count_items_by_expiration():
-        # Count items that should be expired (TTL in the past)
-        expired_response = table.scan(
-            FilterExpression=Attr('expiration_time').gt(0) & Attr('expiration_time').lt(current_time),
-            Select='COUNT'
-        )
-        
-        # Count items expiring soon (within next 10 minutes)
-        expiring_soon_response = table.scan(
-            FilterExpression=Attr('expiration_time').gt(current_time) & 
-                            Attr('expiration_time').lt(current_time + 600),
-            Select='COUNT'
-        )
-        
-        # Count items with TTL set but not expiring soon
-        future_response = table.scan(
-            FilterExpression=Attr('expiration_time').gt(current_time + 600),
-            Select='COUNT'
-        )
-        
-        # Count items with no TTL
-        no_ttl_response = table.scan(
-            FilterExpression=Attr('expiration_time').eq(0),
-            Select='COUNT'
-        )
-        
-        return {
-            'expired': expired_response['Count'],
-            'expiring_soon': expiring_soon_response['Count'],
-            'future': future_response['Count'],
-            'no_ttl': no_ttl_response['Count']
-        }
+    def count_items(now):
+        if use_index:
+            return count_items_by_expiration_index(table, now, lookback_hours * 3600, horizon_hours * 3600)
+        return count_items_by_expiration(table, now, total_segments)
     
     # Get TTL deletion metrics from CloudWatch
     def get_ttl_metrics():
@@ -80,11 +157,8 @@ def monitor_ttl():
     
     # Initial count
     print("\nInitial item counts:")
-    counts = count_items_by_expiration()
-    print(f"- Items that should be expired: {counts['expired']}")
-    print(f"- Items expiring soon (next 10 min): {counts['expiring_soon']}")
-    print(f"- Items with future TTL: {counts['future']}")
-    print(f"- Items with no TTL: {counts['no_ttl']}")
+    counts = count_items(current_time)
+    print_expiration_histogram(counts)
     
     # Initial TTL metrics
     print("\nRecent TTL deletion metrics:")
@@ -102,14 +176,13 @@ def monitor_ttl():
     try:
         check_count = 1
         while True:
-            time.sleep(60)  # Check every minute
+            time.sleep(interval)
             
             print(f"\n=== Check #{check_count} at {datetime.now().strftime('%H:%M:%S')} ===")
             
             # Update counts
-            counts = count_items_by_expiration()
-            print(f"- Items that should be expired: {counts['expired']}")
-            print(f"- Items expiring soon (next 10 min): {counts['expiring_soon']}")
+            counts = count_items(int(time.time()))
+            print_expiration_histogram(counts)
             
             # Update TTL metrics
             ttl_metrics = get_ttl_metrics()
@@ -125,4 +198,16 @@ def monitor_ttl():
         print("\nMonitoring stopped.")
 
 if __name__ == "__main__":
-    monitor_ttl()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Monitor items by expiration time and TTL deletions.")
+    parser.add_argument('--segments', type=int, default=1,
+                        help="Scan the table in this many parallel segments (default: 1)")
+    parser.add_argument('--interval', type=int, default=60, help="Seconds between checks (default: 60)")
+    parser.add_argument('--use-index', action='store_true',
+                        help=f"Query {EXPIRATION_INDEX_NAME} for expiring items instead of scanning the table")
+    parser.add_argument('--lookback-hours', type=float, default=24,
+                        help="With --use-index, count expired items back this far (default: 24)")
+    parser.add_argument('--horizon-hours', type=float, default=24,
+                        help="With --use-index, count items expiring up to this far ahead (default: 24)")
+    args = parser.parse_args()
+    
+    monitor_ttl(args.segments, args.interval, args.use_index, args.lookback_hours, args.horizon_hours)
\ No newline at end of file
@@ -3,9 +3,11 @@ import os
 import time
 import json
 from decimal import Decimal
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.batch_reader import MicroBatchReader
+from utils.batch_operations import MAX_BATCH_GET_KEYS, batch_get_items
 
 class DecimalEncoder(json.JSONEncoder):
     """Helper class to convert Decimal to float for JSON serialization."""
@@ -37,69 +39,34 @@ def get_sample_keys(count=10):
     
     return keys
 
-def batch_get_with_retry(keys):
-    """Retrieve multiple items using BatchGetItem with retry for unprocessed keys."""
+def batch_get_with_retry(keys, max_workers=8):
+    """Retrieve any number of items using chunked, parallel BatchGetItem with retry for unprocessed keys."""
     
     dynamodb = get_dynamodb_resource()
     
     # Start timing
     start_time = time.time()
     
-    # Prepare keys for batch get
-    keys_to_get = keys.copy()
-    total_keys = len(keys_to_get)
-    items_retrieved = []
-    retries = 0
-    
-    print(f"Retrieving {total_keys} items using BatchGetItem...")
-    
-    while keys_to_get:
-        try:
-            # Perform batch get
-            response = dynamodb.batch_get_item(
-                RequestItems={
-                    'GameLeaderboard': {
-                        'Keys': keys_to_get
-                    }
-                },
-                ReturnConsumedCapacity='TOTAL'
-            )
-            
-            # Process retrieved items
-            if 'GameLeaderboard' in response['Responses']:
-                items_retrieved.extend(response['Responses']['GameLeaderboard'])
-            
-            # Handle unprocessed keys
-            unprocessed = response.get('UnprocessedKeys', {}).get('GameLeaderboard', {}).get('Keys', [])
-            if unprocessed:
-                retries += 1
-                print(f"Got {len(unprocessed)} unprocessed keys, retrying...")
-                
-                # Update keys to get
-                keys_to_get = unprocessed
-                
-                # Exponential backoff
-                time.sleep(min(0.1 * (2 ** retries), 1.0))
-            else:
-                # All keys processed
-                keys_to_get = []
-            
-            # Print consumed capacity
-            if 'ConsumedCapacity' in response:
-                for capacity in response['ConsumedCapacity']:
-                    print(f"Consumed capacity: {capacity['CapacityUnits']} RCUs")
-            
-        except ClientError as e:
-            print(f"Error: {e.response['Error']['Message']}")
-            retries += 1
-            time.sleep(min(0.1 * (2 ** retries), 1.0))
+    total_keys = len(keys)
+    
+    print(f"Retrieving {total_keys} items using BatchGetItem "
+          f"(chunks of up to {MAX_BATCH_GET_KEYS} keys, {max_workers} workers)...")
+    
+    # Keys are de-duplicated, split into chunks of at most 100 keys and
+    # fetched concurrently; each chunk retries its own unprocessed keys
+    response = batch_get_items(dynamodb, 'GameLeaderboard', keys, max_workers=max_workers)
+    items_retrieved = response['Items']
     
     # Calculate execution time
     execution_time = time.time() - start_time
     
     print(f"\nBatch get completed:")
     print(f"- {len(items_retrieved)} items retrieved")
-    print(f"- {retries} retries needed")
+    print(f"- {response['Requests']} BatchGetItem requests")
+    print(f"- {response['Retries']} retries needed")
+    print(f"- Consumed capacity: {response['ConsumedCapacity']} RCUs")
+    if response['UnprocessedKeys']:
+        print(f"- {len(response['UnprocessedKeys'])} keys still unprocessed after retries")
     print(f"- {execution_time:.2f} seconds total")
     
     return items_retrieved, execution_time
@@ -132,6 +99,35 @@ def individual_gets(keys):
     
     return items_retrieved, execution_time
 
+def micro_batched_gets(keys, callers=20):
+    """Retrieve items with per-key get_item calls that are micro-batched behind the scenes."""
+    
+    dynamodb = get_dynamodb_resource()
+    
+    # Start timing
+    start_time = time.time()
+    
+    print(f"\nRetrieving {len(keys)} items with per-key calls from {callers} concurrent callers...")
+    
+    # Each caller keeps its one-key-at-a-time code; the reader groups
+    # calls arriving within 5 ms into a single BatchGetItem
+    with MicroBatchReader(dynamodb, 'GameLeaderboard', window=0.005) as reader:
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            responses = list(executor.map(lambda key: reader.get_item(Key=key), keys))
+        stats = reader.stats
+    
+    items_retrieved = [response['Item'] for response in responses if 'Item' in response]
+    
+    # Calculate execution time
+    execution_time = time.time() - start_time
+    
+    print(f"\nMicro-batched gets completed:")
+    print(f"- {len(items_retrieved)} items retrieved")
+    print(f"- {stats['batches']} BatchGetItem requests for {stats['requests']} get_item calls")
+    print(f"- {execution_time:.2f} seconds total")
+    
+    return items_retrieved, execution_time
+
 def compare_batch_vs_individual():
     """Compare batch gets vs individual gets."""
     
@@ -150,12 +146,17 @@ def compare_batch_vs_individual():
     print("\n=== Individual Get Test ===")
     individual_items, individual_time = individual_gets(keys)
     
+    # Perform micro-batched gets
+    print("\n=== Micro-batched Get Test ===")
+    micro_items, micro_time = micro_batched_gets(keys)
+    
     # Compare results
     speedup = individual_time / batch_time if batch_time > 0 else 0
     
     print("\n=== Performance Comparison ===")
     print(f"Batch get time: {batch_time:.2f} seconds")
     print(f"Individual get time: {individual_time:.2f} seconds")
+    print(f"Micro-batched get time: {micro_time:.2f} seconds")
     print(f"Batch gets are {speedup:.2f}x faster")
     
     # Show sample of retrieved items
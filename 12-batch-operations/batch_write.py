@@ -4,9 +4,11 @@ import time
 import uuid
 import random
 from decimal import Decimal
-from botocore.exceptions import ClientError
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import add_game_date_shard, get_game_date_shard_count
+from utils.daily_leaderboard import get_daily_leaderboard_aggregator
+from utils.batch_operations import MAX_BATCH_WRITE_REQUESTS, BatchWriteEngine
 
 def generate_game_records(count):
     """Generate multiple game records for batch writing."""
@@ -15,6 +17,7 @@ def generate_game_records(count):
     achievements = ["FirstBlood", "DoubleKill", "TripleKill", "Headshot", "Survivor"]
     
     records = []
+    shard_count = get_game_date_shard_count()
     
     for i in range(count):
         player_id = f"batch-p{uuid.uuid4().hex[:8]}"
@@ -33,12 +36,12 @@ def generate_game_records(count):
             'last_updated': time.strftime("%Y-%m-%dT%H:%M:%SZ")
         }
         
-        records.append(record)
+        records.append(add_game_date_shard(record, shard_count))
     
     return records
 
-def batch_write_with_retry(records):
-    """Write records in batches with retry for unprocessed items."""
+def batch_write_with_retry(records, max_workers=4):
+    """Write records with pipelined, concurrent BatchWriteItem calls and retry for unprocessed items."""
     
     dynamodb = get_dynamodb_resource()
     table = dynamodb.Table('GameLeaderboard')
@@ -46,69 +49,41 @@ def batch_write_with_retry(records):
     # Start timing
     start_time = time.time()
     
-    # Prepare items for batch write
-    items_to_write = records.copy()
-    batch_size = 25  # Maximum batch size for BatchWriteItem
-    total_items = len(items_to_write)
-    items_processed = 0
-    retries = 0
+    total_items = len(records)
     
-    print(f"Writing {total_items} items in batches of {batch_size}...")
+    print(f"Writing {total_items} items in batches of up to {MAX_BATCH_WRITE_REQUESTS} "
+          f"with {max_workers} requests in flight...")
     
-    while items_to_write:
-        # Take up to batch_size items
-        batch_items = items_to_write[:batch_size]
-        items_to_write = items_to_write[batch_size:]
-        
-        # Prepare batch request
-        batch_request = {
-            table.name: [
-                {
-                    'PutRequest': {
-                        'Item': item
-                    }
-                }
-                for item in batch_items
-            ]
-        }
-        
-        try:
-            # Perform batch write
-            response = dynamodb.batch_write_item(
-                RequestItems=batch_request,
-                ReturnConsumedCapacity='TOTAL'
-            )
-            
-            # Handle unprocessed items
-            unprocessed = response.get('UnprocessedItems', {}).get(table.name, [])
-            if unprocessed:
-                retries += 1
-                print(f"Got {len(unprocessed)} unprocessed items, retrying...")
-                
-                # Add unprocessed items back to the queue
-                unprocessed_items = [item['PutRequest']['Item'] for item in unprocessed]
-                items_to_write = unprocessed_items + items_to_write
-                
-                # Exponential backoff
-                time.sleep(min(0.1 * (2 ** retries), 1.0))
-            
-            # Update progress
-            items_processed += len(batch_items) - len(unprocessed)
-            print(f"Progress: {items_processed}/{total_items} items processed")
-            
-        except ClientError as e:
-            print(f"Error: {e.response['Error']['Message']}")
-            # Add items back to the queue
-            items_to_write = batch_items + items_to_write
-            retries += 1
-            time.sleep(min(0.1 * (2 ** retries), 1.0))
+    def print_progress(stats):
+        print(f"Progress: {stats['written']}/{total_items} items processed")
+    
+    # Requests are queued in a deque, packed into batches under the 25-request
+    # and 16 MB limits and sent concurrently; unprocessed items are retried
+    # as their own batch after a jittered backoff
+    engine = BatchWriteEngine(
+        dynamodb, table.name,
+        key_attributes=['player_id', 'game_id'],
+        max_workers=max_workers,
+        on_progress=print_progress
+    )
+    stats = engine.put_items(records)
     
     # Calculate execution time
     execution_time = time.time() - start_time
     
+    # Keep the materialized daily leaderboards in sync
+    aggregator = get_daily_leaderboard_aggregator(dynamodb)
+    if aggregator:
+        aggregator.record_games(records)
+    
     print(f"\nBatch write completed:")
-    print(f"- {total_items} items written")
-    print(f"- {retries} retries needed")
+    print(f"- {stats['written']} items written")
+    print(f"- {stats['batches']} BatchWriteItem requests, {stats['retries']} retries needed")
+    print(f"- Attempts per batch: {dict(sorted(stats['attempts_per_batch'].items()))}")
+    if stats['duplicates']:
+        print(f"- {stats['duplicates']} duplicate keys collapsed")
+    if stats['failed']:
+        print(f"- {len(stats['failed'])} items failed: {stats['failed'][0]['error']}")
     print(f"- {execution_time:.2f} seconds total")
     print(f"- {total_items / execution_time:.2f} items/second")
     
@@ -0,0 +1,50 @@
+import sys
+import os
+import argparse
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.dynamodb_helper import get_dynamodb_client
+from utils.hot_partitions import HotPartitionTracker
+from utils.load_profiles import run_profile
+from generate_traffic import generate_game_record
+
+def analyze_live(profile, top_k, sample_rate, log_path):
+    """Replay a load profile while sampling per-partition traffic, then report the hottest keys."""
+    
+    client = get_dynamodb_client()
+    tracker = HotPartitionTracker(
+        partition_keys={'GameLeaderboard': 'player_id'},
+        sample_rate=sample_rate,
+        log_path=log_path
+    )
+    tracker.attach(client)
+    
+    print(f"Sampling {sample_rate:.0%} of requests per partition key...")
+    try:
+        run_profile(profile, generate_game_record, client)
+    finally:
+        tracker.close()
+    
+    tracker.report(top_k)
+    if log_path:
+        print(f"\nSampled requests were appended to {log_path}; re-analyze with --log {log_path}")
+
+def analyze_log(log_path, top_k):
+    """Report the hottest partition keys recorded in a JSON-lines request log."""
+    print(f"Analyzing request log {log_path}...")
+    HotPartitionTracker.from_log(log_path).report(top_k)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find hot partition keys from live traffic or a request log.")
+    parser.add_argument('--profile', default='hot-players',
+                        help="Load profile to replay while sampling (default: hot-players)")
+    parser.add_argument('--log', help="Analyze an existing JSON-lines request log instead of generating traffic")
+    parser.add_argument('--write-log', help="Append sampled requests to this JSON-lines file")
+    parser.add_argument('--sample-rate', type=float, default=1.0, help="Fraction of requests to sample")
+    parser.add_argument('--top', type=int, default=10, help="Number of partition keys to report")
+    args = parser.parse_args()
+    
+    print("=== Hot Partition Analysis ===")
+    if args.log:
+        analyze_log(args.log, args.top)
+    else:
+        analyze_live(args.profile, args.top, args.sample_rate, args.write_log)
@@ -0,0 +1,85 @@
+import sys
+import os
+import math
+import argparse
+from datetime import datetime, timedelta
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from utils.instrumentation import get_latency_recorder, enable_instrumentation, LatencyRecorder
+from utils.load_profiles import run_profile
+from utils.cloudwatch_metrics import metric_query, fetch_metric_data
+from generate_traffic import generate_game_record
+
+def compare_with_cloudwatch(recorder, start_time, end_time):
+    """Print client-side p50/p99 next to CloudWatch's SuccessfulRequestLatency for the same operations."""
+    import boto3
+    cloudwatch = boto3.client('cloudwatch')
+    # Base-table calls only: CloudWatch reports latency per table and operation
+    histograms = {
+        (operation, table): histogram
+        for (operation, table, index), histogram in recorder.snapshot().items()
+        if index == '-' and table != '-' and ',' not in table
+    }
+
+    # One period spanning the whole run gives one percentile per operation, all in a single request
+    start_time = start_time.replace(second=0, microsecond=0)
+    period = math.ceil((end_time - start_time).total_seconds() / 60) * 60
+    end_time = start_time + timedelta(seconds=period)
+    queries = []
+    for number, (operation, table) in enumerate(histograms):
+        for stat in ('p50', 'p99'):
+            queries.append(metric_query(f"op{number}_{stat}", 'SuccessfulRequestLatency',
+                                        {'TableName': table, 'Operation': operation}, stat, period=period))
+    series = fetch_metric_data(cloudwatch, queries, start_time, end_time) if queries else {}
+
+    print("\n=== Client-side vs CloudWatch (ms) ===")
+    print(f"{'Operation':<20} {'Table':<18} {'Client p50':>11} {'Client p99':>11} {'CW p50':>8} {'CW p99':>8}")
+    for number, ((operation, table), histogram) in enumerate(histograms.items()):
+        summary = histogram.snapshot()
+        cloudwatch_values = []
+        for stat in ('p50', 'p99'):
+            points = series.get(f"op{number}_{stat}")
+            cloudwatch_values.append(f"{points[-1][1]:.1f}" if points else "-")
+        print(f"{operation:<20} {table:<18} {summary['p50'] * 1000:>11.1f} {summary['p99'] * 1000:>11.1f} "
+              f"{cloudwatch_values[0]:>8} {cloudwatch_values[1]:>8}")
+    print("\nCloudWatch measures time inside DynamoDB only; the difference is client, network and retry time.")
+    print("CloudWatch datapoints can take a few minutes to appear.")
+
+def measure_client_latency(profile='cloudwatch-mix', interval=30, dump_path=None):
+    """Replay a load profile while the latency recorder prints percentiles every `interval` seconds."""
+    enable_instrumentation()
+    recorder = get_latency_recorder()
+    recorder.reset()
+    recorder.start_periodic_dump(interval, dump_path)
+    start_time = datetime.utcnow()
+    try:
+        run_profile(profile, generate_game_record)
+    finally:
+        recorder.stop_periodic_dump()
+    end_time = datetime.utcnow()
+
+    recorder.report()
+    if dump_path:
+        recorder.dump(dump_path)
+        print(f"\nHistograms written to {dump_path}")
+    return recorder, start_time, end_time
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure end-to-end DynamoDB latency as the client sees it.")
+    parser.add_argument('--profile', default='cloudwatch-mix',
+                        help="Load profile file or name in load-profiles/ (default: cloudwatch-mix)")
+    parser.add_argument('--interval', type=float, default=30, help="Seconds between percentile reports")
+    parser.add_argument('--dump', help="Append histogram dumps to this JSON-lines file")
+    parser.add_argument('--merge', nargs='+', metavar='DUMP',
+                        help="Merge dumps written by one or more processes and print the combined percentiles")
+    parser.add_argument('--compare', action='store_true',
+                        help="After the run, compare with CloudWatch SuccessfulRequestLatency")
+    args = parser.parse_args()
+
+    if args.merge:
+        LatencyRecorder.from_dumps(args.merge).report("Client-side Latency (merged dumps)")
+        sys.exit(0)
+
+    print("=== Measuring Client-side Latency ===")
+    recorder, start_time, end_time = measure_client_latency(args.profile, args.interval, args.dump)
+    if args.compare:
+        compare_with_cloudwatch(recorder, start_time - timedelta(minutes=1), end_time + timedelta(minutes=1))
@@ -82,6 +82,29 @@ def create_dynamodb_alarms():
                     'Value': 'GetItem'
                 }
             ]
+        },
+        {
+            # Published by utils/metric_publisher.py when metric_publisher is enabled in config.json
+            'name': f"{table_name}-HighClientLatency",
+            'description': 'Alarm when client-side p99 latency (including network and retries) is high',
+            'namespace': 'GameLeaderboard/Client',
+            'metric_name': 'ClientLatencyP99',
+            'threshold': 100,  # 100ms
+            'comparison_operator': 'GreaterThanThreshold',
+            'evaluation_periods': 3,
+            'period': 60,
+            'statistic': 'Maximum',
+            'treat_missing_data': 'notBreaching',
+            'dimensions': [
+                {
+                    'Name': 'Operation',
+                    'Value': 'GetItem'
+                },
+                {
+                    'Name': 'Table',
+                    'Value': table_name
+                }
+            ]
         }
     ]
     
@@ -101,7 +124,7 @@ def create_dynamodb_alarms():
                 AlarmDescription=alarm['description'],
                 ActionsEnabled=False,  # No actions for this demo
                 MetricName=alarm['metric_name'],
-                Namespace='AWS/DynamoDB',
+                Namespace=alarm.get('namespace', 'AWS/DynamoDB'),
                 Statistic=alarm['statistic'],
                 Dimensions=dimensions,
                 Period=alarm['period'],
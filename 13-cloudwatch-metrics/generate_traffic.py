@@ -3,18 +3,18 @@ import os
 import time
 import uuid
 import random
-import threading
+import argparse
 from decimal import Decimal
-from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from utils.dynamodb_helper import get_dynamodb_resource
+from utils.game_date_shards import add_game_date_shard
+from utils.load_profiles import run_profile
 
 def generate_game_record():
     """Generate a random game record."""
     player_id = f"p{uuid.uuid4().hex[:8]}"
     game_id = f"g{uuid.uuid4().hex[:8]}"
     
-    return {
+    return add_game_date_shard({
         'player_id': player_id,
         'game_id': game_id,
         'player_name': f"Player{random.randint(1, 999)}",
@@ -26,112 +26,26 @@ def generate_game_record():
         'game_mode': random.choice(['battle-royale', 'team-deathmatch', 'capture-the-flag']),
         'expiration_time': Decimal('0'),
         'last_updated': time.strftime("%Y-%m-%dT%H:%M:%SZ")
-    }
+    })
 
-def write_items(dynamodb, count):
-    """Write items to the table."""
-    table = dynamodb.Table('GameLeaderboard')
+def generate_traffic(profile='cloudwatch-mix'):
+    """Generate mixed traffic to produce various CloudWatch metrics.
     
-    for _ in range(count):
-        item = generate_game_record()
-        table.put_item(Item=item)
-
-def read_items(dynamodb, count):
-    """Read random items from the table."""
-    table = dynamodb.Table('GameLeaderboard')
-    
-    # Get some sample keys
-    response = table.scan(Limit=min(count, 20), ProjectionExpression="player_id, game_id")
-    items = response.get('Items', [])
-    
-    if not items:
-        print("No items found in table. Cannot perform reads.")
-        return
-    
-    # Perform reads
-    for _ in range(count):
-        item = random.choice(items)
-        table.get_item(Key={
-            'player_id': item['player_id'],
-            'game_id': item['game_id']
-        })
-
-def scan_items(dynamodb):
-    """Perform scan operations."""
-    table = dynamodb.Table('GameLeaderboard')
-    table.scan(Limit=50)
-
-def query_items(dynamodb):
-    """Perform query operations."""
-    table = dynamodb.Table('GameLeaderboard')
-    
-    # Get a sample player_id
-    response = table.scan(Limit=1, ProjectionExpression="player_id")
-    items = response.get('Items', [])
-    
-    if not items:
-        print("No items found in table. Cannot perform query.")
-        return
-    
-    player_id = items[0]['player_id']
-    
-    # Query by player_id
-    table.query(
-        KeyConditionExpression="player_id = :pid",
-        ExpressionAttributeValues={
-            ":pid": player_id
-        }
-    )
-
-def generate_traffic():
-    """Generate mixed traffic to produce various CloudWatch metrics."""
-    
-    dynamodb = get_dynamodb_resource()
+    Replays a load profile from load-profiles/. The default, cloudwatch-mix,
+    runs 5 minutes of 50% reads, 30% writes, 10% scans and 10% queries.
+    """
     
     print("Starting traffic generation for CloudWatch metrics...")
-    print("This will run for 5 minutes. Press Ctrl+C to stop early.")
-    
-    try:
-        # Run for 5 minutes
-        end_time = time.time() + 300  # 5 minutes
-        
-        while time.time() < end_time:
-            # Mix of operations
-            operations = [
-                # Operation type, weight
-                ("read", 50),    # 50% reads
-                ("write", 30),   # 30% writes
-                ("scan", 10),    # 10% scans
-                ("query", 10)    # 10% queries
-            ]
-            
-            # Select operation based on weights
-            op_types, weights = zip(*operations)
-            operation = random.choices(op_types, weights=weights, k=1)[0]
-            
-            # Perform selected operation
-            if operation == "read":
-                read_items(dynamodb, random.randint(5, 15))
-            elif operation == "write":
-                write_items(dynamodb, random.randint(3, 8))
-            elif operation == "scan":
-                scan_items(dynamodb)
-            elif operation == "query":
-                query_items(dynamodb)
-            
-            # Short pause between operations
-            time.sleep(0.5)
-            
-            # Print progress
-            remaining = int(end_time - time.time())
-            print(f"Generated {operation} traffic. {remaining} seconds remaining...", end="\r")
-            
-    except KeyboardInterrupt:
-        print("\nTraffic generation stopped.")
+    run_profile(profile, generate_game_record)
     
     print("\nTraffic generation complete. CloudWatch metrics should now be available.")
     print("Run 'python view_metrics.py' to see the metrics.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate traffic for CloudWatch metrics from a load profile.")
+    parser.add_argument('--profile', default='cloudwatch-mix',
+                        help="Load profile file or name in load-profiles/ (default: cloudwatch-mix)")
+    args = parser.parse_args()
+    
     print("=== Generating Traffic for CloudWatch Metrics ===")
-    generate_traffic()
\ No newline at end of file
+    generate_traffic(args.profile)
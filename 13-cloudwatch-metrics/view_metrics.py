@@ -2,12 +2,45 @@ import sys
 import os
 import time
 from datetime import datetime, timedelta
-import json
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from utils.dynamodb_helper import get_dynamodb_client
+from utils.cloudwatch_metrics import metric_query, expression_query, fetch_metric_data
+
+# Operations whose SuccessfulRequestLatency is shown as p50/p99
+LATENCY_OPERATIONS = [
+    'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+    'BatchGetItem', 'BatchWriteItem', 'TransactGetItems', 'TransactWriteItems'
+]
+
+def build_metric_queries(table_name):
+    """All queries for the report: capacity and throttle metrics, utilization math and latency percentiles."""
+    table = {'TableName': table_name}
+    queries = [
+        metric_query('consumedRead', 'ConsumedReadCapacityUnits', table, 'Sum', label='Read capacity units consumed'),
+        metric_query('consumedWrite', 'ConsumedWriteCapacityUnits', table, 'Sum', label='Write capacity units consumed'),
+        metric_query('provisionedRead', 'ProvisionedReadCapacityUnits', table, 'Average', return_data=False),
+        metric_query('provisionedWrite', 'ProvisionedWriteCapacityUnits', table, 'Average', return_data=False),
+        # Consumed capacity is summed per minute, provisioned capacity is per second
+        expression_query('readUtilization', '100 * consumedRead / (provisionedRead * 60)',
+                         label='Read capacity utilization'),
+        expression_query('writeUtilization', '100 * consumedWrite / (provisionedWrite * 60)',
+                         label='Write capacity utilization'),
+        metric_query('readThrottles', 'ReadThrottleEvents', table, 'Sum', label='Throttled read requests'),
+        metric_query('writeThrottles', 'WriteThrottleEvents', table, 'Sum', label='Throttled write requests')
+    ]
+    for operation in LATENCY_OPERATIONS:
+        for stat in ('p50', 'p99'):
+            queries.append(metric_query(f"{operation.lower()}_{stat}", 'SuccessfulRequestLatency',
+                                        {**table, 'Operation': operation}, stat))
+    return queries
 
 def get_dynamodb_metrics():
-    """Retrieve and display DynamoDB CloudWatch metrics."""
+    """Retrieve and display DynamoDB CloudWatch metrics.
+    
+    Everything comes from one GetMetricData request (paged over NextToken):
+    capacity and throttle metrics, utilization computed with metric math,
+    and p50/p99 SuccessfulRequestLatency for every operation.
+    """
     
     # Initialize CloudWatch client
     import boto3
@@ -23,93 +56,45 @@ def get_dynamodb_metrics():
     print(f"=== DynamoDB CloudWatch Metrics for {table_name} ===")
     print(f"Time range: {start_time.strftime('%H:%M:%S')} to {end_time.strftime('%H:%M:%S')} UTC")
     
-    # Define metrics to retrieve
-    metrics = [
-        {
-            'name': 'ConsumedReadCapacityUnits',
-            'stat': 'Sum',
-            'unit': 'Count',
-            'description': 'Read capacity units consumed'
-        },
-        {
-            'name': 'ConsumedWriteCapacityUnits',
-            'stat': 'Sum',
-            'unit': 'Count',
-            'description': 'Write capacity units consumed'
-        },
-        {
-            'name': 'ReadThrottleEvents',
-            'stat': 'Sum',
-            'unit': 'Count',
-            'description': 'Throttled read requests'
-        },
-        {
-            'name': 'WriteThrottleEvents',
-            'stat': 'Sum',
-            'unit': 'Count',
-            'description': 'Throttled write requests'
-        },
-        {
-            'name': 'SuccessfulRequestLatency',
-            'stat': 'Average',
-            'unit': 'Milliseconds',
-            'description': 'Average request latency',
-            'operation': 'GetItem'
-        },
-        {
-            'name': 'SuccessfulRequestLatency',
-            'stat': 'Average',
-            'unit': 'Milliseconds',
-            'description': 'Average request latency',
-            'operation': 'PutItem'
-        }
-    ]
+    queries = build_metric_queries(table_name)
+    series = fetch_metric_data(cloudwatch, queries, start_time, end_time)
     
-    # Retrieve and display each metric
-    for metric in metrics:
-        dimensions = [{'Name': 'TableName', 'Value': table_name}]
-        
-        # Add Operation dimension if specified
-        if 'operation' in metric:
-            dimensions.append({'Name': 'Operation', 'Value': metric['operation']})
-            print(f"\n--- {metric['description']} ({metric['operation']}) ---")
-        else:
-            print(f"\n--- {metric['description']} ---")
-        
-        response = cloudwatch.get_metric_statistics(
-            Namespace='AWS/DynamoDB',
-            MetricName=metric['name'],
-            Dimensions=dimensions,
-            StartTime=start_time,
-            EndTime=end_time,
-            Period=60,  # 1-minute periods
-            Statistics=[metric['stat']]
-        )
-        
-        datapoints = response['Datapoints']
+    units = {'readUtilization': '%', 'writeUtilization': '%'}
+    for query in queries:
+        if 'Label' not in query:
+            continue
+        print(f"\n--- {query['Label']} ---")
+        datapoints = series[query['Id']]
         
         if not datapoints:
             print("No data available for this metric in the specified time range.")
             continue
         
-        # Sort datapoints by timestamp
-        datapoints.sort(key=lambda x: x['Timestamp'])
+        unit = units.get(query['Id'], 'Count')
         
         # Display the most recent datapoints
-        print(f"Recent values ({metric['stat']}):")
-        for point in datapoints[-5:]:  # Show last 5 datapoints
-            timestamp = point['Timestamp'].strftime('%H:%M:%S')
-            value = point[metric['stat']]
-            print(f"  {timestamp}: {value:.2f} {metric['unit']}")
+        print("Recent values:")
+        for timestamp, value in datapoints[-5:]:  # Show last 5 datapoints
+            print(f"  {timestamp.strftime('%H:%M:%S')}: {value:.2f} {unit}")
         
         # Calculate and display statistics
-        if datapoints:
-            values = [point[metric['stat']] for point in datapoints]
-            max_value = max(values)
-            avg_value = sum(values) / len(values)
-            
-            print(f"Maximum: {max_value:.2f} {metric['unit']}")
-            print(f"Average: {avg_value:.2f} {metric['unit']}")
+        values = [value for _, value in datapoints]
+        print(f"Maximum: {max(values):.2f} {unit}")
+        print(f"Average: {sum(values) / len(values):.2f} {unit}")
+    
+    print("\n--- Successful request latency (ms, per minute) ---")
+    print(f"{'Operation':<20} {'Latest p50':>11} {'Latest p99':>11} {'Worst p99':>10}")
+    shown = 0
+    for operation in LATENCY_OPERATIONS:
+        p50 = series[f"{operation.lower()}_p50"]
+        p99 = series[f"{operation.lower()}_p99"]
+        if not p99:
+            continue
+        shown += 1
+        print(f"{operation:<20} {p50[-1][1] if p50 else 0:>11.2f} {p99[-1][1]:>11.2f} "
+              f"{max(value for _, value in p99):>10.2f}")
+    if not shown:
+        print("No latency data available in the specified time range.")
     
     print("\n=== Provisioned Capacity ===")
     
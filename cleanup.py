@@ -1,32 +1,70 @@
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 sys.path.append(os.path.dirname(__file__))
 from utils.dynamodb_helper import get_dynamodb_client
 import boto3
 
+def wait_for_deletions(dynamodb, table_names, poll_interval=5):
+    """Wait for several table deletions at once, printing which tables are still pending."""
+    
+    start_time = time.time()
+    success = True
+    
+    def wait_for(table_name):
+        waiter = dynamodb.get_waiter('table_not_exists')
+        waiter.wait(TableName=table_name)
+        return table_name
+    
+    with ThreadPoolExecutor(max_workers=len(table_names)) as executor:
+        pending = {executor.submit(wait_for, table_name): table_name for table_name in table_names}
+        
+        while pending:
+            done, _ = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            elapsed = time.time() - start_time
+            
+            for future in done:
+                table_name = pending.pop(future)
+                try:
+                    future.result()
+                    print(f"Table {table_name} deleted successfully. ({elapsed:.0f}s)")
+                except Exception as e:
+                    print(f"Error waiting for table {table_name} to be deleted: {e}")
+                    success = False
+            
+            if pending and not done:
+                print(f"Still deleting: {', '.join(sorted(pending.values()))} ({elapsed:.0f}s)")
+    
+    return success
+
 def cleanup_dynamodb_tables():
-    """Clean up DynamoDB tables."""
+    """Clean up DynamoDB tables.
+    
+    All deletions are issued up front and awaited together, so teardown takes
+    as long as the slowest table rather than the sum of all of them.
+    """
     print("=== Cleaning up DynamoDB Tables ===")
     
     dynamodb = get_dynamodb_client()
-    tables_to_delete = ['GameLeaderboard', 'PlayerInventory', 'GameAchievements']
+    tables_to_delete = ['GameLeaderboard', 'PlayerInventory', 'GameAchievements', 'DailyLeaderboard']
     
+    deleting = []
+    success = True
     for table_name in tables_to_delete:
         try:
-            dynamodb.describe_table(TableName=table_name)
-            print(f"Deleting table: {table_name}...")
             dynamodb.delete_table(TableName=table_name)
-            
-            waiter = dynamodb.get_waiter('table_not_exists')
-            waiter.wait(TableName=table_name)
-            print(f"Table {table_name} deleted successfully.")
+            print(f"Deleting table: {table_name}...")
+            deleting.append(table_name)
         except dynamodb.exceptions.ResourceNotFoundException:
             print(f"Table {table_name} does not exist.")
         except Exception as e:
             print(f"Error deleting table {table_name}: {e}")
-            return False
-    return True
+            success = False
+    
+    if deleting:
+        success &= wait_for_deletions(dynamodb, deleting)
+    return success
 
 def cleanup_cloudwatch_alarms():
     """Clean up CloudWatch alarms created in Lab 13."""
@@ -40,7 +78,8 @@ def cleanup_cloudwatch_alarms():
         f"{table_name}-HighWriteCapacity",
         f"{table_name}-ReadThrottles",
         f"{table_name}-WriteThrottles",
-        f"{table_name}-HighLatency"
+        f"{table_name}-HighLatency",
+        f"{table_name}-HighClientLatency"
     ]
     
     try:
@@ -103,10 +142,14 @@ def cleanup_resources():
     
     print("=== Comprehensive Cleanup of DynamoDB Demo Resources ===")
     
-    success = True
-    success &= cleanup_dynamodb_tables()
-    success &= cleanup_cloudwatch_alarms()
-    success &= cleanup_autoscaling()
+    # The three cleanups touch independent services, so run them side by side
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(cleanup_dynamodb_tables),
+            executor.submit(cleanup_cloudwatch_alarms),
+            executor.submit(cleanup_autoscaling)
+        ]
+        success = all([future.result() for future in futures])
     
     if success:
         print("\n=== Cleanup Complete ===")
@@ -0,0 +1,140 @@
+import sys
+import os
+import time
+import queue
+import argparse
+import threading
+from functools import reduce
+from boto3.dynamodb.conditions import Attr
+sys.path.append(os.path.dirname(__file__))
+from utils.dynamodb_helper import get_dynamodb_resource, get_shared_dynamodb_client, iterate_pages_with_client
+from utils.batch_operations import BatchWriteEngine
+from utils.rate_limiter import TokenBucket
+
+# Key prefixes used by the labs for synthetic test data
+DEFAULT_PREFIXES = ['batch-p', 'ttl-p', 'cond-', 'del-', 'partiql_player']
+
+_DONE = object()
+
+def scan_matching_keys(table_name, key_attributes, prefixes, total_segments, key_queue, stats, client=None):
+    """Parallel-scan the table for keys whose partition key starts with a prefix and queue them.
+    
+    The segment threads share a low-level client; a shared Table resource
+    is not thread-safe when building the filter expression.
+    """
+    
+    client = client or get_shared_dynamodb_client()
+    partition_key = key_attributes[0]
+    filter_expression = reduce(
+        lambda left, right: left | right,
+        [Attr(partition_key).begins_with(prefix) for prefix in prefixes]
+    )
+    names = {f"#k{i}": name for i, name in enumerate(key_attributes)}
+    
+    def scan_segment(segment):
+        kwargs = dict(
+            TotalSegments=total_segments,
+            Segment=segment,
+            ProjectionExpression=', '.join(names),
+            ExpressionAttributeNames=names,
+            FilterExpression=filter_expression
+        )
+        try:
+            for response in iterate_pages_with_client(client, 'scan', table_name, **kwargs):
+                with stats['lock']:
+                    stats['scanned'] += response['ScannedCount']
+                    stats['matched'] += response['Count']
+                    stats['read_capacity'] += response['ConsumedCapacity']['CapacityUnits']
+                for item in response['Items']:
+                    key_queue.put({name: item[name] for name in key_attributes})
+        finally:
+            key_queue.put(_DONE)
+    
+    for segment in range(total_segments):
+        threading.Thread(target=scan_segment, args=(segment,), daemon=True).start()
+
+def drain(key_queue, total_segments):
+    """Yield keys from the queue until every scan segment has finished."""
+    finished = 0
+    while finished < total_segments:
+        key = key_queue.get()
+        if key is _DONE:
+            finished += 1
+        else:
+            yield key
+
+def purge_items(table_name, prefixes, wcu_budget, total_segments=4, max_workers=4, dry_run=False):
+    """Delete every item whose partition key starts with one of the prefixes, without dropping the table."""
+    
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table(table_name)
+    key_attributes = [key['AttributeName'] for key in table.key_schema]
+    
+    print(f"=== Purging items from {table_name} ===")
+    print(f"Prefixes ({key_attributes[0]}): {', '.join(prefixes)}")
+    print(f"Scan segments: {total_segments}, write budget: {wcu_budget} WCU/s")
+    
+    # Start timing
+    start_time = time.time()
+    
+    # Scanners stream keys through a bounded queue so memory stays flat
+    stats = {'lock': threading.Lock(), 'scanned': 0, 'matched': 0, 'read_capacity': 0}
+    key_queue = queue.Queue(maxsize=10000)
+    scan_matching_keys(table_name, key_attributes, prefixes, total_segments, key_queue, stats)
+    keys = drain(key_queue, total_segments)
+    
+    if dry_run:
+        deleted = sum(1 for _ in keys)
+        print(f"\nDry run: {deleted} items would be deleted")
+    else:
+        last_report = [0]
+        
+        def print_progress(write_stats):
+            if write_stats['written'] - last_report[0] >= 1000:
+                last_report[0] = write_stats['written']
+                elapsed = time.time() - start_time
+                print(f"Deleted {write_stats['written']} items ({write_stats['written'] / elapsed:.2f} items/second)")
+        
+        engine = BatchWriteEngine(
+            dynamodb, table_name,
+            key_attributes=key_attributes,
+            max_workers=max_workers,
+            on_progress=print_progress,
+            capacity_limiter=TokenBucket(wcu_budget)
+        )
+        write_stats = engine.delete_keys(keys)
+        deleted = write_stats['written']
+        
+        print(f"\nDeleted {deleted} items")
+        print(f"Write capacity consumed: {write_stats['consumed_capacity']:.2f} WCUs")
+        if write_stats['failed']:
+            print(f"{len(write_stats['failed'])} deletes failed: {write_stats['failed'][0]['error']}")
+    
+    # Calculate execution time
+    execution_time = time.time() - start_time
+    
+    print(f"Items scanned: {stats['scanned']}, matched: {stats['matched']}")
+    print(f"Read capacity consumed: {stats['read_capacity']:.2f} RCUs")
+    print(f"Total execution time: {execution_time:.2f} seconds")
+    
+    return deleted
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-delete lab test data by partition key prefix.")
+    parser.add_argument('prefixes', nargs='*', default=DEFAULT_PREFIXES,
+                        help=f"Partition key prefixes to delete (default: {' '.join(DEFAULT_PREFIXES)})")
+    parser.add_argument('--table', default='GameLeaderboard', help="Table to purge")
+    parser.add_argument('--wcu', type=float, default=20, help="Write capacity budget in WCU per second")
+    parser.add_argument('--segments', type=int, default=4, help="Parallel scan segments")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent BatchWriteItem requests")
+    parser.add_argument('--dry-run', action='store_true', help="Count matching items without deleting them")
+    args = parser.parse_args()
+    
+    if not args.dry_run:
+        confirm = input(f"This will delete every item in {args.table} whose key starts with "
+                        f"{', '.join(args.prefixes)}. Continue? (y/n): ")
+        if confirm.lower() != 'y':
+            print("Purge cancelled.")
+            sys.exit(0)
+    
+    purge_items(args.table, args.prefixes, args.wcu, args.segments, args.workers, args.dry_run)
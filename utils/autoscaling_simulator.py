@@ -0,0 +1,198 @@
+import csv
+import math
+from utils.load_profiles import phase_rate
+
+# Provisioned capacity prices in us-east-1, per unit-hour
+RCU_HOUR_PRICE = 0.00013
+WCU_HOUR_PRICE = 0.00065
+
+# DynamoDB keeps up to 5 minutes of unused capacity as burst capacity
+BURST_SECONDS = 300
+
+# Capacity units per operation when deriving demand from a load profile
+DEFAULT_UNITS_PER_OPERATION = {'read': 0.5, 'query': 1.0, 'scan': 2.0, 'write': 1.0}
+
+class TargetTrackingPolicy:
+    """Settings of a DynamoDB target-tracking scaling policy (defaults match configure_autoscaling.py).
+
+    The alarm settings model the CloudWatch alarms Application Auto Scaling
+    creates for DynamoDB: scale out when utilization is above the target for
+    2 consecutive one-minute datapoints, scale in when it is below
+    target - scale_in_margin for 15 consecutive datapoints. Datapoints reach
+    the alarms metric_delay seconds after their minute ends, and a capacity
+    change takes update_delay seconds to apply.
+    """
+
+    def __init__(self, target=70.0, min_capacity=5, max_capacity=100, scale_out_cooldown=60,
+                 scale_in_cooldown=60, scale_out_datapoints=2, scale_in_datapoints=15,
+                 scale_in_margin=20.0, metric_delay=60, update_delay=30, scale_in_limits=True):
+        self.target = target
+        self.min_capacity = min_capacity
+        self.max_capacity = max_capacity
+        self.scale_out_cooldown = scale_out_cooldown
+        self.scale_in_cooldown = scale_in_cooldown
+        self.scale_out_datapoints = scale_out_datapoints
+        self.scale_in_datapoints = scale_in_datapoints
+        self.scale_in_margin = scale_in_margin
+        self.metric_delay = metric_delay
+        self.update_delay = update_delay
+        self.scale_in_limits = scale_in_limits
+
+    def describe(self):
+        return (f"target {self.target:g}%, capacity {self.min_capacity}-{self.max_capacity}, "
+                f"cooldowns out {self.scale_out_cooldown}s / in {self.scale_in_cooldown}s")
+
+def scale_in_allowed(decrease_times, now):
+    """DynamoDB allows 4 capacity decreases at any time in a UTC day, then 1 per hour.
+
+    The simulation clock starts at midnight, so day boundaries fall every 86400 seconds.
+    """
+    day_start = now - now % 86400
+    today = [t for t in decrease_times if t >= day_start]
+    if len(today) < 4:
+        return True
+    hour_start = now - now % 3600
+    return not any(t >= hour_start for t in today[4:])
+
+def simulate(demand, policy, initial_capacity=None, units_per_request=1.0):
+    """Replay a per-second demand timeline (capacity units requested each second) through target tracking.
+
+    Returns totals (demand, consumed and throttled units, an estimate of
+    throttled requests, provisioned and unused unit-hours), the scaling
+    activities and a per-minute timeline.
+    """
+    capacity = initial_capacity or policy.min_capacity
+    desired = capacity  # capacity most recently requested (may still be applying)
+    burst = capacity * BURST_SECONDS
+    pending_updates = []  # (effective_at, capacity)
+    datapoints = []       # (available_at, utilization %, consumed units/second)
+    visible = []          # utilization datapoints the alarms have seen, oldest first
+    last_scale_out = last_scale_in = -math.inf
+    decrease_times = []
+
+    totals = {'demand': 0.0, 'consumed': 0.0, 'throttled': 0.0, 'provisioned_seconds': 0.0, 'unused': 0.0}
+    activities = []
+    timeline = []
+    minute = {'demand': 0.0, 'consumed': 0.0, 'throttled': 0.0, 'provisioned': 0.0}
+
+    for now, requested in enumerate(demand):
+        while pending_updates and pending_updates[0][0] <= now:
+            capacity = pending_updates.pop(0)[1]
+
+        # Serve from provisioned capacity first, then from burst capacity
+        if requested <= capacity:
+            consumed = requested
+            burst = min(capacity * BURST_SECONDS, burst + capacity - requested)
+        else:
+            from_burst = min(burst, requested - capacity)
+            burst -= from_burst
+            consumed = capacity + from_burst
+        throttled = requested - consumed
+
+        totals['demand'] += requested
+        totals['consumed'] += consumed
+        totals['throttled'] += throttled
+        totals['provisioned_seconds'] += capacity
+        totals['unused'] += max(0.0, capacity - consumed)
+        minute['demand'] += requested
+        minute['consumed'] += consumed
+        minute['throttled'] += throttled
+        minute['provisioned'] += capacity
+
+        if now % 60 != 59:
+            continue
+
+        # Close the one-minute datapoint; the alarms see it metric_delay seconds later
+        consumed_rate = minute['consumed'] / 60
+        average_capacity = minute['provisioned'] / 60
+        datapoints.append((now + policy.metric_delay, 100.0 * consumed_rate / average_capacity, consumed_rate))
+        timeline.append({
+            'minute': now // 60,
+            'capacity': average_capacity,
+            'demand': minute['demand'] / 60,
+            'consumed': consumed_rate,
+            'throttled': minute['throttled']
+        })
+        minute = {'demand': 0.0, 'consumed': 0.0, 'throttled': 0.0, 'provisioned': 0.0}
+
+        # Alarms evaluate once a minute on the datapoints that have arrived
+        arrived = False
+        while datapoints and datapoints[0][0] <= now:
+            visible.append(datapoints.pop(0)[1:])
+            arrived = True
+        if not arrived:
+            continue
+        latest_rate = visible[-1][1]
+        recent_out = [utilization for utilization, _ in visible[-policy.scale_out_datapoints:]]
+        recent_in = [utilization for utilization, _ in visible[-policy.scale_in_datapoints:]]
+        proposed = math.ceil(latest_rate / (policy.target / 100)) if latest_rate else policy.min_capacity
+        proposed = max(policy.min_capacity, min(policy.max_capacity, proposed))
+
+        if (len(recent_out) == policy.scale_out_datapoints
+                and all(utilization > policy.target for utilization in recent_out)
+                and now - last_scale_out >= policy.scale_out_cooldown
+                and proposed > desired):
+            desired = proposed
+            last_scale_out = now
+            pending_updates.append((now + policy.update_delay, proposed))
+            activities.append((now, 'scale-out', proposed))
+
+        elif (len(recent_in) == policy.scale_in_datapoints
+                and all(utilization < policy.target - policy.scale_in_margin for utilization in recent_in)
+                and now - last_scale_in >= policy.scale_in_cooldown
+                and now - last_scale_out >= policy.scale_out_cooldown
+                and proposed < desired
+                and (not policy.scale_in_limits or scale_in_allowed(decrease_times, now))):
+            desired = proposed
+            last_scale_in = now
+            decrease_times.append(now)
+            pending_updates.append((now + policy.update_delay, proposed))
+            activities.append((now, 'scale-in', proposed))
+
+    return {
+        'demand_units': totals['demand'],
+        'consumed_units': totals['consumed'],
+        'throttled_units': totals['throttled'],
+        'throttled_requests': totals['throttled'] / units_per_request,
+        'throttled_fraction': totals['throttled'] / totals['demand'] if totals['demand'] else 0.0,
+        'provisioned_unit_hours': totals['provisioned_seconds'] / 3600,
+        'unused_unit_hours': totals['unused'] / 3600,
+        'scale_outs': sum(1 for _, kind, _ in activities if kind == 'scale-out'),
+        'scale_ins': sum(1 for _, kind, _ in activities if kind == 'scale-in'),
+        'activities': activities,
+        'timeline': timeline
+    }
+
+def demand_from_profile(profile, duration_limit=3600, units_per_operation=None):
+    """Build per-second read and write demand (capacity units) from a load profile's phases and mixes."""
+    units = {**DEFAULT_UNITS_PER_OPERATION, **(units_per_operation or {})}
+    reads, writes = [], []
+    for phase in profile['phases']:
+        duration = phase.get('duration')
+        remaining = duration_limit - len(reads)
+        duration = remaining if duration is None else min(duration, remaining)
+        rate_at = phase_rate(phase)
+        mix = phase.get('mix', profile['mix'])
+        total_weight = sum(mix.values())
+        read_units = sum(weight * units[name] for name, weight in mix.items() if name != 'write') / total_weight
+        write_units = mix.get('write', 0) * units['write'] / total_weight
+        for second in range(int(duration)):
+            rate = rate_at(second)
+            reads.append(rate * read_units)
+            writes.append(rate * write_units)
+    return reads, writes
+
+def demand_from_csv(path, period=60):
+    """Read a consumed-capacity timeline from CSV with columns timestamp, read_units, write_units.
+
+    Each row holds the units consumed over `period` seconds (e.g. CloudWatch
+    ConsumedRead/WriteCapacityUnits with the Sum statistic and a 60 s period);
+    it is spread evenly over the seconds of that period. Recorded consumption
+    understates demand while the table was throttling.
+    """
+    reads, writes = [], []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            reads.extend([float(row['read_units']) / period] * period)
+            writes.extend([float(row['write_units']) / period] * period)
+    return reads, writes
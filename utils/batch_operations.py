@@ -0,0 +1,354 @@
+import random
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from botocore.exceptions import ClientError
+from utils.capacity_units import item_size, write_units
+
+MAX_BATCH_GET_KEYS = 100  # BatchGetItem limit per request
+MAX_BATCH_WRITE_REQUESTS = 25  # BatchWriteItem limit per request
+MAX_BATCH_WRITE_BYTES = 16 * 1024 * 1024  # BatchWriteItem total request size
+MAX_ITEM_BYTES = 400 * 1024  # DynamoDB item size limit
+
+RETRYABLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable'
+}
+
+def backoff_delay(attempt, base=0.05, cap=2.0):
+    """Exponential backoff with full jitter for the given retry attempt (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def key_identity(key):
+    """Hashable identity for a primary key map such as {'player_id': ..., 'game_id': ...}."""
+    return tuple(sorted(key.items()))
+
+def batch_get_chunk(dynamodb, table_name, keys, max_retries=8, stats=None, **table_options):
+    """Fetch up to 100 keys with BatchGetItem, retrying UnprocessedKeys with jittered backoff.
+
+    Returns (items, unprocessed_keys, retries). unprocessed_keys is only
+    non-empty if DynamoDB still had not returned them after max_retries.
+    A request rejected with a throttling error (after the SDK's own retries)
+    is retried the same way, with all of its keys. Extra table options
+    (ProjectionExpression, ConsistentRead, ...) are sent with every request.
+    If a stats dict is given, request and consumed capacity totals are
+    added to it.
+    """
+
+    pending = list(keys)
+    items = []
+    retries = 0
+
+    while pending:
+        try:
+            response = dynamodb.batch_get_item(
+                RequestItems={table_name: dict(table_options, Keys=pending)},
+                ReturnConsumedCapacity='TOTAL'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] not in RETRYABLE_ERROR_CODES:
+                raise
+            if stats is not None:
+                stats['requests'] = stats.get('requests', 0) + 1
+            if retries >= max_retries:
+                break
+            retries += 1
+            time.sleep(backoff_delay(retries))
+            continue
+
+        items.extend(response['Responses'].get(table_name, []))
+        pending = response.get('UnprocessedKeys', {}).get(table_name, {}).get('Keys', [])
+
+        if stats is not None:
+            stats['requests'] = stats.get('requests', 0) + 1
+            stats['consumed_capacity'] = stats.get('consumed_capacity', 0) + sum(
+                capacity.get('CapacityUnits', 0) for capacity in response.get('ConsumedCapacity', [])
+            )
+
+        if pending:
+            if retries >= max_retries:
+                break
+            retries += 1
+            time.sleep(backoff_delay(retries))
+
+    return items, pending, retries
+
+def batch_get_items(dynamodb, table_name, keys, max_workers=8, preserve_order=False,
+                    max_retries=8, **table_options):
+    """Fetch any number of keys with concurrent BatchGetItem requests.
+
+    Keys are de-duplicated and split into chunks of at most 100 keys. The
+    chunks are fetched in parallel on a worker pool, and each chunk retries
+    its own UnprocessedKeys with jittered backoff. BatchGetItem also returns
+    keys as unprocessed when a response would exceed 16 MB, so large items
+    are covered by the same retry.
+
+    Returns a dict with:
+    - 'Items': the items found. In arbitrary order by default. With
+      preserve_order=True, one entry per input key in input order, with
+      None for keys that do not exist.
+    - 'UnprocessedKeys': keys still unprocessed after max_retries
+    - 'Requests', 'Retries', 'ConsumedCapacity': totals over all chunks
+
+    ProjectionExpression must include the key attributes when
+    preserve_order is used.
+    """
+
+    unique_keys = {}
+    for key in keys:
+        unique_keys.setdefault(key_identity(key), key)
+    unique = list(unique_keys.values())
+    chunks = [unique[start:start + MAX_BATCH_GET_KEYS] for start in range(0, len(unique), MAX_BATCH_GET_KEYS)]
+
+    stats = {}
+    items = []
+    unprocessed = []
+    retries = 0
+
+    def fetch(chunk):
+        chunk_stats = {}
+        result = batch_get_chunk(dynamodb, table_name, chunk, max_retries=max_retries,
+                                 stats=chunk_stats, **table_options)
+        return result, chunk_stats
+
+    if chunks:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            for (chunk_items, chunk_unprocessed, chunk_retries), chunk_stats in executor.map(fetch, chunks):
+                items.extend(chunk_items)
+                unprocessed.extend(chunk_unprocessed)
+                retries += chunk_retries
+                for name, value in chunk_stats.items():
+                    stats[name] = stats.get(name, 0) + value
+
+    if preserve_order and keys:
+        key_names = list(keys[0])
+        by_key = {key_identity({name: item[name] for name in key_names}): item for item in items}
+        items = [by_key.get(key_identity(key)) for key in keys]
+
+    return {
+        'Items': items,
+        'UnprocessedKeys': unprocessed,
+        'Requests': stats.get('requests', 0),
+        'Retries': retries,
+        'ConsumedCapacity': stats.get('consumed_capacity', 0)
+    }
+
+def _estimate_write_units(request):
+    """Estimate the WCUs a write request consumes on the table (deletes assumed 1 KB)."""
+    if 'PutRequest' in request:
+        return write_units(item_size(request['PutRequest']['Item']))
+    return 1
+
+def _request_size(request):
+    """Approximate the size a write request adds to a BatchWriteItem call."""
+    if 'PutRequest' in request:
+        return item_size(request['PutRequest']['Item'])
+    return item_size(request['DeleteRequest']['Key'])
+
+class BatchWriteEngine:
+    """Pipelined BatchWriteItem writer for large numbers of puts and deletes.
+
+    Requests are pulled lazily from any iterable into a deque, packed into
+    batches of at most 25 requests and 16 MB, and sent with up to
+    `max_workers` BatchWriteItem calls in flight at once.
+
+    - A request for a key that is already queued replaces the queued one,
+      because only the last put or delete of a key decides its final state
+    - A request for a key that is currently in flight waits until that batch
+      completes, so writes to one key are never reordered
+    - UnprocessedItems are re-sent as their own batch after a jittered
+      backoff, ahead of new work
+    - A batch still unprocessed after max_retries attempts is reported in
+      'failed', together with any batch rejected by a non-retryable error
+
+    Pass a TokenBucket (utils/rate_limiter.py) as `capacity_limiter` to keep
+    the writes under a WCU-per-second budget. Each batch acquires its
+    estimated WCUs before it is sent. If the ConsumedCapacity reported back
+    is higher, the difference is charged to the bucket as well.
+    """
+
+    def __init__(self, dynamodb, table_name, key_attributes=None, max_workers=4, max_retries=8,
+                 buffer_size=1000, on_progress=None, capacity_limiter=None):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.key_attributes = key_attributes or [
+            key['AttributeName'] for key in dynamodb.Table(table_name).key_schema
+        ]
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.buffer_size = buffer_size
+        self.on_progress = on_progress
+        self.capacity_limiter = capacity_limiter
+
+    def put_items(self, items):
+        """Write items with PutRequests."""
+        return self.write({'PutRequest': {'Item': item}} for item in items)
+
+    def delete_keys(self, keys):
+        """Delete keys with DeleteRequests."""
+        return self.write({'DeleteRequest': {'Key': key}} for key in keys)
+
+    def _identity(self, request):
+        if 'PutRequest' in request:
+            attributes = request['PutRequest']['Item']
+        else:
+            attributes = request['DeleteRequest']['Key']
+        return tuple(attributes[name] for name in self.key_attributes)
+
+    def _send(self, batch, attempt):
+        """Send one batch and return the requests DynamoDB left unprocessed."""
+
+        if attempt:
+            time.sleep(backoff_delay(attempt))
+
+        estimated = 0
+        if self.capacity_limiter is not None:
+            estimated = sum(_estimate_write_units(request) for _, request in batch)
+            self.capacity_limiter.acquire(estimated)
+
+        try:
+            response = self.dynamodb.batch_write_item(
+                RequestItems={self.table_name: [request for _, request in batch]},
+                ReturnConsumedCapacity='TOTAL'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] in RETRYABLE_ERROR_CODES:
+                return [request for _, request in batch], 0, None
+            return [], 0, e
+
+        consumed = sum(capacity.get('CapacityUnits', 0) for capacity in response.get('ConsumedCapacity', []))
+        if self.capacity_limiter is not None and consumed > estimated:
+            self.capacity_limiter.consume(consumed - estimated)
+        return response.get('UnprocessedItems', {}).get(self.table_name, []), consumed, None
+
+    def write(self, requests):
+        """Write every request from the iterable and return the run statistics."""
+
+        source = iter(requests)
+        source_done = False
+        queue = deque()  # key identities in arrival order
+        pending = {}  # identity -> latest queued request
+        parked = {}  # identity -> request waiting for an in-flight write of the same key
+        in_flight_keys = set()
+        retry_batches = deque()  # (batch, attempt)
+        in_flight = {}  # future -> (batch, attempt)
+
+        stats = {
+            'requests': 0,
+            'written': 0,
+            'duplicates': 0,
+            'batches': 0,
+            'retries': 0,
+            'consumed_capacity': 0,
+            'attempts_per_batch': Counter(),
+            'failed': []
+        }
+
+        def admit(identity, request):
+            if identity in in_flight_keys:
+                if identity in parked:
+                    stats['duplicates'] += 1
+                parked[identity] = request
+            elif identity in pending:
+                stats['duplicates'] += 1
+                pending[identity] = request
+            else:
+                pending[identity] = request
+                queue.append(identity)
+
+        def fill():
+            nonlocal source_done
+            while not source_done and len(queue) < self.buffer_size:
+                try:
+                    request = next(source)
+                except StopIteration:
+                    source_done = True
+                    break
+                if 'PutRequest' in request and item_size(request['PutRequest']['Item']) > MAX_ITEM_BYTES:
+                    raise ValueError(f"Item {self._identity(request)} exceeds the 400 KB item size limit")
+                stats['requests'] += 1
+                admit(self._identity(request), request)
+
+        def pack():
+            batch = []
+            size = 0
+            while queue and len(batch) < MAX_BATCH_WRITE_REQUESTS:
+                request = pending[queue[0]]
+                request_size = _request_size(request)
+                if batch and size + request_size > MAX_BATCH_WRITE_BYTES:
+                    break
+                identity = queue.popleft()
+                del pending[identity]
+                in_flight_keys.add(identity)
+                batch.append((identity, request))
+                size += request_size
+            return batch
+
+        def release(identity):
+            in_flight_keys.discard(identity)
+            if identity in parked:
+                admit(identity, parked.pop(identity))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                fill()
+                while len(in_flight) < self.max_workers and (retry_batches or queue):
+                    if retry_batches:
+                        batch, attempt = retry_batches.popleft()
+                    else:
+                        batch, attempt = pack(), 0
+                    in_flight[executor.submit(self._send, batch, attempt)] = (batch, attempt)
+                    stats['batches'] += 1
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch, attempt = in_flight.pop(future)
+                    unprocessed, consumed, error = future.result()
+                    stats['consumed_capacity'] += consumed
+
+                    if error is not None:
+                        stats['failed'].extend(
+                            {'request': request, 'error': error.response['Error']['Message']}
+                            for _, request in batch
+                        )
+                        stats['attempts_per_batch'][attempt + 1] += 1
+                        for identity, _ in batch:
+                            release(identity)
+                        continue
+
+                    unprocessed_ids = {self._identity(request) for request in unprocessed}
+                    retry = [(identity, request) for identity, request in batch if identity in unprocessed_ids]
+                    for identity, _ in batch:
+                        if identity not in unprocessed_ids:
+                            stats['written'] += 1
+                            release(identity)
+
+                    if not retry:
+                        stats['attempts_per_batch'][attempt + 1] += 1
+                    elif attempt + 1 > self.max_retries:
+                        stats['attempts_per_batch'][attempt + 1] += 1
+                        stats['failed'].extend(
+                            {'request': request, 'error': 'Unprocessed after retries'} for _, request in retry
+                        )
+                        for identity, _ in retry:
+                            release(identity)
+                    else:
+                        stats['retries'] += 1
+                        retry_batches.append((retry, attempt + 1))
+
+                if self.on_progress:
+                    self.on_progress(stats)
+
+        return stats
+
+def batch_write_items(dynamodb, table_name, items, max_workers=4, max_retries=8, on_progress=None):
+    """Put any number of items with the pipelined BatchWriteEngine."""
+    engine = BatchWriteEngine(dynamodb, table_name, max_workers=max_workers,
+                              max_retries=max_retries, on_progress=on_progress)
+    return engine.put_items(items)
@@ -0,0 +1,128 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from utils.batch_operations import MAX_BATCH_GET_KEYS, batch_get_chunk
+from utils.item_cache import freeze
+
+class MicroBatchReader:
+    """Combine individual GetItem calls into BatchGetItem requests.
+
+    Calls that arrive within `window` seconds of each other are grouped into
+    one BatchGetItem. A group is sent early once it reaches `max_batch_size`
+    distinct keys. Duplicate keys in a group are fetched once. Each caller
+    gets its own Future, or a GetItem-shaped response from get_item(), so
+    existing per-key code keeps working while it gets batch throughput.
+    """
+
+    def __init__(self, dynamodb, table_name, window=0.005, max_batch_size=MAX_BATCH_GET_KEYS,
+                 max_workers=4, max_retries=8):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.window = window
+        self.max_batch_size = min(max_batch_size, MAX_BATCH_GET_KEYS)
+        self.max_retries = max_retries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._condition = threading.Condition()
+        self._pending = {}  # frozen key -> (key, [futures])
+        self._first_arrival = None
+        self._closed = False
+        self.stats = {'requests': 0, 'batches': 0, 'keys_fetched': 0, 'retries': 0}
+        self._dispatcher = threading.Thread(target=self._run, name='micro-batch-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def get(self, key):
+        """Queue a key and return a Future resolving to the item, or None if it does not exist."""
+
+        future = Future()
+        frozen = freeze(key)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MicroBatchReader is closed")
+            self.stats['requests'] += 1
+            if frozen in self._pending:
+                self._pending[frozen][1].append(future)
+            else:
+                self._pending[frozen] = (key, [future])
+            if self._first_arrival is None:
+                self._first_arrival = time.monotonic()
+            self._condition.notify()
+        return future
+
+    def get_item(self, Key):
+        """Blocking, GetItem-shaped convenience wrapper around get()."""
+        item = self.get(Key).result()
+        return {'Item': item} if item is not None else {}
+
+    def _take_batch(self):
+        """Wait for the window to close (or the batch to fill) and take the pending keys."""
+
+        with self._condition:
+            while True:
+                if self._pending:
+                    remaining = self._first_arrival + self.window - time.monotonic()
+                    if remaining <= 0 or len(self._pending) >= self.max_batch_size:
+                        break
+                    self._condition.wait(remaining)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+
+            batch = {}
+            for frozen in list(self._pending)[:self.max_batch_size]:
+                batch[frozen] = self._pending.pop(frozen)
+            self._first_arrival = time.monotonic() if self._pending else None
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        """Send one BatchGetItem and resolve every waiting caller."""
+
+        try:
+            keys = [key for key, _ in batch.values()]
+            key_names = list(keys[0])
+            items, unprocessed, retries = batch_get_chunk(
+                self.dynamodb, self.table_name, keys, max_retries=self.max_retries
+            )
+
+            with self._condition:
+                self.stats['batches'] += 1
+                self.stats['keys_fetched'] += len(keys)
+                self.stats['retries'] += retries
+
+            by_key = {freeze({name: item[name] for name in key_names}): item for item in items}
+            unprocessed = {freeze(key) for key in unprocessed}
+            for frozen, (_, futures) in batch.items():
+                for future in futures:
+                    if frozen in unprocessed:
+                        future.set_exception(RuntimeError(
+                            f"Key still unprocessed after {self.max_retries} retries: {dict(frozen)}"
+                        ))
+                    else:
+                        future.set_result(by_key.get(frozen))
+        except Exception as e:
+            # Never leave a caller blocked on result(): fail whatever is still unresolved
+            for _, futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def close(self):
+        """Flush pending keys and stop the dispatcher."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
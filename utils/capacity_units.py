@@ -0,0 +1,189 @@
+import math
+from decimal import Decimal
+
+READ_UNIT_BYTES = 4 * 1024  # One strongly consistent read of up to 4 KB
+WRITE_UNIT_BYTES = 1024  # One write of up to 1 KB
+MAX_PAGE_BYTES = 1024 * 1024  # Query and Scan stop each page after 1 MB of items read
+
+def attribute_value_size(value):
+    """Size in bytes DynamoDB bills for one attribute value (as used with the boto3 resource API).
+
+    Strings and binaries count their bytes. Numbers take one byte plus one
+    per pair of significant digits (leading and trailing zeros are not
+    stored), and one more when negative. Booleans and nulls take 1 byte.
+    Lists and maps add 3 bytes plus 1 byte per element, and maps also count
+    each element's name. Sets count only their elements.
+    """
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return _number_size(value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, 'value') and isinstance(value.value, (bytes, bytearray)):
+        return len(value.value)  # boto3.dynamodb.types.Binary
+    if isinstance(value, dict):
+        return 3 + sum(len(name.encode('utf-8')) + attribute_value_size(inner) + 1 for name, inner in value.items())
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(attribute_value_size(inner) + 1 for inner in value)
+    if isinstance(value, (set, frozenset)):
+        return sum(attribute_value_size(inner) for inner in value)
+    raise TypeError(f"Unsupported attribute value type {type(value).__name__}")
+
+def _number_size(value):
+    sign, digits, exponent = Decimal(str(value)).normalize().as_tuple()
+    if not any(digits):
+        return 2
+    # Digits are stored in base-100 pairs aligned on the decimal point
+    lowest, highest = exponent, exponent + len(digits) - 1
+    pairs = highest // 2 - lowest // 2 + 1
+    return 1 + pairs + (1 if sign else 0)
+
+def item_size(item, attributes=None):
+    """Size in bytes of an item: the UTF-8 length of every attribute name plus its value.
+
+    With `attributes`, only those attributes are counted (e.g. an index projection).
+    """
+    return sum(
+        len(name.encode('utf-8')) + attribute_value_size(value)
+        for name, value in item.items()
+        if attributes is None or name in attributes
+    )
+
+def read_units(size, consistent=False, transactional=False):
+    """Read capacity units for reading `size` bytes in one unit of work (rounded up to 4 KB)."""
+    units = max(1, math.ceil(size / READ_UNIT_BYTES))
+    if transactional:
+        return units * 2
+    return units if consistent else units / 2
+
+def write_units(size, transactional=False):
+    """Write capacity units for writing an item of `size` bytes (rounded up to 1 KB)."""
+    units = max(1, math.ceil(size / WRITE_UNIT_BYTES))
+    return units * 2 if transactional else units
+
+def query_read_units(sizes, consistent=False):
+    """Read units for a Query or Scan that reads items of the given sizes.
+
+    The sizes of all items read are added up per page (before any filter)
+    and rounded up to 4 KB once per page, so small items are cheap to query
+    compared with fetching them one GetItem at a time.
+    """
+    total, page = 0, 0
+    for size in sizes:
+        if page and page + size > MAX_PAGE_BYTES:
+            total += read_units(page, consistent)
+            page = 0
+        page += size
+    return total + read_units(page, consistent)
+
+def _key_names(key_schema):
+    return [element['AttributeName'] for element in key_schema]
+
+class TableCapacityModel:
+    """Predict capacity consumed by each operation on a table from its key and index definitions.
+
+    `table_description` has the shape of describe_table()['Table'] (only
+    KeySchema, LocalSecondaryIndexes and GlobalSecondaryIndexes are used),
+    so it can come from a live table or be written out offline.
+
+    Write estimates are dicts of units per capacity pool: 'table' (which
+    also pays for local secondary index writes) and one entry per global
+    secondary index, which has its own write capacity. An index write
+    happens when the item enters, leaves or changes in the index; changing
+    an index key attribute costs a delete and a put there.
+    """
+
+    def __init__(self, table_description):
+        self.key_names = _key_names(table_description['KeySchema'])
+        self.indexes = {}
+        for kind in ('LocalSecondaryIndexes', 'GlobalSecondaryIndexes'):
+            for index in table_description.get(kind, []):
+                index_keys = _key_names(index['KeySchema'])
+                projection = index.get('Projection', {'ProjectionType': 'ALL'})
+                if projection['ProjectionType'] == 'ALL':
+                    projected = None
+                else:
+                    projected = set(self.key_names) | set(index_keys) | set(projection.get('NonKeyAttributes', []))
+                self.indexes[index['IndexName']] = {
+                    'global': kind == 'GlobalSecondaryIndexes',
+                    'keys': index_keys,
+                    'projected': projected
+                }
+
+    def index_entry_size(self, index_name, item):
+        """Size of the item's entry in an index, or None when the item is not in it (sparse index)."""
+        index = self.indexes[index_name]
+        if any(item.get(name) is None for name in index['keys']):
+            return None
+        return item_size(item, index['projected'])
+
+    def get_item(self, item, consistent=False, transactional=False):
+        return read_units(item_size(item) if item else 0, consistent, transactional)
+
+    def batch_get(self, items, consistent=False):
+        """Each item of a BatchGetItem is rounded up to 4 KB separately."""
+        return sum(self.get_item(item, consistent) for item in items)
+
+    def query(self, items, index_name=None, consistent=False):
+        """Read units for a Query (or Scan) that reads `items`, from the table or an index."""
+        if index_name is None:
+            sizes = [item_size(item) for item in items]
+        else:
+            sizes = [self.index_entry_size(index_name, item) or 0 for item in items]
+        return query_read_units(sizes, consistent)
+
+    scan = query
+
+    def write(self, new_item=None, old_item=None, transactional=False):
+        """Units for replacing `old_item` with `new_item`; pass only one of them for an insert or a delete."""
+        # Updates are billed on the larger of the item before and after the write
+        size = max(item_size(new_item) if new_item else 0, item_size(old_item) if old_item else 0)
+        units = {'table': write_units(size, transactional)}
+        for index_name, index in self.indexes.items():
+            old_size = self.index_entry_size(index_name, old_item) if old_item else None
+            new_size = self.index_entry_size(index_name, new_item) if new_item else None
+            index_units = 0
+            if old_size is not None and new_size is not None:
+                if any(old_item.get(name) != new_item.get(name) for name in index['keys']):
+                    index_units = write_units(old_size) + write_units(new_size)
+                elif self._projected_changed(index, old_item, new_item):
+                    index_units = write_units(max(old_size, new_size))
+            elif old_size is not None:
+                index_units = write_units(old_size)
+            elif new_size is not None:
+                index_units = write_units(new_size)
+            if transactional:
+                index_units *= 2
+            pool = index_name if index['global'] else 'table'
+            units[pool] = units.get(pool, 0) + index_units
+        return units
+
+    def _projected_changed(self, index, old_item, new_item):
+        names = set(old_item) | set(new_item)
+        if index['projected'] is not None:
+            names &= index['projected']
+        return any(old_item.get(name) != new_item.get(name) for name in names)
+
+    def put_item(self, item, old_item=None, transactional=False):
+        return self.write(item, old_item, transactional)
+
+    def delete_item(self, old_item, transactional=False):
+        return self.write(None, old_item, transactional)
+
+    def batch_write(self, items):
+        """BatchWriteItem puts: billed like individual PutItem calls."""
+        return _add_units(self.put_item(item) for item in items)
+
+    def transact_write(self, items):
+        """TransactWriteItems puts: twice the units of plain writes, on the table and every index."""
+        return _add_units(self.put_item(item, transactional=True) for item in items)
+
+def _add_units(estimates):
+    total = {}
+    for estimate in estimates:
+        for pool, units in estimate.items():
+            total[pool] = total.get(pool, 0) + units
+    return total
@@ -0,0 +1,133 @@
+import threading
+from datetime import datetime, timedelta
+
+# GetMetricData accepts up to 500 queries per call
+MAX_QUERIES_PER_CALL = 500
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+def metric_query(query_id, metric_name, dimensions, stat, period=60, label=None, return_data=True,
+                 namespace='AWS/DynamoDB'):
+    """Build a GetMetricData MetricStat query; dimensions is a {name: value} dict."""
+    query = {
+        'Id': query_id,
+        'MetricStat': {
+            'Metric': {
+                'Namespace': namespace,
+                'MetricName': metric_name,
+                'Dimensions': [{'Name': name, 'Value': value} for name, value in dimensions.items()]
+            },
+            'Period': period,
+            'Stat': stat
+        },
+        'ReturnData': return_data
+    }
+    if label:
+        query['Label'] = label
+    return query
+
+def expression_query(query_id, expression, label=None, period=None):
+    """Build a GetMetricData metric math query, e.g. expression_query('util', '100 * consumed / (provisioned * 60)')."""
+    query = {'Id': query_id, 'Expression': expression, 'ReturnData': True}
+    if label:
+        query['Label'] = label
+    if period:
+        query['Period'] = period
+    return query
+
+def fetch_metric_data(cloudwatch, queries, start_time, end_time):
+    """Run GetMetricData for all queries, following NextToken; returns {id: [(timestamp, value), ...]} oldest first.
+
+    Queries are sent in as few calls as possible (500 per call). A metric math
+    expression can only refer to queries in the same call, so keep an
+    expression and its inputs within one block of 500.
+    """
+    series = {query['Id']: {} for query in queries}
+    for offset in range(0, len(queries), MAX_QUERIES_PER_CALL):
+        request = {
+            'MetricDataQueries': queries[offset:offset + MAX_QUERIES_PER_CALL],
+            'StartTime': start_time,
+            'EndTime': end_time,
+            'ScanBy': 'TimestampAscending'
+        }
+        while True:
+            response = cloudwatch.get_metric_data(**request)
+            for result in response['MetricDataResults']:
+                series[result['Id']].update(zip(result['Timestamps'], result['Values']))
+            if not response.get('NextToken'):
+                break
+            request['NextToken'] = response['NextToken']
+    return {query_id: sorted(points.items()) for query_id, points in series.items()}
+
+def sparkline(values, width=30):
+    """Render the last `width` values as a unicode sparkline."""
+    values = list(values)[-width:]
+    if not values:
+        return ''
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARK_CHARS[0 if high == 0 else len(SPARK_CHARS) // 2] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return ''.join(SPARK_CHARS[round((value - low) * scale)] for value in values)
+
+class RollingMetrics:
+    """Keep a rolling in-memory time series per query, fetching only new datapoints on each poll.
+
+    The first poll backfills `history`; later polls ask for the window since
+    the previous poll, starting `overlap` periods earlier because CloudWatch
+    revises the most recent datapoints as late data arrives. All queries go
+    out in one batched GetMetricData call.
+    """
+
+    def __init__(self, cloudwatch, queries=(), period=60, history=timedelta(minutes=30), overlap=3):
+        self.cloudwatch = cloudwatch
+        self.period = period
+        self.history = history
+        self.overlap = overlap
+        self.queries = []
+        self.series = {}
+        self.last_end = None
+        self._lock = threading.Lock()
+        self.set_queries(queries)
+
+    def set_queries(self, queries):
+        """Replace the queries; series of changed or new queries are backfilled on the next poll."""
+        with self._lock:
+            previous = {query['Id']: query for query in self.queries}
+            self.queries = list(queries)
+            unchanged = {query['Id'] for query in self.queries if previous.get(query['Id']) == query}
+            if len(unchanged) < len(self.queries):
+                self.last_end = None
+            self.series = {query_id: self.series[query_id] for query_id in unchanged if query_id in self.series}
+
+    def poll(self):
+        """Fetch datapoints since the previous poll and merge them into the rolling series."""
+        end_time = datetime.utcnow()
+        with self._lock:
+            if self.last_end is None:
+                start_time = end_time - self.history
+            else:
+                start_time = self.last_end - timedelta(seconds=self.period * self.overlap)
+            queries = self.queries
+        if not queries:
+            return
+
+        fetched = fetch_metric_data(self.cloudwatch, queries, start_time, end_time)
+        cutoff = end_time - self.history
+        with self._lock:
+            for query_id, points in fetched.items():
+                merged = self.series.setdefault(query_id, {})
+                merged.update((timestamp.replace(tzinfo=None), value) for timestamp, value in points)
+                for timestamp in [t for t in merged if t < cutoff]:
+                    del merged[timestamp]
+            self.last_end = end_time
+
+    def values(self, query_id):
+        """Values of one series, oldest first."""
+        with self._lock:
+            points = self.series.get(query_id, {})
+            return [points[timestamp] for timestamp in sorted(points)]
+
+    def latest(self, query_id, default=None):
+        values = self.values(query_id)
+        return values[-1] if values else default
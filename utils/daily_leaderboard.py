@@ -0,0 +1,159 @@
+import threading
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from utils.dynamodb_helper import load_config
+
+LEADERBOARD_TABLE_NAME = 'DailyLeaderboard'
+DEFAULT_TOP_K = 100
+ENTRY_ATTRIBUTES = ('player_id', 'game_id', 'player_name', 'score')
+
+def get_daily_leaderboard_settings():
+    """Return the daily_leaderboard section of config.json (disabled if missing)."""
+    settings = load_config().get('daily_leaderboard', {})
+    return {
+        'enabled': settings.get('enabled', False),
+        'top_k': int(settings.get('top_k', DEFAULT_TOP_K))
+    }
+
+def get_daily_leaderboard_aggregator(dynamodb):
+    """Return an aggregator when the daily leaderboard is enabled, otherwise None."""
+    settings = get_daily_leaderboard_settings()
+    if not settings['enabled']:
+        return None
+    return DailyLeaderboardAggregator(dynamodb, top_k=settings['top_k'])
+
+def leaderboard_id(game_date, game_mode):
+    """Build the DailyLeaderboard partition key, e.g. '2024-01-15#battle-royale'."""
+    return f"{game_date}#{game_mode}"
+
+def get_daily_leaderboard(dynamodb, game_date, game_mode, limit=None):
+    """Read the top entries for one day and game mode with a single GetItem."""
+    table = dynamodb.Table(LEADERBOARD_TABLE_NAME)
+    response = table.get_item(Key={'leaderboard_id': leaderboard_id(game_date, game_mode)})
+    entries = response.get('Item', {}).get('entries', [])
+    return entries[:limit] if limit else entries
+
+def merge_entries(entries, games, top_k):
+    """Merge new games into a sorted top-K entry list (highest score first).
+
+    Entries are keyed by (player_id, game_id) so re-recording a game replaces
+    its previous score instead of listing it twice.
+    """
+    by_key = {(entry['player_id'], entry['game_id']): entry for entry in entries}
+    for game in games:
+        entry = {name: game[name] for name in ENTRY_ATTRIBUTES if name in game}
+        by_key[(entry['player_id'], entry['game_id'])] = entry
+
+    merged = sorted(by_key.values(), key=lambda entry: (-entry['score'], entry['game_id']))
+    return merged[:top_k]
+
+class DailyLeaderboardAggregator:
+    """Maintain per-day/per-mode top-K leaderboard items from game writes.
+
+    The aggregator remembers the last version and K-th score it saw for each
+    leaderboard, so games that cannot make the top K are skipped without any
+    read or write. Qualifying games are merged locally and written back with a
+    condition on the item version; on a conflict the item is re-read and the
+    merge retried.
+    """
+
+    def __init__(self, dynamodb, top_k=DEFAULT_TOP_K, table_name=LEADERBOARD_TABLE_NAME, max_retries=5):
+        self.table = dynamodb.Table(table_name)
+        self.top_k = top_k
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._known = {}  # leaderboard_id -> (entries, version)
+        self.stats = {'recorded': 0, 'skipped': 0, 'updated': 0, 'conflicts': 0}
+
+    def record_game(self, item):
+        """Record a single game write."""
+        return self.record_games([item])
+
+    def record_games(self, items):
+        """Record a group of game writes, issuing at most one write per leaderboard."""
+
+        groups = defaultdict(list)
+        for item in items:
+            if 'game_date' in item and 'game_mode' in item and 'score' in item:
+                groups[leaderboard_id(item['game_date'], item['game_mode'])].append(item)
+
+        updated = 0
+        for board_id, games in groups.items():
+            candidates = [game for game in games if self._may_qualify(board_id, game['score'])]
+            with self._lock:
+                self.stats['recorded'] += len(games)
+                self.stats['skipped'] += len(games) - len(candidates)
+            if candidates and self._merge_into(board_id, candidates):
+                updated += 1
+        return updated
+
+    def _may_qualify(self, board_id, score):
+        """Check a score against the cached K-th entry of a leaderboard."""
+        with self._lock:
+            known = self._known.get(board_id)
+        if known is None:
+            return True
+        entries = known[0]
+        return len(entries) < self.top_k or score > entries[-1]['score']
+
+    def _load(self, board_id):
+        """Read the current leaderboard item and refresh the local copy."""
+        response = self.table.get_item(Key={'leaderboard_id': board_id}, ConsistentRead=True)
+        item = response.get('Item')
+        known = (item['entries'], item['version']) if item else ([], 0)
+        with self._lock:
+            self._known[board_id] = known
+        return known
+
+    def _merge_into(self, board_id, games):
+        """Conditionally write the merged top-K list for one leaderboard."""
+
+        with self._lock:
+            known = self._known.get(board_id)
+        if known is None:
+            known = self._load(board_id)
+
+        for _ in range(self.max_retries):
+            entries, version = known
+            merged = merge_entries(entries, games, self.top_k)
+            if merged == entries:
+                return False
+
+            if version:
+                condition = Attr('version').eq(version)
+            else:
+                condition = Attr('leaderboard_id').not_exists()
+
+            game_date, game_mode = board_id.split('#', 1)
+            try:
+                self.table.put_item(
+                    Item={
+                        'leaderboard_id': board_id,
+                        'game_date': game_date,
+                        'game_mode': game_mode,
+                        'entries': merged,
+                        'entry_count': Decimal(len(merged)),
+                        'min_score': merged[-1]['score'],
+                        'version': version + 1,
+                        'last_updated': datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+                    },
+                    ConditionExpression=condition
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                with self._lock:
+                    self.stats['conflicts'] += 1
+                known = self._load(board_id)
+                continue
+
+            with self._lock:
+                self._known[board_id] = (merged, version + 1)
+                self.stats['updated'] += 1
+            return True
+
+        print(f"Giving up on leaderboard {board_id} after {self.max_retries} conflicting writes")
+        return False
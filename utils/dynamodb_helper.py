@@ -1,6 +1,9 @@
 import boto3
 import json
 import os
+from functools import lru_cache
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 
 def load_config():
     """Load configuration from config.json file."""
@@ -8,32 +11,176 @@ def load_config():
     with open(config_path, 'r') as f:
         return json.load(f)
 
-def get_dynamodb_client():
-    """Create and return a DynamoDB client based on config.json settings."""
+def _configure_client(client, retry_policy):
+    """Attach the retry policy (the one passed in, or the configured default) and instrumentation."""
+    from utils.retry import get_default_retry_policy
+    from utils.instrumentation import instrument_client
+    
+    if retry_policy is None:
+        retry_policy = get_default_retry_policy()
+    if retry_policy:
+        retry_policy.attach(client)
+    instrument_client(client)
+
+def get_dynamodb_client(boto_config=None, retry_policy=None):
+    """Create and return a DynamoDB client based on config.json settings.
+    
+    boto_config is an optional botocore Config. retry_policy is an optional
+    utils.retry.RetryPolicy that replaces the SDK's retry handling; when it is
+    omitted, the policy from the retry_policy section of config.json is used if
+    enabled. Pass retry_policy=False to keep the SDK's own retries regardless.
+    Clients report retry and throttle metrics to utils.instrumentation's registry.
+    """
     config = load_config()
     
     session = boto3.Session(profile_name=config['aws_profile'])
     
     if config['dynamodb']['use_local_endpoint']:
-        return session.client(
+        client = session.client(
             'dynamodb',
             region_name=config['aws_region'],
-            endpoint_url=config['dynamodb']['endpoint_url']
+            endpoint_url=config['dynamodb']['endpoint_url'],
+            config=boto_config
         )
     else:
-        return session.client('dynamodb', region_name=config['aws_region'])
+        client = session.client('dynamodb', region_name=config['aws_region'], config=boto_config)
+    
+    _configure_client(client, retry_policy)
+    return client
 
-def get_dynamodb_resource():
-    """Create and return a DynamoDB resource based on config.json settings."""
+def get_dynamodb_resource(boto_config=None, retry_policy=None):
+    """Create and return a DynamoDB resource based on config.json settings.
+    
+    Takes the same optional boto_config and retry_policy as get_dynamodb_client.
+    """
     config = load_config()
     
     session = boto3.Session(profile_name=config['aws_profile'])
     
     if config['dynamodb']['use_local_endpoint']:
-        return session.resource(
+        resource = session.resource(
             'dynamodb',
             region_name=config['aws_region'],
-            endpoint_url=config['dynamodb']['endpoint_url']
+            endpoint_url=config['dynamodb']['endpoint_url'],
+            config=boto_config
         )
     else:
-        return session.resource('dynamodb', region_name=config['aws_region'])
\ No newline at end of file
+        resource = session.resource('dynamodb', region_name=config['aws_region'], config=boto_config)
+    
+    _configure_client(resource.meta.client, retry_policy)
+    return resource
+
+@lru_cache(maxsize=None)
+def get_shared_dynamodb_client():
+    """Return one process-wide DynamoDB client for work fanned out over threads.
+    
+    boto3 resources, and the Table objects they create, must not be shared
+    between threads; low-level clients can be.
+    """
+    return get_dynamodb_client()
+
+def iterate_pages_with_client(client, operation, table_name, limit=None, **kwargs):
+    """Run a Query or Scan ('query' or 'scan') through a low-level client and yield each page.
+    
+    Accepts the same arguments as Table.query/Table.scan: Key/Attr
+    conditions are built into expressions with a builder local to this call,
+    and ExpressionAttributeValues and ExclusiveStartKey hold plain Python
+    values. Each page is the response with its Items (and LastEvaluatedKey)
+    deserialized. With a limit, stops once that many items are returned.
+    """
+    serializer, deserializer = TypeSerializer(), TypeDeserializer()
+    builder = ConditionExpressionBuilder()
+    names = dict(kwargs.pop('ExpressionAttributeNames', {}))
+    values = dict(kwargs.pop('ExpressionAttributeValues', {}))
+    for name in ('KeyConditionExpression', 'FilterExpression'):
+        if isinstance(kwargs.get(name), ConditionBase):
+            expression = builder.build_expression(kwargs[name], is_key_condition=name == 'KeyConditionExpression')
+            kwargs[name] = expression.condition_expression
+            names.update(expression.attribute_name_placeholders)
+            values.update(expression.attribute_value_placeholders)
+    if names:
+        kwargs['ExpressionAttributeNames'] = names
+    if values:
+        kwargs['ExpressionAttributeValues'] = {name: serializer.serialize(value) for name, value in values.items()}
+    if 'ExclusiveStartKey' in kwargs:
+        kwargs['ExclusiveStartKey'] = {name: serializer.serialize(value)
+                                       for name, value in kwargs['ExclusiveStartKey'].items()}
+    if limit:
+        kwargs['Limit'] = limit
+    kwargs.setdefault('ReturnConsumedCapacity', 'TOTAL')
+    
+    call = getattr(client, operation)
+    returned = 0
+    
+    while True:
+        response = call(TableName=table_name, **kwargs)
+        response['Items'] = [{name: deserializer.deserialize(value) for name, value in item.items()}
+                             for item in response['Items']]
+        returned += len(response['Items'])
+        last_key = response.get('LastEvaluatedKey')
+        if last_key is not None:
+            response['LastEvaluatedKey'] = {name: deserializer.deserialize(value)
+                                            for name, value in last_key.items()}
+        yield response
+        
+        if last_key is None or (limit and returned >= limit):
+            break
+        kwargs['ExclusiveStartKey'] = last_key
+
+def paginate_with_client(client, operation, table_name, limit=None, **kwargs):
+    """Run a Query or Scan through a low-level client and follow every page (see iterate_pages_with_client).
+    
+    With a limit, stops once that many items are returned. Returns the
+    items, counts and capacity units.
+    """
+    items = []
+    scanned_count = 0
+    consumed_capacity = 0
+    
+    for response in iterate_pages_with_client(client, operation, table_name, limit, **kwargs):
+        items.extend(response['Items'])
+        scanned_count += response.get('ScannedCount', 0)
+        consumed_capacity += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+    
+    if limit:
+        items = items[:limit]
+    return {
+        'Items': items,
+        'Count': len(items),
+        'ScannedCount': scanned_count,
+        'ConsumedCapacity': consumed_capacity
+    }
+
+class ClientTable:
+    """Thread-safe stand-in for a boto3 Table, backed by a low-level client.
+    
+    get_item, put_item, query and scan take and return plain Python values
+    like the Table methods; query and scan build Key/Attr conditions per call
+    (see iterate_pages_with_client) and return one page. Use it where many
+    threads share a table, e.g. load generators.
+    """
+    
+    def __init__(self, table_name, client=None):
+        self.name = table_name
+        self.client = client or get_shared_dynamodb_client()
+    
+    def get_item(self, Key, **kwargs):
+        serializer, deserializer = TypeSerializer(), TypeDeserializer()
+        response = self.client.get_item(
+            TableName=self.name, Key={name: serializer.serialize(value) for name, value in Key.items()}, **kwargs
+        )
+        if 'Item' in response:
+            response['Item'] = {name: deserializer.deserialize(value) for name, value in response['Item'].items()}
+        return response
+    
+    def put_item(self, Item, **kwargs):
+        serializer = TypeSerializer()
+        return self.client.put_item(
+            TableName=self.name, Item={name: serializer.serialize(value) for name, value in Item.items()}, **kwargs
+        )
+    
+    def query(self, **kwargs):
+        return next(iterate_pages_with_client(self.client, 'query', self.name, **kwargs))
+    
+    def scan(self, **kwargs):
+        return next(iterate_pages_with_client(self.client, 'scan', self.name, **kwargs))
@@ -0,0 +1,138 @@
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
+from utils.dynamodb_helper import load_config, get_shared_dynamodb_client, paginate_with_client
+
+EXPIRATION_INDEX_NAME = 'ExpirationIndex'
+EXPIRY_BUCKET_ATTRIBUTE = 'expiry_bucket'
+TTL_ATTRIBUTE = 'expiration_time'
+
+@lru_cache(maxsize=None)
+def get_expiry_bucket_seconds():
+    """Return the configured expiry bucket width in seconds, or 0 when the expiration index is disabled."""
+    settings = load_config()['dynamodb'].get('expiration_index', {})
+    if not settings.get('enabled'):
+        return 0
+    return max(60, int(settings.get('bucket_seconds', 3600)))
+
+def expiry_bucket_key(expiration_time, bucket_seconds):
+    """Build the index partition key for an expiration time: the UTC start of its bucket, e.g. '2024-01-15T13:00Z'."""
+    start = int(expiration_time) // bucket_seconds * bucket_seconds
+    return datetime.fromtimestamp(start, timezone.utc).strftime('%Y-%m-%dT%H:%MZ')
+
+def add_expiry_bucket(item, bucket_seconds=None):
+    """Set the expiry bucket on items that have a TTL, and leave it off the rest (no-op when disabled).
+
+    Only items with a non-zero expiration time get the attribute, so the
+    index is sparse: items that never expire are not written to it.
+    """
+    if bucket_seconds is None:
+        bucket_seconds = get_expiry_bucket_seconds()
+
+    if bucket_seconds:
+        if item.get(TTL_ATTRIBUTE):
+            item[EXPIRY_BUCKET_ATTRIBUTE] = expiry_bucket_key(item[TTL_ATTRIBUTE], bucket_seconds)
+        else:
+            item.pop(EXPIRY_BUCKET_ATTRIBUTE, None)
+    return item
+
+def expiration_index_definition():
+    """Return the sparse GSI on (expiry_bucket, expiration_time).
+
+    It projects only the keys: monitoring needs the expiration time, and
+    small entries keep the index's write and read costs low.
+    """
+    return {
+        'IndexName': EXPIRATION_INDEX_NAME,
+        'KeySchema': [
+            {
+                'AttributeName': EXPIRY_BUCKET_ATTRIBUTE,
+                'KeyType': 'HASH'
+            },
+            {
+                'AttributeName': TTL_ATTRIBUTE,
+                'KeyType': 'RANGE'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'KEYS_ONLY'
+        },
+        'ProvisionedThroughput': {
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    }
+
+def expiration_index_attribute_definitions():
+    return [
+        {
+            'AttributeName': EXPIRY_BUCKET_ATTRIBUTE,
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': TTL_ATTRIBUTE,
+            'AttributeType': 'N'
+        }
+    ]
+
+def create_expiration_index(dynamodb, table_name):
+    """Add the expiration index to an existing table and wait until it is active.
+
+    `dynamodb` is a low-level client. Items written before the index existed
+    need the expiry bucket attribute (re-run the loaders) to appear in it.
+    """
+    description = dynamodb.describe_table(TableName=table_name)['Table']
+    if any(index['IndexName'] == EXPIRATION_INDEX_NAME for index in description.get('GlobalSecondaryIndexes', [])):
+        return False
+
+    dynamodb.update_table(
+        TableName=table_name,
+        AttributeDefinitions=expiration_index_attribute_definitions(),
+        GlobalSecondaryIndexUpdates=[{'Create': expiration_index_definition()}]
+    )
+    while True:
+        description = dynamodb.describe_table(TableName=table_name)['Table']
+        statuses = [index['IndexStatus'] for index in description.get('GlobalSecondaryIndexes', [])
+                    if index['IndexName'] == EXPIRATION_INDEX_NAME]
+        if statuses == ['ACTIVE']:
+            return True
+        time.sleep(5)
+
+def query_expiry_bucket(client, table_name, bucket, start_time, end_time):
+    """Return the expiration times in one bucket between start_time and end_time, and the capacity consumed."""
+    response = paginate_with_client(
+        client, 'query', table_name,
+        IndexName=EXPIRATION_INDEX_NAME,
+        KeyConditionExpression=Key(EXPIRY_BUCKET_ATTRIBUTE).eq(bucket) & Key(TTL_ATTRIBUTE).between(start_time, end_time),
+        ProjectionExpression='#ttl',
+        ExpressionAttributeNames={'#ttl': TTL_ATTRIBUTE}
+    )
+    return [item[TTL_ATTRIBUTE] for item in response['Items']], response['ConsumedCapacity']
+
+def query_expiration_times(table, start_time, end_time, bucket_seconds=None, max_workers=8, client=None):
+    """Read the expiration times of items expiring between start_time and end_time from the index.
+
+    Queries every bucket overlapping the range in parallel, so the cost
+    depends on the number of expiring items and buckets, not the table size.
+    The queries share a low-level client, as boto3 resources are not thread-safe.
+    """
+    client = client or get_shared_dynamodb_client()
+    bucket_seconds = bucket_seconds or get_expiry_bucket_seconds() or 3600
+    first = int(start_time) // bucket_seconds * bucket_seconds
+    buckets = [expiry_bucket_key(start, bucket_seconds)
+               for start in range(first, int(end_time) + 1, bucket_seconds)]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(buckets))) as executor:
+        futures = [
+            executor.submit(query_expiry_bucket, client, table.name, bucket, int(start_time), int(end_time))
+            for bucket in buckets
+        ]
+        results = [future.result() for future in futures]
+
+    return {
+        'ExpirationTimes': sorted(value for times, _ in results for value in times),
+        'Buckets': len(buckets),
+        'ConsumedCapacity': sum(capacity for _, capacity in results)
+    }
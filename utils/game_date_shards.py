@@ -0,0 +1,78 @@
+import heapq
+import itertools
+import zlib
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
+from utils.dynamodb_helper import load_config, get_shared_dynamodb_client, paginate_with_client
+
+SHARDED_INDEX_NAME = 'GameDateShardIndex'
+SHARD_ATTRIBUTE = 'game_date_shard'
+
+@lru_cache(maxsize=None)
+def get_game_date_shard_count():
+    """Return the configured GameDateIndex shard count, or 0 when sharding is disabled."""
+    sharding = load_config()['dynamodb'].get('game_date_sharding', {})
+    if not sharding.get('enabled'):
+        return 0
+    return max(1, int(sharding.get('shard_count', 1)))
+
+def game_date_shard_key(game_date, shard):
+    """Build the sharded GSI partition key value, e.g. '2024-01-15#3'."""
+    return f"{game_date}#{shard}"
+
+def shard_for_item(item, shard_count):
+    """Pick a stable shard for a game record from its primary key."""
+    key = f"{item['player_id']}#{item['game_id']}".encode('utf-8')
+    return zlib.crc32(key) % shard_count
+
+def add_game_date_shard(item, shard_count=None):
+    """Set the sharded GSI key on a game record (no-op when sharding is disabled)."""
+    if shard_count is None:
+        shard_count = get_game_date_shard_count()
+
+    if shard_count and 'game_date' in item:
+        shard = shard_for_item(item, shard_count)
+        item[SHARD_ATTRIBUTE] = game_date_shard_key(item['game_date'], shard)
+    return item
+
+def query_game_date_shards(table_name, game_date, shard_count, limit=None, max_workers=None, client=None, **query_kwargs):
+    """Fan a game_date query out across all shards in parallel and merge the results by score.
+
+    Each shard is already sorted by score (the GSI sort key), so the merge is a
+    k-way heap merge. With a limit, each shard only needs to return its own top
+    `limit` items for the merged top `limit` to be exact.
+
+    The worker threads share a low-level client (`client`, or the shared one),
+    because boto3 resources are not thread-safe.
+    """
+    client = client or get_shared_dynamodb_client()
+
+    def query_shard(shard):
+        response = paginate_with_client(
+            client, 'query', table_name, limit=limit,
+            IndexName=SHARDED_INDEX_NAME,
+            KeyConditionExpression=Key(SHARD_ATTRIBUTE).eq(game_date_shard_key(game_date, shard)),
+            ScanIndexForward=False,
+            **query_kwargs
+        )
+        return response['Items'], response['ConsumedCapacity']
+
+    with ThreadPoolExecutor(max_workers=max_workers or shard_count) as executor:
+        results = list(executor.map(query_shard, range(shard_count)))
+
+    merged = heapq.merge(
+        *(items for items, _ in results),
+        key=lambda item: item['score'],
+        reverse=True
+    )
+    items = list(itertools.islice(merged, limit)) if limit else list(merged)
+
+    return {
+        'Items': items,
+        'Count': len(items),
+        'ConsumedCapacity': {
+            'TableName': table_name,
+            'CapacityUnits': sum(capacity for _, capacity in results)
+        }
+    }
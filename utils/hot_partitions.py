@@ -0,0 +1,246 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+# Per-partition throughput limits documented for DynamoDB
+PARTITION_RCU_LIMIT = 3000
+PARTITION_WCU_LIMIT = 1000
+
+READ_OPERATIONS = {'GetItem', 'Query', 'BatchGetItem', 'TransactGetItems'}
+WRITE_OPERATIONS = {'PutItem', 'UpdateItem', 'DeleteItem', 'BatchWriteItem', 'TransactWriteItems'}
+
+_EQUALITY = re.compile(r'(#?[A-Za-z0-9_]+)\s*=\s*(:[A-Za-z0-9_]+)')
+
+def _plain(value):
+    """Unwrap a serialized attribute value such as {'S': 'p123'} to 'p123'."""
+    if isinstance(value, dict) and len(value) == 1:
+        type_name, inner = next(iter(value.items()))
+        if type_name in ('S', 'N', 'B'):
+            return inner
+    return value
+
+def query_partition_value(params, partition_attribute):
+    """Find the partition key value in a Query's KeyConditionExpression (base table only)."""
+    if params.get('IndexName'):
+        return None
+    names = params.get('ExpressionAttributeNames', {})
+    values = params.get('ExpressionAttributeValues', {})
+    for name, placeholder in _EQUALITY.findall(params.get('KeyConditionExpression', '')):
+        if names.get(name, name) == partition_attribute and placeholder in values:
+            return _plain(values[placeholder])
+    return None
+
+class PartitionStats:
+    """Request count and consumed capacity for one partition key, with per-second peaks."""
+
+    def __init__(self):
+        self.requests = 0
+        self.read_units = 0.0
+        self.write_units = 0.0
+        self.peak_read_units = 0.0
+        self.peak_write_units = 0.0
+        self._second = None
+        self._second_read = 0.0
+        self._second_write = 0.0
+
+    def add(self, second, requests, read_units, write_units):
+        if second != self._second:
+            self._second, self._second_read, self._second_write = second, 0.0, 0.0
+        self.requests += requests
+        self.read_units += read_units
+        self.write_units += write_units
+        self._second_read += read_units
+        self._second_write += write_units
+        self.peak_read_units = max(self.peak_read_units, self._second_read)
+        self.peak_write_units = max(self.peak_write_units, self._second_write)
+
+    @property
+    def utilization(self):
+        """Peak per-second use of the partition limits, as a fraction of the tighter one."""
+        return max(self.peak_read_units / PARTITION_RCU_LIMIT, self.peak_write_units / PARTITION_WCU_LIMIT)
+
+class HotPartitionTracker:
+    """Count requests and consumed capacity per partition key to find hot partitions.
+
+    Attach it to a client (attach()) to sample live traffic: it asks DynamoDB
+    for ReturnConsumedCapacity and charges each sampled call to the partition
+    key it touched. Batch calls report capacity per table, so it is split
+    evenly across their keys. With sample_rate < 1 only that fraction of calls
+    is recorded and counts are scaled back up. Sampled calls can also be
+    appended to a JSON-lines log and analyzed later with from_log().
+
+    Per-second peaks are per tracker process; with several generator
+    processes, merge their logs instead.
+    """
+
+    def __init__(self, partition_keys=None, sample_rate=1.0, log_path=None):
+        self.partition_keys = dict(partition_keys or {})
+        self.sample_rate = sample_rate
+        self.partitions = defaultdict(PartitionStats)  # (table, partition value) -> PartitionStats
+        self.unattributed = 0
+        self._lock = threading.Lock()
+        self._log = open(log_path, 'a') if log_path else None
+
+    def record(self, table_name, partition_value, read_units=0.0, write_units=0.0, timestamp=None, requests=1):
+        """Charge a request and the capacity it consumed to a partition key."""
+        timestamp = timestamp if timestamp is not None else time.time()
+        scale = 1.0 / self.sample_rate
+        with self._lock:
+            self.partitions[(table_name, partition_value)].add(
+                int(timestamp), requests * scale, read_units * scale, write_units * scale
+            )
+            if self._log:
+                self._log.write(json.dumps({
+                    'timestamp': timestamp, 'table': table_name, 'partition_key': partition_value,
+                    'requests': requests, 'read_units': read_units, 'write_units': write_units,
+                    'sample_rate': self.sample_rate
+                }, default=str) + '\n')
+
+    @classmethod
+    def from_log(cls, path):
+        """Rebuild a tracker from a JSON-lines log written by a previous run."""
+        tracker = cls()
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                tracker.sample_rate = entry.get('sample_rate', 1.0)
+                tracker.record(entry['table'], entry['partition_key'], entry['read_units'],
+                               entry['write_units'], entry['timestamp'], entry.get('requests', 1))
+        return tracker
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def attach(self, client):
+        """Sample calls made through a DynamoDB client (resource users pass resource.meta.client)."""
+        service = client.meta.service_model.service_id.hyphenize()
+        events = client.meta.events
+        # Run after the resource layer has serialized Key/Item values and condition expressions
+        events.register_last(f'before-parameter-build.{service}', self._before_call,
+                             unique_id=f'hot-partitions-params-{service}')
+        events.register(f'after-call.{service}', self._after_call,
+                        unique_id=f'hot-partitions-after-call-{service}')
+        self._describe_table = client.describe_table
+        return client
+
+    def _partition_attribute(self, table_name):
+        if table_name not in self.partition_keys:
+            key_schema = self._describe_table(TableName=table_name)['Table']['KeySchema']
+            self.partition_keys[table_name] = next(
+                key['AttributeName'] for key in key_schema if key['KeyType'] == 'HASH'
+            )
+        return self.partition_keys[table_name]
+
+    def _before_call(self, params, model, context, **kwargs):
+        if model.name not in READ_OPERATIONS | WRITE_OPERATIONS or random.random() >= self.sample_rate:
+            return
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        context['hot_partition_params'] = params
+
+    def _partition_values(self, operation, params):
+        """[(table, partition value), ...] touched by a call."""
+        if operation in ('GetItem', 'UpdateItem', 'DeleteItem', 'PutItem'):
+            table_name = params['TableName']
+            attribute = self._partition_attribute(table_name)
+            key = params.get('Key') or params.get('Item', {})
+            return [(table_name, _plain(key.get(attribute)))]
+        if operation == 'Query':
+            table_name = params['TableName']
+            return [(table_name, query_partition_value(params, self._partition_attribute(table_name)))]
+        if operation == 'BatchGetItem':
+            return [
+                (table_name, _plain(key.get(self._partition_attribute(table_name))))
+                for table_name, request in params['RequestItems'].items()
+                for key in request['Keys']
+            ]
+        if operation == 'BatchWriteItem':
+            touched = []
+            for table_name, requests in params['RequestItems'].items():
+                attribute = self._partition_attribute(table_name)
+                for request in requests:
+                    if 'PutRequest' in request:
+                        touched.append((table_name, _plain(request['PutRequest']['Item'].get(attribute))))
+                    else:
+                        touched.append((table_name, _plain(request['DeleteRequest']['Key'].get(attribute))))
+            return touched
+        # Transactions
+        touched = []
+        for item in params.get('TransactItems', []):
+            for action in item.values():
+                table_name = action['TableName']
+                key = action.get('Key') or action.get('Item', {})
+                touched.append((table_name, _plain(key.get(self._partition_attribute(table_name)))))
+        return touched
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs):
+        params = context.get('hot_partition_params')
+        if params is None or http_response.status_code >= 300:
+            return
+
+        consumed = parsed.get('ConsumedCapacity', [])
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        capacity_by_table = defaultdict(float)
+        for capacity in consumed:
+            capacity_by_table[capacity['TableName']] += capacity.get('CapacityUnits', 0)
+
+        touched = self._partition_values(model.name, params)
+        keys_by_table = defaultdict(list)
+        for table_name, partition_value in touched:
+            keys_by_table[table_name].append(partition_value)
+
+        is_write = model.name in WRITE_OPERATIONS
+        now = time.time()
+        for table_name, partition_values in keys_by_table.items():
+            share = capacity_by_table[table_name] / len(partition_values)
+            for partition_value in partition_values:
+                if partition_value is None:
+                    with self._lock:
+                        self.unattributed += 1
+                    continue
+                self.record(table_name, partition_value,
+                            0.0 if is_write else share, share if is_write else 0.0, now)
+
+    def top_partitions(self, k=10):
+        """The k partition keys closest to their throughput limit, hottest first."""
+        with self._lock:
+            ranked = sorted(
+                self.partitions.items(),
+                key=lambda entry: (entry[1].utilization, entry[1].requests),
+                reverse=True
+            )
+        return ranked[:k]
+
+    def report(self, k=10, warn_utilization=0.5):
+        """Print the hottest partition keys and their share of traffic."""
+        with self._lock:
+            total_requests = sum(stats.requests for stats in self.partitions.values())
+            partitions = len(self.partitions)
+        if not total_requests:
+            print("No partition-level requests recorded.")
+            return
+
+        top = self.top_partitions(k)
+        print(f"\n=== Top {len(top)} Hottest Partition Keys ({partitions} seen) ===")
+        print(f"{'Table':<18} {'Partition key':<20} {'Requests':>9} {'Share':>7} {'RCU':>9} {'WCU':>9} "
+              f"{'Peak RCU/s':>11} {'Peak WCU/s':>11} {'Limit used':>10}")
+        for (table_name, partition_value), stats in top:
+            flag = "  <-- HOT" if stats.utilization >= warn_utilization else ""
+            print(f"{table_name:<18} {str(partition_value):<20} {stats.requests:>9.0f} "
+                  f"{stats.requests / total_requests:>7.1%} {stats.read_units:>9.1f} {stats.write_units:>9.1f} "
+                  f"{stats.peak_read_units:>11.1f} {stats.peak_write_units:>11.1f} {stats.utilization:>10.1%}{flag}")
+
+        by_requests = sorted((stats.requests for stats in self.partitions.values()), reverse=True)
+        print(f"\nTop 1 partition key: {by_requests[0] / total_requests:.1%} of requests; "
+              f"top 10: {sum(by_requests[:10]) / total_requests:.1%}")
+        print(f"Per-partition limits: {PARTITION_RCU_LIMIT} RCU/s and {PARTITION_WCU_LIMIT} WCU/s. "
+              f"Keys above {warn_utilization:.0%} of a limit are flagged HOT.")
+        if self.unattributed:
+            print(f"Requests whose partition key could not be determined (e.g. GSI queries): {self.unattributed}")
@@ -0,0 +1,625 @@
+import atexit
+import bisect
+import json
+import os
+import socket
+import threading
+import time
+import weakref
+from collections import deque, defaultdict
+from utils.dynamodb_helper import load_config
+from utils.retry import THROTTLING_ERROR_CODES, _table_names
+
+WRITE_OPERATIONS = {
+    'PutItem', 'UpdateItem', 'DeleteItem', 'BatchWriteItem', 'TransactWriteItems'
+}
+
+# Upper bounds in seconds, roughly x2 apart, from 1ms to ~65s
+LATENCY_BUCKETS = tuple(0.001 * (2 ** i) for i in range(17))
+# Upper bounds for per-call attempt counts
+ATTEMPT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+class Histogram:
+    """Fixed-bucket histogram (a count per bucket upper bound, plus sum/min/max)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """Estimate a percentile by interpolating inside the bucket it falls in."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(value, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min or 0.0,
+            'max': self.max or 0.0,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99)
+        }
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of latencies with bounded relative error.
+
+    Values are recorded in whole microseconds. Below 2**significant_bits they
+    are exact; above that, each power of two is split into
+    2**(significant_bits - 1) linear sub-buckets, so any recorded value is
+    within 2**-(significant_bits - 1) of its bucket (under 1% with the
+    default 8 bits) from 1 microsecond to hours. Counts are kept sparsely by
+    bucket index, so two histograms with the same precision merge by adding
+    counts, and to_dict()/from_dict() carry them across processes.
+    """
+
+    def __init__(self, significant_bits=8):
+        self.significant_bits = significant_bits
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, micros):
+        length = micros.bit_length()
+        if length <= self.significant_bits:
+            return micros
+        shift = length - self.significant_bits
+        return (shift << (self.significant_bits - 1)) + (micros >> shift)
+
+    def _bucket_range(self, index):
+        """(lowest, highest) microsecond values that map to a bucket index."""
+        if index < (1 << self.significant_bits):
+            return index, index
+        half = 1 << (self.significant_bits - 1)
+        shift = (index >> (self.significant_bits - 1)) - 1
+        mantissa = index - shift * half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds):
+        micros = max(0, int(seconds * 1_000_000))
+        self.counts[self._index(micros)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        """Add another histogram's counts into this one (both must use the same precision)."""
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("Cannot merge latency histograms with different precision")
+        for index, bucket_count in other.counts.items():
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, p):
+        """Value (seconds) at or below which p percent of recordings fall, to bucket precision."""
+        if not self.count:
+            return 0.0
+        rank = max(1, p / 100 * self.count)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                lowest, highest = self._bucket_range(index)
+                value = (lowest + highest) / 2 / 1_000_000
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min or 0.0,
+            'max': self.max or 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9)
+        }
+
+    def copy(self):
+        return LatencyHistogram(self.significant_bits).merge(self)
+
+    def to_dict(self):
+        return {
+            'significant_bits': self.significant_bits,
+            'counts': {str(index): bucket_count for index, bucket_count in self.counts.items()},
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['significant_bits'])
+        histogram.counts.update({int(index): bucket_count for index, bucket_count in data['counts'].items()})
+        histogram.count = data['count']
+        histogram.sum = data['sum']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+class LatencyRecorder:
+    """End-to-end call latency per (operation, table, index), as seen by this process.
+
+    Each thread records into its own histograms behind its own lock, so
+    recording threads never contend with each other; snapshot() merges every
+    thread's histograms. dump() appends the merged, cumulative histograms to
+    a JSON-lines file, and from_dumps() merges the latest dump of every
+    process writing to one or more such files.
+    """
+
+    def __init__(self, significant_bits=8):
+        self.significant_bits = significant_bits
+        self._local = threading.local()
+        self._thread_histograms = []  # (lock, {key: LatencyHistogram}) per recording thread
+        self._merged = {}             # histograms loaded from dumps
+        self._lock = threading.Lock()
+        self._dumper = None
+        self._stop = threading.Event()
+
+    def record(self, operation, table, index, seconds):
+        slot = getattr(self._local, 'slot', None)
+        if slot is None:
+            slot = self._local.slot = (threading.Lock(), {})
+            with self._lock:
+                self._thread_histograms.append(slot)
+        key = (operation, table, index or '-')
+        # The per-thread lock is only ever contended by snapshot()
+        with slot[0]:
+            histogram = slot[1].get(key)
+            if histogram is None:
+                histogram = slot[1][key] = LatencyHistogram(self.significant_bits)
+            histogram.record(seconds)
+
+    def snapshot(self):
+        """{(operation, table, index): LatencyHistogram} merged across threads (and loaded dumps)."""
+        merged = {key: histogram.copy() for key, histogram in self._merged.items()}
+        with self._lock:
+            slots = list(self._thread_histograms)
+        for lock, histograms in slots:
+            with lock:
+                for key, histogram in histograms.items():
+                    if key in merged:
+                        merged[key].merge(histogram)
+                    else:
+                        merged[key] = histogram.copy()
+        return merged
+
+    def reset(self):
+        with self._lock:
+            slots = list(self._thread_histograms)
+            self._merged = {}
+        for lock, histograms in slots:
+            with lock:
+                histograms.clear()
+
+    def dump(self, path):
+        """Append this process's cumulative histograms to a JSON-lines file."""
+        entry = {
+            'time': time.time(),
+            'source': f"{socket.gethostname()}:{os.getpid()}",
+            'histograms': [
+                {'operation': operation, 'table': table, 'index': index, 'histogram': histogram.to_dict()}
+                for (operation, table, index), histogram in self.snapshot().items()
+            ]
+        }
+        with open(path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    @classmethod
+    def from_dumps(cls, paths):
+        """Merge the most recent dump of every process found in the given files."""
+        latest = {}
+        for path in paths:
+            with open(path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry['source'] not in latest or entry['time'] >= latest[entry['source']]['time']:
+                            latest[entry['source']] = entry
+
+        recorder = cls()
+        for entry in latest.values():
+            for item in entry['histograms']:
+                key = (item['operation'], item['table'], item['index'])
+                histogram = LatencyHistogram.from_dict(item['histogram'])
+                if key in recorder._merged:
+                    recorder._merged[key].merge(histogram)
+                else:
+                    recorder._merged[key] = histogram
+        return recorder
+
+    def report(self, title="Client-side Latency (end to end)"):
+        """Print p50/p90/p99/p99.9 per operation, table and index, in milliseconds."""
+        snapshot = self.snapshot()
+        print(f"\n=== {title} ===")
+        if not snapshot:
+            print("No calls recorded.")
+            return
+        print(f"{'Operation':<20} {'Table':<18} {'Index':<16} {'Count':>8} {'p50':>8} {'p90':>8} "
+              f"{'p99':>8} {'p99.9':>8} {'Max':>8}")
+        for (operation, table, index), histogram in sorted(snapshot.items()):
+            summary = histogram.snapshot()
+            print(f"{operation:<20} {table:<18} {index:<16} {summary['count']:>8} "
+                  f"{summary['p50'] * 1000:>8.1f} {summary['p90'] * 1000:>8.1f} {summary['p99'] * 1000:>8.1f} "
+                  f"{summary['p999'] * 1000:>8.1f} {summary['max'] * 1000:>8.1f}")
+
+    def start_periodic_dump(self, interval, path=None, report=True):
+        """Every `interval` seconds, print the report and/or append a dump to `path`, on a daemon thread."""
+        if self._dumper is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                if report:
+                    self.report()
+                if path:
+                    self.dump(path)
+
+        self._dumper = threading.Thread(target=run, name='latency-dump', daemon=True)
+        self._dumper.start()
+
+    def stop_periodic_dump(self):
+        if self._dumper is not None:
+            self._stop.set()
+            self._dumper.join()
+            self._dumper = None
+
+class MetricsRegistry:
+    """In-process, thread-safe store of labelled counters and histograms.
+
+    Metrics are keyed by name plus a sorted tuple of label pairs, e.g.
+    ('dynamodb_throttles_total', (('code', 'ProvisionedThroughputExceededException'),
+    ('operation', 'GetItem'), ('table', 'GameLeaderboard'))).
+    """
+
+    def __init__(self, recent_requests=200):
+        self._lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.recent_requests = deque(maxlen=recent_requests)
+        self._collectors = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        with self._lock:
+            self.counters[self._key(name, labels)] += value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def record_request(self, **details):
+        with self._lock:
+            self.recent_requests.append(details)
+
+    def counter_total(self, name, **labels):
+        """Sum a counter over every label set that matches the given labels."""
+        with self._lock:
+            return sum(
+                value for (metric, metric_labels), value in self.counters.items()
+                if metric == name and all(item in metric_labels for item in labels.items())
+            )
+
+    def register_collector(self, collect):
+        """Add a callable that returns [(name, type, labels, value), ...] whenever metrics are exported.
+
+        Used for values that live elsewhere, such as cache hit counts. Bound
+        methods are held weakly, so a collected object stops reporting once it
+        is garbage collected.
+        """
+        reference = weakref.WeakMethod(collect) if hasattr(collect, '__self__') else (lambda: collect)
+        with self._lock:
+            self._collectors.append(reference)
+
+    def collect(self):
+        """Samples from the registered collectors: [(name, type, labels, value), ...] with type 'counter' or 'gauge'."""
+        with self._lock:
+            self._collectors = [reference for reference in self._collectors if reference() is not None]
+            collectors = [reference() for reference in self._collectors]
+        samples = []
+        for collect in collectors:
+            if collect is not None:
+                samples.extend(collect())
+        return samples
+
+    def histogram_buckets(self):
+        """{(name, labels): (bucket upper bounds, counts per bucket incl. +Inf, count, sum)} for exporters."""
+        with self._lock:
+            return {
+                key: (histogram.buckets, list(histogram.counts), histogram.count, histogram.sum)
+                for key, histogram in self.histograms.items()
+            }
+
+    def snapshot(self):
+        """Copy of all metrics: {'counters': {...}, 'histograms': {...}, 'recent_requests': [...]}."""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {key: histogram.snapshot() for key, histogram in self.histograms.items()},
+                'recent_requests': list(self.recent_requests)
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.recent_requests.clear()
+
+    def report(self):
+        """Print counters and histogram summaries, grouped by metric name."""
+        snapshot = self.snapshot()
+        print("\n=== DynamoDB Client Metrics ===")
+        for (name, labels), value in sorted(snapshot['counters'].items()):
+            label_text = ', '.join(f"{label}={label_value}" for label, label_value in labels)
+            print(f"{name}{{{label_text}}}: {value:g}")
+        for (name, labels), summary in sorted(snapshot['histograms'].items()):
+            label_text = ', '.join(f"{label}={label_value}" for label, label_value in labels)
+            print(f"{name}{{{label_text}}}: count={summary['count']} mean={summary['mean']:.4f} "
+                  f"p50={summary['p50']:.4f} p90={summary['p90']:.4f} p99={summary['p99']:.4f} max={summary['max']:.4f}")
+
+_default_registry = MetricsRegistry()
+
+def get_metrics_registry():
+    """Return the process-wide registry that the helper's clients report into."""
+    return _default_registry
+
+_default_latency_recorder = LatencyRecorder()
+
+def get_latency_recorder():
+    """Return the process-wide recorder of end-to-end latency histograms for the helper's clients."""
+    return _default_latency_recorder
+
+class ClientInstrumentation:
+    """Record attempts, retries, backoff, throttles, latency and request IDs from botocore events.
+
+    Handlers only observe; they never change whether or how a request is retried.
+
+    - before-parameter-build: remember the table(s) a call targets
+    - before-call: start the call timer
+    - request-created: count attempts; for retries, the time since the previous
+      attempt's response is the backoff (plus any client-side rate limiting)
+    - before-send / needs-retry: HTTP latency of each attempt, status, error
+      code and request ID
+    - after-call / after-call-error: call latency and attempts per call, and
+      the end-to-end latency (retries and backoff included) in the latency
+      recorder's HDR histogram for the operation, table and index
+    - after-call also counts consumed read/write capacity units (for calls
+      that return ConsumedCapacity) and items left in UnprocessedItems /
+      UnprocessedKeys by batch calls
+
+    With return_consumed_capacity=True every call that supports it asks for
+    ReturnConsumedCapacity=TOTAL (unless it already set the parameter); this
+    is the one case where a handler changes a request.
+    """
+
+    def __init__(self, registry=None, latency_recorder=None, return_consumed_capacity=False):
+        self.registry = registry or get_metrics_registry()
+        self.latency_recorder = latency_recorder or get_latency_recorder()
+        self.return_consumed_capacity = return_consumed_capacity
+        self._local = threading.local()
+
+    def attach(self, client):
+        service = client.meta.service_model.service_id.hyphenize()
+        events = client.meta.events
+        handlers = [
+            ('before-parameter-build', self._capture_tables),
+            ('before-call', self._before_call),
+            ('request-created', self._request_created),
+            ('before-send', self._before_send),
+            ('needs-retry', self._after_attempt),
+            ('after-call', self._after_call),
+            ('after-call-error', self._after_call_error)
+        ]
+        for event, handler in handlers:
+            # Run right before the HTTP send (after any rate limiting); everything else runs first.
+            # The needs-retry handler returns None, so it never overrides the retry decision.
+            register = events.register_last if event == 'before-send' else events.register_first
+            register(f'{event}.{service}', handler, unique_id=f'instrumentation-{event}-{service}')
+        return client
+
+    @staticmethod
+    def _labels(context, operation):
+        tables = context.get('instrumented_tables') or ['-']
+        return {'operation': operation, 'table': ','.join(tables)}
+
+    def _capture_tables(self, params, model, context, **kwargs):
+        context['instrumented_tables'] = _table_names(params)
+        context['instrumented_index'] = params.get('IndexName')
+        if self.return_consumed_capacity and 'ReturnConsumedCapacity' in model.input_shape.members:
+            params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+    def _before_call(self, model, context, **kwargs):
+        context['instrumented_call_start'] = time.perf_counter()
+        context['instrumented_operation'] = model.name
+
+    def _request_created(self, request, operation_name, **kwargs):
+        context = request.context
+        labels = self._labels(context, operation_name)
+        self.registry.increment('dynamodb_attempts_total', **labels)
+
+        responded_at = context.pop('instrumented_retry_at', None)
+        if responded_at is not None:
+            self.registry.increment('dynamodb_retries_total', **labels)
+            backoff = time.perf_counter() - responded_at
+            self.registry.increment('dynamodb_backoff_seconds_total', backoff, **labels)
+            self.registry.observe('dynamodb_backoff_seconds', backoff, **labels)
+
+    def _before_send(self, request, **kwargs):
+        # Sending and receiving a response happen on the same thread
+        self._local.sent_at = time.perf_counter()
+
+    def _after_attempt(self, response, attempts, caught_exception, operation, request_dict, **kwargs):
+        now = time.perf_counter()
+        context = request_dict['context']
+        labels = self._labels(context, operation.name)
+
+        sent_at = getattr(self._local, 'sent_at', None)
+        self._local.sent_at = None
+        if sent_at is not None:
+            self.registry.observe('dynamodb_http_latency_seconds', now - sent_at, **labels)
+
+        if caught_exception is not None:
+            status, code, request_id = None, type(caught_exception).__name__, None
+        else:
+            http_response, parsed = response
+            status = http_response.status_code
+            code = parsed.get('Error', {}).get('Code')
+            request_id = parsed.get('ResponseMetadata', {}).get('RequestId')
+
+        if code:
+            self.registry.increment('dynamodb_errors_total', code=code, **labels)
+            if code in THROTTLING_ERROR_CODES:
+                self.registry.increment('dynamodb_throttles_total', code=code, **labels)
+            # If the request is retried, request-created measures the wait from here
+            context['instrumented_retry_at'] = now
+
+        self.registry.record_request(
+            time=time.time(),
+            operation=operation.name,
+            table=labels['table'],
+            attempt=attempts,
+            status=status,
+            error_code=code,
+            request_id=request_id
+        )
+        return None
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs):
+        labels = self._labels(context, model.name)
+        outcome = 'success' if http_response.status_code < 300 else parsed.get('Error', {}).get('Code', 'error')
+        if outcome == 'success':
+            self._count_capacity(model.name, parsed)
+        self._finish_call(context, labels, outcome, parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0) + 1)
+
+    def _count_capacity(self, operation, parsed):
+        consumed = parsed.get('ConsumedCapacity', [])
+        for capacity in [consumed] if isinstance(consumed, dict) else consumed:
+            labels = {'operation': operation, 'table': capacity.get('TableName', '-')}
+            if 'ReadCapacityUnits' in capacity or 'WriteCapacityUnits' in capacity:
+                read_units = capacity.get('ReadCapacityUnits', 0)
+                write_units = capacity.get('WriteCapacityUnits', 0)
+            elif operation in WRITE_OPERATIONS:
+                read_units, write_units = 0, capacity.get('CapacityUnits', 0)
+            else:
+                read_units, write_units = capacity.get('CapacityUnits', 0), 0
+            if read_units:
+                self.registry.increment('dynamodb_consumed_read_units_total', read_units, **labels)
+            if write_units:
+                self.registry.increment('dynamodb_consumed_write_units_total', write_units, **labels)
+
+        unprocessed = parsed.get('UnprocessedItems') or parsed.get('UnprocessedKeys') or {}
+        for table_name, requests in unprocessed.items():
+            count = len(requests['Keys']) if isinstance(requests, dict) else len(requests)
+            self.registry.increment('dynamodb_unprocessed_items_total', count, operation=operation, table=table_name)
+
+    def _after_call_error(self, exception, context, **kwargs):
+        labels = self._labels(context, context.get('instrumented_operation', '-'))
+        self._finish_call(context, labels, type(exception).__name__, None)
+
+    def _finish_call(self, context, labels, outcome, attempts):
+        context.pop('instrumented_retry_at', None)
+        self.registry.increment('dynamodb_calls_total', outcome=outcome, **labels)
+        started = context.get('instrumented_call_start')
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            self.registry.observe('dynamodb_call_latency_seconds', elapsed, **labels)
+            self.latency_recorder.record(
+                labels['operation'], labels['table'], context.get('instrumented_index'), elapsed
+            )
+        if attempts is not None:
+            self.registry.observe('dynamodb_attempts_per_call', attempts, buckets=ATTEMPT_BUCKETS, **labels)
+
+_report_registered = False
+_enabled_by_script = False
+
+def enable_instrumentation():
+    """Instrument clients created from now on, even when config.json leaves instrumentation off.
+
+    For scripts whose output is the metrics themselves, such as
+    with_retry.py and client_latency.py.
+    """
+    global _enabled_by_script
+    _enabled_by_script = True
+
+def instrument_client(client, registry=None):
+    """Attach instrumentation to a client when enabled in config.json (off by default).
+
+    With instrumentation.latency_dump_interval > 0, the process-wide latency
+    recorder prints its percentiles (and appends a dump to
+    latency_dump_path, if set) every that many seconds. With
+    instrumentation.prometheus_port set, the first instrumented client starts
+    a Prometheus exporter on that port (see utils/metrics_exporter.py), and
+    with metric_publisher.enabled it starts publishing per-interval metrics
+    to CloudWatch (see utils/metric_publisher.py).
+    """
+    global _report_registered
+    settings = load_config().get('instrumentation', {})
+    if not (settings.get('enabled', False) or _enabled_by_script):
+        return client
+
+    instrumentation = ClientInstrumentation(
+        registry, return_consumed_capacity=settings.get('return_consumed_capacity', False)
+    )
+    instrumentation.attach(client)
+    if settings.get('report_on_exit') and not _report_registered:
+        _report_registered = True
+        atexit.register(instrumentation.registry.report)
+        atexit.register(instrumentation.latency_recorder.report)
+    if settings.get('latency_dump_interval'):
+        instrumentation.latency_recorder.start_periodic_dump(
+            settings['latency_dump_interval'], settings.get('latency_dump_path')
+        )
+    if settings.get('prometheus_port'):
+        from utils.metrics_exporter import start_metrics_exporter
+        start_metrics_exporter(settings['prometheus_port'], settings.get('prometheus_host', '127.0.0.1'))
+    publisher = load_config().get('metric_publisher', {})
+    if publisher.get('enabled'):
+        from utils.metric_publisher import start_metric_publisher
+        start_metric_publisher(
+            namespace=publisher.get('namespace', 'GameLeaderboard/Client'),
+            interval=publisher.get('interval', 60),
+            mode=publisher.get('mode', 'emf'),
+            stream=publisher.get('emf_log_path')
+        )
+    return client
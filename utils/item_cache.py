@@ -0,0 +1,454 @@
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from boto3.dynamodb.conditions import AttributeBase, ConditionBase
+from utils.dynamodb_helper import get_dynamodb_resource
+from utils.batch_operations import batch_get_items
+from utils.single_flight import SingleFlight
+from utils.instrumentation import get_metrics_registry
+
+_MISSING = object()
+
+def freeze(value):
+    """Turn a key, item or expression value into a hashable, order-independent form."""
+    if isinstance(value, dict):
+        return tuple(sorted((name, freeze(inner)) for name, inner in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(inner) for inner in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(inner) for inner in value)
+    return value
+
+def freeze_query(value):
+    """Like freeze, but also handles boto3 condition objects such as Key('player_id').eq(...)."""
+    if isinstance(value, ConditionBase):
+        expression = value.get_expression()
+        return (expression['operator'], tuple(freeze_query(inner) for inner in expression['values']))
+    if isinstance(value, AttributeBase):
+        return (type(value).__name__, value.name)
+    if isinstance(value, dict):
+        return tuple(sorted((name, freeze_query(inner)) for name, inner in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_query(inner) for inner in value)
+    return freeze(value)
+
+_EQUALITY_PATTERN = re.compile(r'([#\w.]+)\s*=\s*(:\w+)')
+_ANY_VALUE = '*'
+
+def key_condition_equalities(condition, names=None, values=None):
+    """Return the (attribute, value) pairs a key condition pins with '='.
+
+    Works for both boto3 condition objects and expression strings that use
+    ExpressionAttributeNames/ExpressionAttributeValues placeholders.
+    """
+    if isinstance(condition, ConditionBase):
+        expression = condition.get_expression()
+        operands = expression['values']
+        if expression['operator'] == '=' and isinstance(operands[0], AttributeBase):
+            return [(operands[0].name, operands[1])]
+        pairs = []
+        for operand in operands:
+            if isinstance(operand, ConditionBase):
+                pairs.extend(key_condition_equalities(operand))
+        return pairs
+
+    names = names or {}
+    values = values or {}
+    return [
+        (names.get(name, name), values[placeholder])
+        for name, placeholder in _EQUALITY_PATTERN.findall(condition or '')
+        if placeholder in values
+    ]
+
+class ItemCache:
+    """Thread-safe, size-bounded LRU cache with a per-entry time to live.
+
+    Entries can carry tags so that a group of them (for example every query
+    result for one partition key) can be invalidated together.
+    """
+
+    def __init__(self, max_size=1000, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=_MISSING):
+        """Return the cached value for key, or default when absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value, ttl=None, tags=()):
+        """Store a value, evicting the least recently used entries above max_size."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        tags = frozenset(tags)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        """Remove an entry and its tag references. Caller holds the lock."""
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, key):
+        """Drop a single entry."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tag(self, tag):
+        """Drop every entry stored with the given tag."""
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tags_where(self, predicate):
+        """Drop every entry stored with a tag for which predicate(tag) is true."""
+        with self._lock:
+            for tag in [tag for tag in self._tags if predicate(tag)]:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """Return hit/miss counters and the current hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+    def metric_samples(self, **labels):
+        """Hit, miss and eviction counters and the entry count, for utils.metrics_exporter."""
+        stats = self.stats
+        return [
+            ('dynamodb_cache_hits_total', 'counter', labels, stats['hits']),
+            ('dynamodb_cache_misses_total', 'counter', labels, stats['misses']),
+            ('dynamodb_cache_evictions_total', 'counter', labels, stats['evictions']),
+            ('dynamodb_cache_entries', 'gauge', labels, stats['size'])
+        ]
+
+def single_flight_samples(single_flight, **labels):
+    """Execution and sharing counters of a SingleFlight, for utils.metrics_exporter."""
+    stats = single_flight.stats
+    return [
+        ('dynamodb_single_flight_executions_total', 'counter', labels, stats['executions']),
+        ('dynamodb_single_flight_shared_total', 'counter', labels, stats['shared'])
+    ]
+
+class CachedTable:
+    """Read-through item and query cache in front of a DynamoDB table.
+
+    GetItem and BatchGetItem results (including "not found") are cached per
+    (table, key). Writes made through put_item, update_item and delete_item
+    invalidate the written key. Writes made by anyone else become visible
+    once the entry's TTL runs out. Strongly consistent reads always go to
+    DynamoDB and refresh the cache. Reads with a projection skip the cache.
+
+    Query results are cached per (index, key condition, filter, projection,
+    limit, ...) for query_ttl seconds, which bounds how stale they can be.
+    A query is tagged with the partition key value it targets, for example
+    player_id or game_date. A write through this wrapper invalidates every
+    cached query whose partition value the write touches.
+
+    Concurrent identical misses share a single request (see SingleFlight).
+
+    Any other Table method is passed straight through.
+    """
+
+    def __init__(self, dynamodb, table_name, cache=None, max_size=1000, ttl=30.0,
+                 query_max_size=200, query_ttl=5.0):
+        self.dynamodb = dynamodb
+        self.table = dynamodb.Table(table_name)
+        self.single_flight = SingleFlight()
+        self.cache = cache if cache is not None else ItemCache(max_size=max_size, ttl=ttl)
+        self.query_cache = ItemCache(max_size=query_max_size, ttl=query_ttl)
+        self._key_attributes = None
+        self._partition_attributes = None
+        get_metrics_registry().register_collector(self.metric_samples)
+
+    def metric_samples(self):
+        return (
+            self.cache.metric_samples(table=self.table.name, cache='items')
+            + self.query_cache.metric_samples(table=self.table.name, cache='queries')
+            + single_flight_samples(self.single_flight, table=self.table.name)
+        )
+
+    @property
+    def name(self):
+        return self.table.name
+
+    @property
+    def key_attributes(self):
+        """Primary key attribute names, read once from the table description."""
+        if self._key_attributes is None:
+            self._key_attributes = [key['AttributeName'] for key in self.table.key_schema]
+        return self._key_attributes
+
+    @property
+    def partition_attributes(self):
+        """Partition key names of the table and its global secondary indexes."""
+        if self._partition_attributes is None:
+            schemas = [self.table.key_schema]
+            schemas.extend(index['KeySchema'] for index in self.table.global_secondary_indexes or [])
+            self._partition_attributes = {
+                key['AttributeName'] for schema in schemas for key in schema if key['KeyType'] == 'HASH'
+            }
+        return self._partition_attributes
+
+    def _cache_key(self, key):
+        return (self.table.name, freeze(key))
+
+    def _key_of(self, item):
+        return {name: item[name] for name in self.key_attributes}
+
+    def __getattr__(self, name):
+        if name == 'table':
+            raise AttributeError(name)
+        return getattr(self.table, name)
+
+    def get_item(self, Key, **kwargs):
+        """GetItem served from the cache when possible."""
+
+        if 'ProjectionExpression' in kwargs or 'AttributesToGet' in kwargs:
+            return self.table.get_item(Key=Key, **kwargs)
+
+        cache_key = self._cache_key(Key)
+        if not kwargs.get('ConsistentRead'):
+            item = self.cache.get(cache_key)
+            if item is not _MISSING:
+                response = {'Item': copy.deepcopy(item)} if item is not None else {}
+                if kwargs.get('ReturnConsumedCapacity', 'NONE') != 'NONE':
+                    response['ConsumedCapacity'] = {'TableName': self.table.name, 'CapacityUnits': 0.0}
+                return response
+
+        if kwargs.get('ConsistentRead'):
+            response = self.table.get_item(Key=Key, **kwargs)
+        else:
+            response = self.single_flight.do(
+                ('GetItem',) + cache_key + (freeze(kwargs),),
+                self.table.get_item, Key=Key, **kwargs
+            )
+        self.cache.put(cache_key, copy.deepcopy(response.get('Item')))
+        return response
+
+    def batch_get_items(self, keys, max_retries=8):
+        """Fetch many items, sending only cache misses to BatchGetItem.
+
+        Misses are fetched with utils.batch_operations.batch_get_items, which
+        retries unprocessed keys and throttled requests with backoff. Returns
+        {'Items': [...], 'UnprocessedKeys': [...]}, the latter holding the keys
+        DynamoDB still had not returned after max_retries (not cached).
+        """
+
+        found = []
+        misses = []
+        unprocessed_keys = []
+        for key in keys:
+            item = self.cache.get(self._cache_key(key))
+            if item is _MISSING:
+                misses.append(key)
+            elif item is not None:
+                found.append(copy.deepcopy(item))
+
+        if misses:
+            response = batch_get_items(self.dynamodb, self.table.name, misses, preserve_order=True,
+                                       max_retries=max_retries)
+            unprocessed = {self._cache_key(key) for key in response['UnprocessedKeys']}
+            for key, item in zip(misses, response['Items']):
+                cache_key = self._cache_key(key)
+                if cache_key in unprocessed:
+                    unprocessed_keys.append(key)
+                    continue
+                self.cache.put(cache_key, copy.deepcopy(item))
+                if item is not None:
+                    found.append(item)
+
+        return {'Items': found, 'UnprocessedKeys': unprocessed_keys}
+
+    def query(self, **kwargs):
+        """Query served from the query cache when an identical query is still fresh."""
+
+        if kwargs.get('ConsistentRead'):
+            return self.table.query(**kwargs)
+
+        cache_key = (self.table.name, freeze_query({
+            name: value for name, value in kwargs.items() if name != 'ReturnConsumedCapacity'
+        }))
+        response = self.query_cache.get(cache_key)
+        if response is not _MISSING:
+            response = copy.deepcopy(response)
+            if kwargs.get('ReturnConsumedCapacity', 'NONE') != 'NONE':
+                response['ConsumedCapacity'] = {'TableName': self.table.name, 'CapacityUnits': 0.0}
+            return response
+
+        response = self.single_flight.do(('Query',) + cache_key, self.table.query, **kwargs)
+
+        pinned = key_condition_equalities(
+            kwargs.get('KeyConditionExpression'),
+            kwargs.get('ExpressionAttributeNames'),
+            kwargs.get('ExpressionAttributeValues')
+        )
+        tags = [(name, freeze(value)) for name, value in pinned if name in self.partition_attributes]
+        cached = {name: value for name, value in response.items()
+                  if name not in ('ResponseMetadata', 'ConsumedCapacity')}
+        self.query_cache.put(cache_key, copy.deepcopy(cached), tags=tags or [_ANY_VALUE])
+        return response
+
+    def _invalidate_queries(self, attribute_sets, kwargs=None, complete=True):
+        """Invalidate cached queries whose partition value a write touches.
+
+        attribute_sets are the attributes known for the write: the key, the
+        item written and the attributes DynamoDB returned. When they may miss
+        some of the item's attributes (complete=False), every query on a
+        partition attribute none of them has is dropped.
+        """
+
+        seen = set()
+        for attributes in attribute_sets:
+            for name in self.partition_attributes & set(attributes):
+                self.query_cache.invalidate_tag((name, freeze(attributes[name])))
+                seen.add(name)
+
+        # An update that sets a partition attribute moves the item to a new
+        # partition whose value we cannot see, so drop every query on it.
+        changed = set()
+        if kwargs and 'UpdateExpression' in kwargs:
+            expression = kwargs['UpdateExpression']
+            mentioned = set(re.findall(r'[#\w]+', expression))
+            mentioned |= {kwargs.get('ExpressionAttributeNames', {}).get(name) for name in mentioned}
+            changed = self.partition_attributes & mentioned
+        if not complete:
+            changed |= self.partition_attributes - seen
+        if changed:
+            self.query_cache.invalidate_tags_where(
+                lambda tag: tag != _ANY_VALUE and tag[0] in changed
+            )
+
+        self.query_cache.invalidate_tag(_ANY_VALUE)
+
+    def _write(self, operation, key, kwargs, item=None):
+        """Run a write and invalidate the caches from the key and old/new item."""
+
+        # Ask for the old item so that, for example, a delete can invalidate
+        # queries by game_date even though game_date is not part of the key.
+        added_return_values = kwargs.get('ReturnValues', 'NONE') == 'NONE'
+        if added_return_values:
+            kwargs['ReturnValues'] = 'ALL_OLD'
+        # UPDATED_OLD/UPDATED_NEW leave out the attributes an update did not change
+        complete = kwargs['ReturnValues'] in ('ALL_OLD', 'ALL_NEW')
+
+        attribute_sets = [key] + ([item] if item else [])
+        try:
+            response = operation(**kwargs)
+            attribute_sets.append(response.get('Attributes', {}))
+            if added_return_values:
+                response.pop('Attributes', None)
+            return response
+        finally:
+            self.cache.invalidate(self._cache_key(self._key_of(key)))
+            self._invalidate_queries(attribute_sets, kwargs, complete)
+
+    def put_item(self, Item, **kwargs):
+        """PutItem, invalidating the written key and the queries it affects."""
+        return self._write(self.table.put_item, self._key_of(Item), dict(kwargs, Item=Item), item=Item)
+
+    def update_item(self, Key, **kwargs):
+        """UpdateItem, invalidating the updated key and the queries it affects."""
+        return self._write(self.table.update_item, Key, dict(kwargs, Key=Key))
+
+    def delete_item(self, Key, **kwargs):
+        """DeleteItem, invalidating the deleted key and the queries it affects."""
+        return self._write(self.table.delete_item, Key, dict(kwargs, Key=Key))
+
+class CoalescingTable:
+    """Table wrapper that shares in-flight GetItem and Query requests without caching.
+
+    Threads that issue the same eventually consistent GetItem or Query while
+    an identical request is outstanding wait for it instead of sending their
+    own. Strongly consistent reads and all other methods pass straight through.
+    """
+
+    def __init__(self, table, single_flight=None):
+        self.table = table
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        get_metrics_registry().register_collector(self.metric_samples)
+
+    def metric_samples(self):
+        return single_flight_samples(self.single_flight, table=self.table.name)
+
+    def __getattr__(self, name):
+        if name == 'table':
+            raise AttributeError(name)
+        return getattr(self.table, name)
+
+    def get_item(self, **kwargs):
+        """GetItem, shared with any identical request already in flight."""
+        if kwargs.get('ConsistentRead'):
+            return self.table.get_item(**kwargs)
+        key = ('GetItem', self.table.name, freeze_query(kwargs))
+        return self.single_flight.do(key, self.table.get_item, **kwargs)
+
+    def query(self, **kwargs):
+        """Query, shared with any identical request already in flight."""
+        if kwargs.get('ConsistentRead'):
+            return self.table.query(**kwargs)
+        key = ('Query', self.table.name, freeze_query(kwargs))
+        return self.single_flight.do(key, self.table.query, **kwargs)
+
+def get_cached_table(table_name, max_size=1000, ttl=30.0, query_max_size=200, query_ttl=5.0):
+    """Create a CachedTable using the config.json connection settings."""
+    return CachedTable(
+        get_dynamodb_resource(), table_name,
+        max_size=max_size, ttl=ttl,
+        query_max_size=query_max_size, query_ttl=query_ttl
+    )
@@ -0,0 +1,30 @@
+import bisect
+import itertools
+import random
+
+DISTRIBUTIONS = ('uniform', 'zipf')
+
+def zipf_weights(n, skew=1.1):
+    """Unnormalised Zipf weights 1 / rank^skew for ranks 1..n."""
+    return [1.0 / (rank ** skew) for rank in range(1, n + 1)]
+
+def make_key_sampler(keys, distribution='uniform', skew=1.1, seed=None):
+    """Return a function that picks a key from `keys` following the given distribution.
+
+    'uniform' picks every key with equal probability. 'zipf' gives the key at
+    rank r a probability proportional to 1 / r^skew, so the first few keys in
+    the list receive most of the traffic (hot keys).
+    """
+    if not keys:
+        raise ValueError("Cannot sample from an empty key list")
+    rng = random.Random(seed)
+
+    if distribution == 'uniform':
+        return lambda: keys[rng.randrange(len(keys))]
+
+    if distribution == 'zipf':
+        cumulative = list(itertools.accumulate(zipf_weights(len(keys), skew)))
+        total = cumulative[-1]
+        return lambda: keys[bisect.bisect_left(cumulative, rng.random() * total)]
+
+    raise ValueError(f"Unknown key distribution '{distribution}', expected one of {DISTRIBUTIONS}")
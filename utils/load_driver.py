@@ -0,0 +1,277 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+from utils.retry import THROTTLING_ERROR_CODES, CircuitOpenError
+
+def load_key_pool(table, max_keys, key_attributes=('player_id', 'game_id')):
+    """Scan up to max_keys primary keys once, so load tests don't spend requests finding keys."""
+    keys = []
+    kwargs = {'ProjectionExpression': ', '.join(key_attributes)}
+    while len(keys) < max_keys:
+        response = table.scan(**kwargs)
+        keys.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return keys[:max_keys]
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class OperationMix:
+    """Weighted mix of labelled operations, e.g. {'read': (70, read_fn), 'write': (30, write_fn)}."""
+
+    def __init__(self, operations):
+        self.labels = list(operations)
+        self.weights = [weight for weight, _ in operations.values()]
+        self.operations = {label: operation for label, (_, operation) in operations.items()}
+
+    def pick(self):
+        label = random.choices(self.labels, weights=self.weights, k=1)[0]
+        return label, self.operations[label]
+
+class LoadResult:
+    """Outcomes of one load run: per-request latency, status and retry count.
+
+    Requests recorded with a label are also tallied in `by_label[label]`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.outcomes = {'success': 0, 'throttled': 0, 'shed': 0, 'error': 0}
+        self.retries = 0
+        self.duration = 0.0
+        self.by_label = {}
+
+    def record(self, latency, outcome, retries=0, label=None):
+        with self._lock:
+            self.latencies.append(latency)
+            self.outcomes[outcome] += 1
+            self.retries += retries
+            if label is not None and label not in self.by_label:
+                self.by_label[label] = LoadResult()
+        if label is not None:
+            self.by_label[label].record(latency, outcome, retries)
+
+    def merge(self, other):
+        """Add another result's requests into this one (durations are left to the caller)."""
+        with other._lock:
+            latencies = list(other.latencies)
+            outcomes = dict(other.outcomes)
+            retries = other.retries
+            by_label = dict(other.by_label)
+        with self._lock:
+            self.latencies.extend(latencies)
+            for outcome, count in outcomes.items():
+                self.outcomes[outcome] += count
+            self.retries += retries
+            for label in by_label:
+                if label not in self.by_label:
+                    self.by_label[label] = LoadResult()
+        for label, result in by_label.items():
+            self.by_label[label].merge(result)
+
+    def set_duration(self, duration):
+        self.duration = duration
+        for result in self.by_label.values():
+            result.duration = duration
+
+    def summary(self):
+        """Aggregate the run into the numbers used to compare strategies."""
+        requests = sum(self.outcomes.values())
+        latencies = sorted(self.latencies)
+        duration = self.duration or 1e-9
+        return {
+            'requests': requests,
+            'succeeded': self.outcomes['success'],
+            'throttled': self.outcomes['throttled'],
+            'shed': self.outcomes['shed'],
+            'errors': self.outcomes['error'],
+            'success_rate': self.outcomes['success'] / requests if requests else 0.0,
+            'retries': self.retries,
+            'attempts_per_second': (requests + self.retries) / duration,
+            'throughput': requests / duration,
+            'goodput': self.outcomes['success'] / duration,
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'duration': self.duration
+        }
+
+def _retry_attempts(response):
+    return response.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+
+def run_operation(operation, result, scheduled_at=None, label=None):
+    """Call operation() once and record its latency, outcome and SDK retry count.
+
+    In open-loop runs `scheduled_at` is when the request should have started;
+    measuring from it rather than from the actual start counts time spent
+    queued behind slow requests (avoids coordinated omission).
+    """
+    start = scheduled_at if scheduled_at is not None else time.perf_counter()
+    try:
+        response = operation()
+        outcome, retries = 'success', _retry_attempts(response or {})
+    except CircuitOpenError:
+        outcome, retries = 'shed', 0
+    except ClientError as e:
+        throttled = e.response['Error']['Code'] in THROTTLING_ERROR_CODES
+        outcome, retries = ('throttled' if throttled else 'error'), _retry_attempts(e.response)
+    except Exception:
+        outcome, retries = 'error', 0
+    result.record(time.perf_counter() - start, outcome, retries, label)
+
+class OpenLoopGenerator:
+    """Start requests on a precise schedule from a persistent worker pool.
+
+    Requests are released at exact times derived from the target rate, whether
+    or not earlier ones have finished. This is how independent users behave: a
+    slow or throttled table does not slow the arrival rate, so queues and
+    retries pile up as they would in production. Latency is measured from each
+    request's scheduled time, so time spent waiting for a free worker counts
+    (no coordinated omission).
+
+    The schedule carries over between run() calls, so a load can be driven as
+    a series of windows (e.g. a ramp) without gaps or bursts at the boundaries.
+    Each request is recorded in the window in which it completes, so a
+    window's result is final once run() returns and slow requests are not
+    dropped from it.
+    """
+
+    def __init__(self, max_workers=64):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._next_time = None
+        # Completions outside run() wait here for the next run() or close()
+        self._result = LoadResult()
+        self.scheduled = 0
+
+    @property
+    def in_flight(self):
+        """Requests scheduled but not yet finished (queued for a worker or running)."""
+        return self._in_flight
+
+    def record(self, latency, outcome, retries=0, label=None):
+        """Record a completed request in the result of the window it completed in."""
+        with self._lock:
+            self._result.record(latency, outcome, retries, label)
+
+    def _run(self, operation, scheduled_at):
+        try:
+            if isinstance(operation, OperationMix):
+                label, operation = operation.pick()
+            else:
+                label = None
+            run_operation(operation, self, scheduled_at, label)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def run(self, operation, rate, duration, result=None):
+        """Schedule `operation` (a callable or an OperationMix) at `rate` requests/second for `duration` seconds.
+
+        `rate` is a number or a function of the seconds elapsed in this run,
+        for loads that change continuously. Returns as soon as the last request
+        is scheduled. `result` holds every request that completed during the
+        run, including requests scheduled by earlier runs; requests still in
+        flight are recorded by the next run(), or returned by close().
+        """
+        result = result if result is not None else LoadResult()
+        rate_at = rate if callable(rate) else (lambda elapsed: rate)
+        with self._lock:
+            result.merge(self._result)
+            self._result = result
+
+        now = time.perf_counter()
+        if self._next_time is None or self._next_time < now - 1.0:
+            # First run, or the caller paused between runs: restart the schedule now
+            self._next_time = now
+        start = self._next_time
+        end = start + duration
+
+        while self._next_time < end:
+            scheduled_at = self._next_time
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            current_rate = rate_at(scheduled_at - start)
+            if current_rate <= 0:
+                # A zero rate sends nothing and checks the rate function again on the next tick
+                self._next_time = scheduled_at + 0.01
+                continue
+
+            with self._lock:
+                self._in_flight += 1
+            self.scheduled += 1
+            self.executor.submit(self._run, operation, scheduled_at)
+            self._next_time = scheduled_at + 1.0 / current_rate
+
+        with self._lock:
+            self._result = LoadResult()
+        return result
+
+    def close(self, wait=True):
+        """Stop the worker pool, by default after in-flight requests finish.
+
+        Returns a LoadResult of the requests that completed after the last run() returned.
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        with self._lock:
+            remaining, self._result = self._result, LoadResult()
+        return remaining
+
+def run_open_loop(operation, target_rps, duration, max_workers=64):
+    """Drive `operation` at a fixed arrival rate for `duration` seconds and wait for it to finish."""
+    generator = OpenLoopGenerator(max_workers=max_workers)
+    start = time.perf_counter()
+    result = generator.run(operation, target_rps, duration)
+    result.merge(generator.close())
+    result.set_duration(time.perf_counter() - start)
+    return result
+
+def run_closed_loop(operation, concurrency, duration, target_rps=None):
+    """Run `concurrency` workers that each send their next request when the previous one returns.
+
+    With a target_rps each worker is paced to target_rps / concurrency;
+    otherwise workers run flat out, and the table's latency caps the request rate.
+    """
+    result = LoadResult()
+    interval = concurrency / target_rps if target_rps else 0.0
+    start = time.perf_counter()
+    deadline = start + duration
+
+    def worker(offset):
+        next_start = start + offset * interval / concurrency
+        while True:
+            now = time.perf_counter()
+            if interval and next_start > now:
+                time.sleep(next_start - now)
+            if time.perf_counter() >= deadline:
+                break
+            run_operation(operation, result)
+            next_start += interval
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.set_duration(time.perf_counter() - start)
+    return result
+
+def run_load(operation, mode='open', target_rps=50, duration=30, concurrency=16):
+    """Drive `operation` with an open- or closed-loop load and return its LoadResult."""
+    if mode == 'open':
+        return run_open_loop(operation, target_rps, duration, max_workers=max(concurrency, 1))
+    if mode == 'closed':
+        return run_closed_loop(operation, concurrency, duration, target_rps)
+    raise ValueError(f"Unknown load mode '{mode}', expected 'open' or 'closed'")
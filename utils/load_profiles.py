@@ -0,0 +1,262 @@
+import json
+import math
+import os
+import time
+from boto3.dynamodb.conditions import Key
+from utils.dynamodb_helper import ClientTable
+from utils.game_date_shards import add_game_date_shard
+from utils.item_cache import CoalescingTable
+from utils.key_distributions import make_key_sampler
+from utils.load_driver import OpenLoopGenerator, OperationMix, LoadResult, load_key_pool
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'load-profiles')
+OPERATIONS = ('read', 'write', 'query', 'scan')
+PHASE_TYPES = ('constant', 'ramp', 'step', 'spike', 'diurnal')
+
+DEFAULT_PROFILE = {
+    'table': 'GameLeaderboard',
+    'workers': 64,
+    'key_pool_size': 1000,
+    'report_interval': 5,
+    'coalesce_reads': False,
+    'mix': {'read': 70, 'write': 30},
+    'key_distribution': {'type': 'uniform'}
+}
+
+def load_profile(path):
+    """Read a load profile from a .json (or, with PyYAML installed, .yaml/.yml) file.
+
+    A bare name such as 'season-launch' is looked up in the load-profiles directory.
+    """
+    if not os.path.exists(path) and not os.path.dirname(path):
+        for extension in ('.json', '.yaml', '.yml'):
+            candidate = os.path.join(PROFILES_DIR, path + extension)
+            if os.path.exists(candidate):
+                path = candidate
+                break
+
+    with open(path, 'r') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML load profiles need PyYAML: pip install pyyaml")
+            profile = yaml.safe_load(f)
+        else:
+            profile = json.load(f)
+
+    return validate_profile(profile)
+
+def validate_profile(profile):
+    """Fill in defaults and check phases, mixes and key distributions; returns the completed profile."""
+    profile = {**DEFAULT_PROFILE, **profile}
+    if not profile.get('phases'):
+        raise ValueError("A load profile needs at least one phase")
+
+    for index, phase in enumerate(profile['phases']):
+        phase.setdefault('name', f"phase-{index + 1}")
+        phase_type = phase.get('type', 'constant')
+        if phase_type not in PHASE_TYPES:
+            raise ValueError(f"Phase '{phase['name']}': unknown type '{phase_type}', expected one of {PHASE_TYPES}")
+        if phase.get('duration') is None and index != len(profile['phases']) - 1:
+            raise ValueError(f"Phase '{phase['name']}': only the last phase may run without a duration")
+        unknown = set(phase.get('mix', profile['mix'])) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"Phase '{phase['name']}': unknown operations {sorted(unknown)}, expected {OPERATIONS}")
+    return profile
+
+def phase_rate(phase):
+    """Return the phase's target rate as a function of seconds since the phase started."""
+    phase_type = phase.get('type', 'constant')
+
+    if phase_type == 'constant':
+        rate = phase['rate']
+        return lambda elapsed: rate
+
+    if phase_type == 'ramp':
+        # Linear from 'from' to 'to' over the phase duration
+        start, end, duration = phase['from'], phase['to'], phase['duration']
+        return lambda elapsed: start + (end - start) * min(1.0, elapsed / duration)
+
+    if phase_type == 'step':
+        # Staircase: add 'step' every 'step_duration' seconds, capped at 'to'
+        start, step, step_duration = phase['from'], phase['step'], phase['step_duration']
+        ceiling = phase.get('to', float('inf'))
+        return lambda elapsed: min(ceiling, start + step * int(elapsed // step_duration))
+
+    if phase_type == 'spike':
+        # 'base' rate with a jump to 'peak' for 'spike_duration' seconds, reached over 'rise' seconds
+        base, peak = phase['base'], phase['peak']
+        spike_start, spike_duration = phase.get('spike_start', 0), phase['spike_duration']
+        rise = phase.get('rise', 0)
+
+        def spike(elapsed):
+            into_spike = elapsed - spike_start
+            if into_spike < 0 or into_spike > spike_duration:
+                return base
+            if rise and into_spike < rise:
+                return base + (peak - base) * into_spike / rise
+            return peak
+        return spike
+
+    if phase_type == 'diurnal':
+        # Cosine wave between 'min' and 'max', starting at the trough, one cycle per 'period' seconds
+        low, high, period = phase['min'], phase['max'], phase['period']
+        return lambda elapsed: low + (high - low) * (1 - math.cos(2 * math.pi * elapsed / period)) / 2
+
+    raise ValueError(f"Unknown phase type '{phase_type}'")
+
+def describe_phase(phase):
+    """One-line human description of a phase's shape."""
+    phase_type = phase.get('type', 'constant')
+    duration = f"{phase['duration']}s" if phase.get('duration') is not None else "until stopped"
+    shapes = {
+        'constant': lambda: f"{phase['rate']} ops/s",
+        'ramp': lambda: f"{phase['from']} -> {phase['to']} ops/s",
+        'step': lambda: f"{phase['from']} ops/s +{phase['step']} every {phase['step_duration']}s"
+                        + (f" up to {phase['to']}" if 'to' in phase else ""),
+        'spike': lambda: f"{phase['base']} ops/s, spike to {phase['peak']} at {phase.get('spike_start', 0)}s "
+                         f"for {phase['spike_duration']}s",
+        'diurnal': lambda: f"{phase['min']}-{phase['max']} ops/s, period {phase['period']}s"
+    }
+    return f"{phase['name']}: {phase_type}, {shapes[phase_type]()}, {duration}"
+
+class ProfileRunner:
+    """Replay a load profile against a table with one open-loop engine.
+
+    Every phase gets its own operation mix and key distribution (inheriting the
+    profile-level ones), and its rate function is driven in report_interval
+    windows by a single OpenLoopGenerator, so the schedule runs continuously
+    from one phase to the next.
+
+    `record_factory` builds the items written by 'write' operations. With a
+    non-uniform key distribution, written games are attributed to players
+    drawn from the same distribution, so hot players are hot for writes too.
+
+    The generator's worker threads share one low-level client (`client`, or
+    the shared one) through a ClientTable, since boto3 resources are not
+    thread-safe.
+    """
+
+    def __init__(self, profile, record_factory, client=None):
+        self.profile = profile
+        self.record_factory = record_factory
+        self.table = ClientTable(profile['table'], client)
+        self.reads_table = CoalescingTable(self.table) if profile['coalesce_reads'] else self.table
+        self.keys = []
+        self.results = []  # (phase name, LoadResult) per completed phase
+
+    def _operations(self, phase):
+        mix = phase.get('mix', self.profile['mix'])
+        distribution = phase.get('key_distribution', self.profile['key_distribution'])
+        next_key = make_key_sampler(self.keys, distribution.get('type', 'uniform'), distribution.get('skew', 1.1))
+        hot_writes = distribution.get('type', 'uniform') != 'uniform'
+
+        def read():
+            key = next_key()
+            return self.reads_table.get_item(Key={'player_id': key['player_id'], 'game_id': key['game_id']})
+
+        def write():
+            record = self.record_factory()
+            if hot_writes:
+                record['player_id'] = next_key()['player_id']
+                add_game_date_shard(record)
+            return self.table.put_item(Item=record)
+
+        def query():
+            return self.reads_table.query(KeyConditionExpression=Key('player_id').eq(next_key()['player_id']), Limit=10)
+
+        def scan():
+            return self.table.scan(Limit=50)
+
+        functions = {'read': read, 'write': write, 'query': query, 'scan': scan}
+        return OperationMix({name: (weight, functions[name]) for name, weight in mix.items() if weight > 0})
+
+    def print_window(self, phase, elapsed, target_rps, result, generator):
+        """Print achieved rates and latencies for one reporting window."""
+        summary = result.summary()
+        line = (f"[{phase['name']} {elapsed:6.0f}s] target {target_rps:6.1f} ops/s | "
+                f"achieved {summary['throughput']:6.1f} ops/s")
+        for label in OPERATIONS:
+            if label in result.by_label:
+                label_summary = result.by_label[label].summary()
+                line += (f" | {label} {label_summary['throughput']:.1f}/s "
+                         f"p50/p99 {label_summary['p50'] * 1000:.0f}/{label_summary['p99'] * 1000:.0f} ms")
+        line += f" | throttled {summary['throttled']} | in flight {generator.in_flight}"
+        print(line)
+
+    def run(self):
+        """Run every phase in order (stop with Ctrl+C); returns [(phase name, LoadResult), ...]."""
+        profile = self.profile
+        self.keys = load_key_pool(self.table, profile['key_pool_size'])
+        if not self.keys:
+            print("No items found in table. Please load data first.")
+            return self.results
+
+        print(f"=== Replaying load profile: {profile.get('name', 'unnamed')} ===")
+        for phase in profile['phases']:
+            print(f"  {describe_phase(phase)}")
+        print(f"Key pool: {len(self.keys)} keys. Press Ctrl+C to stop")
+
+        generator = OpenLoopGenerator(max_workers=profile['workers'])
+        interval = profile['report_interval']
+        try:
+            for phase in profile['phases']:
+                operations = self._operations(phase)
+                rate_at = phase_rate(phase)
+                duration = phase.get('duration')
+                phase_start = time.perf_counter()
+                phase_result = LoadResult()
+                self.results.append((phase['name'], phase_result))
+
+                # Phase time follows the request schedule, not the wall clock,
+                # so windows line up exactly with the phase duration
+                elapsed = 0.0
+                while duration is None or elapsed < duration:
+                    window_start = time.perf_counter()
+                    window = interval if duration is None else min(interval, duration - elapsed)
+                    # Requests are recorded in the window they complete in, so
+                    # the result is final (and safe to merge) once run() returns
+                    result = generator.run(
+                        operations,
+                        lambda window_elapsed, offset=elapsed: rate_at(offset + window_elapsed),
+                        window
+                    )
+                    result.set_duration(time.perf_counter() - window_start)
+                    phase_result.merge(result)
+                    self.print_window(phase, elapsed, rate_at(elapsed), result, generator)
+                    elapsed += window
+
+                phase_result.set_duration(time.perf_counter() - phase_start)
+        except KeyboardInterrupt:
+            print("\nTraffic generation stopped.")
+            if self.results:
+                self.results[-1][1].set_duration(time.perf_counter() - phase_start)
+            remaining = generator.close(wait=False)
+        else:
+            remaining = generator.close()
+        # Requests still in flight when the last window ended belong to the last phase
+        if self.results:
+            self.results[-1][1].merge(remaining)
+
+        self.print_summary()
+        return self.results
+
+    def print_summary(self):
+        print("\n=== Load Profile Summary ===")
+        for name, result in self.results:
+            summary = result.summary()
+            print(f"{name}: {summary['requests']} requests in {summary['duration']:.0f}s "
+                  f"({summary['throughput']:.1f} ops/s), success {summary['success_rate']:.1%}, "
+                  f"throttled {summary['throttled']}, p50/p99 {summary['p50'] * 1000:.0f}/{summary['p99'] * 1000:.0f} ms")
+        if isinstance(self.reads_table, CoalescingTable):
+            stats = self.reads_table.single_flight.stats
+            print(f"Reads sent: {stats['executions']}, shared with an in-flight read: {stats['shared']}")
+
+def run_profile(profile, record_factory, client=None):
+    """Load (if given a path or name) and replay a load profile."""
+    if isinstance(profile, str):
+        profile = load_profile(profile)
+    else:
+        profile = validate_profile(profile)
+    return ProfileRunner(profile, record_factory, client).run()
@@ -0,0 +1,188 @@
+import atexit
+import json
+import sys
+import threading
+from datetime import datetime, timezone
+from utils.instrumentation import get_metrics_registry, get_latency_recorder, LatencyHistogram
+
+DEFAULT_NAMESPACE = 'GameLeaderboard/Client'
+# Metric datums per put_metric_data call
+MAX_METRICS_PER_CALL = 20
+
+# (registry counter, published metric name, count only unsuccessful calls)
+COUNTER_METRICS = [
+    ('dynamodb_calls_total', 'Calls', False),
+    ('dynamodb_calls_total', 'Errors', True),
+    ('dynamodb_throttles_total', 'Throttles', False),
+    ('dynamodb_retries_total', 'Retries', False)
+]
+
+def _histogram_delta(current, previous):
+    """Recordings in `current` that were not yet in `previous` (both cumulative)."""
+    delta = LatencyHistogram(current.significant_bits)
+    for index, bucket_count in current.counts.items():
+        difference = bucket_count - (previous.counts.get(index, 0) if previous else 0)
+        if difference > 0:
+            delta.counts[index] = difference
+            delta.count += difference
+    delta.sum = current.sum - (previous.sum if previous else 0.0)
+    if delta.count:
+        # Bounds of the interval's values are not tracked; use the bucket range
+        indexes = sorted(delta.counts)
+        delta.min = delta._bucket_range(indexes[0])[0] / 1_000_000
+        delta.max = delta._bucket_range(indexes[-1])[1] / 1_000_000
+    return delta
+
+class MetricPublisher:
+    """Publish per-interval client-side metrics to CloudWatch without per-request API calls.
+
+    Every `interval` seconds a background thread takes the difference between
+    the instrumentation's cumulative counters and latency histograms and the
+    previous flush, and publishes, per operation and table: Calls, Errors,
+    Throttles, Retries and ClientLatencyP50/P90/P99 (milliseconds, end to
+    end). With mode 'emf' each (operation, table) becomes one CloudWatch
+    Embedded Metric Format JSON line on `stream` (stdout by default, or a
+    file path), which the CloudWatch agent or Lambda turn into metrics; with
+    mode 'put_metric_data' datums are sent in batches of 20 per call.
+    """
+
+    def __init__(self, namespace=DEFAULT_NAMESPACE, interval=60, mode='emf', stream=None,
+                 cloudwatch=None, registry=None, latency_recorder=None):
+        if mode not in ('emf', 'put_metric_data'):
+            raise ValueError(f"Unknown metric publisher mode '{mode}', expected 'emf' or 'put_metric_data'")
+        self.namespace = namespace
+        self.interval = interval
+        self.mode = mode
+        self.registry = registry or get_metrics_registry()
+        self.latency_recorder = latency_recorder or get_latency_recorder()
+        if mode == 'put_metric_data' and cloudwatch is None:
+            import boto3
+            cloudwatch = boto3.client('cloudwatch')
+        self.cloudwatch = cloudwatch
+        # A path is opened (and later closed) here; a stream passed in stays the caller's
+        self._owns_stream = isinstance(stream, str)
+        self._stream = open(stream, 'a') if self._owns_stream else (stream or sys.stdout)
+        self._previous_counters = {}
+        self._previous_histograms = {}
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.calls = 0
+
+    def start(self):
+        """Flush every interval on a daemon thread, and once more at exit."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='metric-publisher', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Metric publisher: flush failed: {e}")
+
+    def close(self):
+        """Stop the flush thread, publish what is left and close the file opened for `stream`."""
+        if self._owns_stream and self._stream.closed:
+            return
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        try:
+            self.flush()
+        finally:
+            if self._owns_stream:
+                self._stream.close()
+
+    def collect(self):
+        """{(operation, table): {metric name: (value, unit)}} for the interval since the previous call."""
+        values = {}
+        counters = self.registry.snapshot()['counters']
+        for metric, published_name, errors_only in COUNTER_METRICS:
+            for (name, labels), total in counters.items():
+                label_map = dict(labels)
+                if name != metric or (errors_only and label_map.get('outcome') == 'success'):
+                    continue
+                key = (published_name, labels)
+                delta = total - self._previous_counters.get(key, 0)
+                self._previous_counters[key] = total
+                if delta:
+                    series = values.setdefault((label_map['operation'], label_map['table']), {})
+                    previous = series.get(published_name, (0, 'Count'))[0]
+                    series[published_name] = (previous + delta, 'Count')
+
+        for (operation, table, index), histogram in self.latency_recorder.snapshot().items():
+            delta = _histogram_delta(histogram, self._previous_histograms.get((operation, table, index)))
+            self._previous_histograms[(operation, table, index)] = histogram
+            if not delta.count or index != '-':
+                continue
+            series = values.setdefault((operation, table), {})
+            for percentile in (50, 90, 99):
+                series[f'ClientLatencyP{percentile}'] = (delta.percentile(percentile) * 1000, 'Milliseconds')
+        return values
+
+    def flush(self):
+        """Publish everything recorded since the previous flush."""
+        with self._flush_lock:
+            values = self.collect()
+            if not values:
+                return
+            timestamp = datetime.now(timezone.utc)
+            if self.mode == 'emf':
+                self._write_emf(values, timestamp)
+            else:
+                self._put_metric_data(values, timestamp)
+
+    def _write_emf(self, values, timestamp):
+        for (operation, table), metrics in values.items():
+            document = {
+                '_aws': {
+                    'Timestamp': int(timestamp.timestamp() * 1000),
+                    'CloudWatchMetrics': [{
+                        'Namespace': self.namespace,
+                        'Dimensions': [['Operation', 'Table']],
+                        'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()]
+                    }]
+                },
+                'Operation': operation,
+                'Table': table
+            }
+            document.update({name: value for name, (value, _) in metrics.items()})
+            self._stream.write(json.dumps(document) + '\n')
+            self.published += len(metrics)
+        self._stream.flush()
+
+    def _put_metric_data(self, values, timestamp):
+        datums = [
+            {
+                'MetricName': name,
+                'Dimensions': [{'Name': 'Operation', 'Value': operation}, {'Name': 'Table', 'Value': table}],
+                'Timestamp': timestamp,
+                'Value': value,
+                'Unit': unit
+            }
+            for (operation, table), metrics in values.items()
+            for name, (value, unit) in metrics.items()
+        ]
+        for offset in range(0, len(datums), MAX_METRICS_PER_CALL):
+            self.cloudwatch.put_metric_data(Namespace=self.namespace,
+                                            MetricData=datums[offset:offset + MAX_METRICS_PER_CALL])
+            self.calls += 1
+        self.published += len(datums)
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+def start_metric_publisher(**options):
+    """Start the process-wide publisher once; later calls return the running one."""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = MetricPublisher(**options).start()
+        return _publisher
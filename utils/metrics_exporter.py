@@ -0,0 +1,165 @@
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.instrumentation import get_metrics_registry, get_latency_recorder
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+LATENCY_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+HELP = {
+    'dynamodb_attempts_total': 'HTTP attempts sent to DynamoDB',
+    'dynamodb_retries_total': 'Attempts that were retries',
+    'dynamodb_backoff_seconds_total': 'Time spent waiting between attempts',
+    'dynamodb_backoff_seconds': 'Wait before each retry',
+    'dynamodb_http_latency_seconds': 'Latency of each HTTP attempt',
+    'dynamodb_errors_total': 'Attempts that failed, by error code',
+    'dynamodb_throttles_total': 'Attempts rejected by throttling',
+    'dynamodb_calls_total': 'API calls, by outcome',
+    'dynamodb_call_latency_seconds': 'Latency of each API call including retries',
+    'dynamodb_attempts_per_call': 'Attempts needed per API call',
+    'dynamodb_consumed_read_units_total': 'Read capacity units reported in ConsumedCapacity',
+    'dynamodb_consumed_write_units_total': 'Write capacity units reported in ConsumedCapacity',
+    'dynamodb_unprocessed_items_total': 'Items or keys returned unprocessed by batch calls',
+    'dynamodb_client_latency_seconds': 'End-to-end call latency quantiles from HDR histograms',
+    'dynamodb_cache_hits_total': 'Cache lookups answered from the cache',
+    'dynamodb_cache_misses_total': 'Cache lookups that went to DynamoDB',
+    'dynamodb_cache_evictions_total': 'Entries evicted to stay within the cache size',
+    'dynamodb_cache_entries': 'Entries currently cached',
+    'dynamodb_single_flight_executions_total': 'Reads sent to DynamoDB by request coalescing',
+    'dynamodb_single_flight_shared_total': 'Reads answered by another caller\'s in-flight request'
+}
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_metrics(registry=None, latency_recorder=None, openmetrics=False):
+    """Render the registry's counters and histograms, collector samples and latency quantiles as exposition text.
+
+    Produces the Prometheus text format (0.0.4), or OpenMetrics 1.0 when
+    openmetrics is true (counter families are then named without the _total
+    suffix and the output ends with # EOF).
+    """
+    registry = registry or get_metrics_registry()
+    latency_recorder = latency_recorder or get_latency_recorder()
+    families = {}  # name -> (type, {label set: [sample lines]})
+
+    def family(name, metric_type, labels=()):
+        # Each series keeps its lines in generation order (e.g. histogram buckets by le)
+        return families.setdefault(name, (metric_type, {}))[1].setdefault(_labels_text(labels), [])
+
+    for (name, labels), value in registry.snapshot()['counters'].items():
+        family(name, 'counter', labels).append(f"{name}{_labels_text(labels)} {_number(value)}")
+
+    for (name, labels), (buckets, counts, count, total) in registry.histogram_buckets().items():
+        lines = family(name, 'histogram', labels)
+        cumulative = 0
+        for upper, bucket_count in zip(list(buckets) + [math.inf], counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_labels_text(labels, [('le', _number(float(upper)))])} {cumulative}")
+        lines.append(f"{name}_count{_labels_text(labels)} {count}")
+        lines.append(f"{name}_sum{_labels_text(labels)} {_number(total)}")
+
+    # Several objects (e.g. two caches on one table) can report the same series; add them up
+    collected = {}
+    for name, metric_type, labels, value in registry.collect():
+        key = (name, metric_type, tuple(sorted(labels.items())))
+        collected[key] = collected.get(key, 0) + value
+    for (name, metric_type, labels), value in collected.items():
+        family(name, metric_type, labels).append(f"{name}{_labels_text(labels)} {_number(value)}")
+
+    for (operation, table, index), histogram in latency_recorder.snapshot().items():
+        labels = [('index', index), ('operation', operation), ('table', table)]
+        lines = family('dynamodb_client_latency_seconds', 'summary', labels)
+        for quantile in LATENCY_QUANTILES:
+            lines.append(f"dynamodb_client_latency_seconds{_labels_text(labels, [('quantile', str(quantile))])} "
+                         f"{_number(histogram.percentile(quantile * 100))}")
+        lines.append(f"dynamodb_client_latency_seconds_count{_labels_text(labels)} {histogram.count}")
+        lines.append(f"dynamodb_client_latency_seconds_sum{_labels_text(labels)} {_number(histogram.sum)}")
+
+    output = []
+    for name in sorted(families):
+        metric_type, series = families[name]
+        family_name = name
+        if openmetrics and metric_type == 'counter' and name.endswith('_total'):
+            family_name = name[:-len('_total')]
+            if family_name in families:
+                # e.g. dynamodb_backoff_seconds_total duplicates the _sum of the histogram of the same family
+                continue
+        if name in HELP:
+            output.append(f"# HELP {family_name} {HELP[name]}")
+        output.append(f"# TYPE {family_name} {metric_type}")
+        for labels in sorted(series):
+            output.extend(series[labels])
+    if openmetrics:
+        output.append('# EOF')
+    return '\n'.join(output) + '\n'
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+    latency_recorder = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+        body = render_metrics(self.registry, self.latency_recorder, openmetrics).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the lab scripts' output
+        pass
+
+class MetricsExporter:
+    """Serve the helper's client metrics on http://host:port/metrics for Prometheus to scrape.
+
+    Everything is rendered from in-process state at scrape time, so exporting
+    makes no AWS API calls. Runs on a daemon thread until close().
+    """
+
+    def __init__(self, port=9108, host='127.0.0.1', registry=None, latency_recorder=None):
+        handler = type('MetricsHandler', (_MetricsHandler,), {
+            'registry': registry or get_metrics_registry(),
+            'latency_recorder': latency_recorder or get_latency_recorder()
+        })
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-exporter', daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+def start_metrics_exporter(port=9108, host='127.0.0.1'):
+    """Start the process-wide exporter for the default registry once; later calls return the running one."""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = MetricsExporter(port, host)
+            print(f"Prometheus metrics on http://{host}:{_exporter.port}/metrics")
+        return _exporter
@@ -0,0 +1,65 @@
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket used to keep request rates under a capacity budget.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. acquire()
+    blocks until enough tokens are available. consume() takes tokens without
+    waiting and may drive the balance negative. Use it to charge for capacity
+    that turned out higher than estimated, so later callers wait it off.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them. Returns the time waited.
+
+        Requests larger than the burst capacity wait for a full bucket and
+        then leave it in debt, so the average rate still holds.
+        """
+        needed = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return waited
+                delay = (needed - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self, tokens=1):
+        """Take `tokens` if they are available right now; return whether it succeeded."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def consume(self, tokens):
+        """Take tokens without waiting (the balance may go negative)."""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+
+    def set_rate(self, rate, capacity=None):
+        """Change the refill rate (and optionally the burst capacity)."""
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+            if capacity is not None:
+                self.capacity = float(capacity)
+            self._tokens = min(self._tokens, self.capacity)
@@ -0,0 +1,359 @@
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from utils.dynamodb_helper import load_config
+from utils.rate_limiter import TokenBucket
+
+THROTTLING_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded'
+}
+
+TRANSIENT_ERROR_CODES = {
+    'InternalServerError',
+    'ServiceUnavailable'
+}
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+def decorrelated_jitter(previous_delay, base=0.025, cap=20.0):
+    """Next backoff delay using decorrelated jitter: uniform(base, 3 * previous), capped.
+
+    Unlike full jitter on a fixed exponential schedule, each delay depends on
+    the one before it, which spreads out clients that were throttled together.
+    """
+    return min(cap, random.uniform(base, max(base, previous_delay * 3)))
+
+class AdaptiveRateLimiter:
+    """Client-side send rate for one table, adjusted with AIMD.
+
+    The limiter lets everything through until the first throttle. From then on
+    requests go through a token bucket. Each throttle cuts the rate by
+    `decrease_factor`, at most once per `decrease_cooldown` seconds so a burst
+    of concurrent throttles counts as one signal. Each success raises it by
+    `increase / rate`, which adds roughly `increase` requests/second per second
+    at full load. The bucket holds `burst` seconds' worth of tokens.
+    """
+
+    def __init__(self, min_rate=1.0, max_rate=None, increase=1.0, decrease_factor=0.5,
+                 decrease_cooldown=0.5, burst=0.25):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.burst = burst
+        self._bucket = None
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        # Send times over the last second, to seed the rate on the first throttle
+        self._recent_sends = deque()
+
+    @property
+    def rate(self):
+        """Current allowed requests per second (None while unlimited)."""
+        bucket = self._bucket
+        return bucket.rate if bucket else None
+
+    def acquire(self):
+        """Wait for permission to send one request. Returns the time waited."""
+        with self._lock:
+            bucket = self._bucket
+            if bucket is None:
+                now = time.monotonic()
+                self._recent_sends.append(now)
+                while now - self._recent_sends[0] > 1.0:
+                    self._recent_sends.popleft()
+        return bucket.acquire() if bucket else 0.0
+
+    def _set_rate(self, rate):
+        rate = max(self.min_rate, rate)
+        if self.max_rate:
+            rate = min(rate, self.max_rate)
+        capacity = max(1.0, rate * self.burst)
+        if self._bucket is None:
+            self._bucket = TokenBucket(rate, capacity=capacity)
+        else:
+            self._bucket.set_rate(rate, capacity=capacity)
+
+    def on_success(self):
+        with self._lock:
+            if self._bucket is None:
+                return
+            self._set_rate(self._bucket.rate + self.increase / self._bucket.rate)
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.decrease_cooldown:
+                return
+            self._last_decrease = now
+
+            if self._bucket is None:
+                current = len(self._recent_sends)
+                self._recent_sends.clear()
+            else:
+                current = self._bucket.rate
+            self._set_rate(current * self.decrease_factor)
+
+_table_limiters = {}
+_table_limiters_lock = threading.Lock()
+
+def get_table_rate_limiter(table_name, **limiter_options):
+    """Return the process-wide AdaptiveRateLimiter for a table, creating it on first use."""
+    with _table_limiters_lock:
+        limiter = _table_limiters.get(table_name)
+        if limiter is None:
+            limiter = _table_limiters[table_name] = AdaptiveRateLimiter(**limiter_options)
+        return limiter
+
+class RetryBudget:
+    """Cap retries at a fraction of request traffic.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, so in
+    steady state at most `ratio` retries are sent per request. A small reserve
+    of `min_retries_per_second` keeps low-traffic clients able to retry at all.
+    """
+
+    def __init__(self, ratio=0.1, min_retries_per_second=5, max_balance=100):
+        self.ratio = ratio
+        self.max_balance = max_balance
+        self._balance = 0.0
+        self._reserve = TokenBucket(min_retries_per_second) if min_retries_per_second else None
+        self._lock = threading.Lock()
+
+    def on_request(self):
+        with self._lock:
+            self._balance = min(self.max_balance, self._balance + self.ratio)
+
+    def can_retry(self):
+        """Withdraw one retry from the budget; return False when it is spent."""
+        with self._lock:
+            if self._balance >= 1:
+                self._balance -= 1
+                return True
+        return self._reserve is not None and self._reserve.try_acquire()
+
+class CircuitBreaker:
+    """Shed load while the throttle rate stays high.
+
+    The breaker opens when at least `min_requests` attempts were made in the
+    last `window` seconds, spanning at least `min_duration` seconds, and
+    `threshold` of them or more were throttled. While
+    open, requests fail fast with CircuitOpenError. After `reset_timeout`
+    seconds one probe request is let through (half-open). A successful probe
+    closes the circuit; a throttled probe opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold=0.5, window=10.0, min_requests=50, min_duration=2.0, reset_timeout=5.0):
+        self.threshold = threshold
+        self.window = window
+        self.min_requests = min_requests
+        self.min_duration = min_duration
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._outcomes = deque()  # (timestamp, throttled)
+        self._throttled = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Return whether a request may be sent now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, throttled):
+        """Record the outcome of one attempt."""
+        with self._lock:
+            now = time.monotonic()
+
+            if self.state == self.HALF_OPEN:
+                if throttled:
+                    self._open(now)
+                else:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                    self._throttled = 0
+                return
+
+            self._outcomes.append((now, throttled))
+            self._throttled += throttled
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._throttled -= self._outcomes.popleft()[1]
+
+            if (self.state == self.CLOSED
+                    and len(self._outcomes) >= self.min_requests
+                    and now - self._outcomes[0][0] >= self.min_duration
+                    and self._throttled / len(self._outcomes) >= self.threshold):
+                self._open(now)
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self._throttled = 0
+
+def _table_names(params):
+    """Tables targeted by a DynamoDB API call, from its parameters."""
+    if 'TableName' in params:
+        return [params['TableName']]
+    if 'RequestItems' in params:
+        return list(params['RequestItems'])
+    if 'TransactItems' in params:
+        return list({
+            action['TableName']
+            for item in params['TransactItems']
+            for action in item.values()
+            if 'TableName' in action
+        })
+    return []
+
+class RetryPolicy:
+    """Pluggable replacement for botocore's retry handler on a DynamoDB client.
+
+    attach() swaps the client's needs-retry handler for this policy and hooks
+    request creation, so every attempt (first try or retry) goes through:
+
+    - the circuit breaker, which fails fast while throttling stays high
+    - the adaptive per-table rate limiter, shared by every client in the process
+    - on failure, the retry budget and then a decorrelated-jitter backoff
+
+    One policy can be attached to several clients so they share budget, breaker
+    and statistics.
+    """
+
+    def __init__(self, max_attempts=10, base_delay=0.025, max_delay=20.0, adaptive=True,
+                 retry_budget=None, circuit_breaker=None, limiter_options=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.adaptive = adaptive
+        self.retry_budget = retry_budget
+        self.circuit_breaker = circuit_breaker
+        self.limiter_options = limiter_options or {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'attempts': 0,
+            'retries': 0,
+            'throttles': 0,
+            'budget_exhausted': 0,
+            'rejected': 0,
+            'backoff_time': 0.0,
+            'rate_limit_wait': 0.0
+        }
+
+    def attach(self, client):
+        """Install the policy on a DynamoDB client (resource users pass resource.meta.client)."""
+        service = client.meta.service_model.service_id.hyphenize()
+        events = client.meta.events
+        events.unregister(f'needs-retry.{service}', unique_id=f'retry-config-{service}')
+        events.register(f'before-parameter-build.{service}', self._capture_tables,
+                        unique_id=f'retry-policy-tables-{service}')
+        events.register(f'request-created.{service}', self._before_attempt,
+                        unique_id=f'retry-policy-attempt-{service}')
+        events.register(f'needs-retry.{service}', self._needs_retry,
+                        unique_id=f'retry-config-{service}')
+        return client
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.stats[name] += value
+
+    def _capture_tables(self, params, context, **kwargs):
+        context['retry_tables'] = _table_names(params)
+
+    def _before_attempt(self, request, **kwargs):
+        context = request.context
+        if context.get('retries', {}).get('attempt', 1) == 1:
+            self._count('requests')
+            if self.retry_budget:
+                self.retry_budget.on_request()
+
+        if self.circuit_breaker and not self.circuit_breaker.allow_request():
+            self._count('rejected')
+            raise CircuitOpenError("Circuit breaker is open: throttle rate too high, request shed")
+
+        self._count('attempts')
+        if self.adaptive:
+            waited = sum(
+                get_table_rate_limiter(table_name, **self.limiter_options).acquire()
+                for table_name in context.get('retry_tables', [])
+            )
+            if waited:
+                self._count('rate_limit_wait', waited)
+
+    def _needs_retry(self, response, attempts, caught_exception, request_dict, **kwargs):
+        context = request_dict['context']
+
+        if caught_exception is not None:
+            throttled, retryable = False, True
+        else:
+            http_response, parsed = response
+            code = parsed.get('Error', {}).get('Code')
+            throttled = code in THROTTLING_ERROR_CODES
+            retryable = throttled or code in TRANSIENT_ERROR_CODES or http_response.status_code >= 500
+
+        if throttled:
+            self._count('throttles')
+        if self.circuit_breaker:
+            self.circuit_breaker.record(throttled)
+        if self.adaptive:
+            for table_name in context.get('retry_tables', []):
+                limiter = get_table_rate_limiter(table_name, **self.limiter_options)
+                if throttled:
+                    limiter.on_throttle()
+                elif not retryable:
+                    limiter.on_success()
+
+        if not retryable or attempts >= self.max_attempts:
+            return None
+        if self.retry_budget and not self.retry_budget.can_retry():
+            self._count('budget_exhausted')
+            return None
+
+        delay = decorrelated_jitter(context.get('retry_delay', self.base_delay), self.base_delay, self.max_delay)
+        context['retry_delay'] = delay
+        self._count('retries')
+        self._count('backoff_time', delay)
+        return delay
+
+@lru_cache(maxsize=None)
+def get_default_retry_policy():
+    """Return the process-wide RetryPolicy from config.json, or None when it is disabled."""
+    settings = load_config().get('retry_policy', {})
+    if not settings.get('enabled'):
+        return None
+
+    retry_budget = None
+    if settings.get('retry_budget_ratio'):
+        retry_budget = RetryBudget(ratio=settings['retry_budget_ratio'])
+
+    circuit_breaker = None
+    if settings.get('circuit_breaker', True):
+        circuit_breaker = CircuitBreaker(threshold=settings.get('circuit_breaker_threshold', 0.5))
+
+    return RetryPolicy(
+        max_attempts=settings.get('max_attempts', 10),
+        adaptive=settings.get('adaptive', True),
+        retry_budget=retry_budget,
+        circuit_breaker=circuit_breaker
+    )
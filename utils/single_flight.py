@@ -0,0 +1,65 @@
+import copy
+import threading
+
+class _Call:
+    """An in-flight call whose result is shared with concurrent callers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into a single execution.
+
+    The first caller for a key runs the function. Callers that arrive while
+    it is still running wait for it and receive a copy of its result, or the
+    same exception. Once the call finishes, the next caller starts a new one.
+    Nothing is cached beyond the lifetime of the call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless an identical call is already in flight."""
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @property
+    def stats(self):
+        """Return how many calls ran and how many were served by another caller's request."""
+        with self._lock:
+            total = self.executions + self.shared
+            return {
+                'executions': self.executions,
+                'shared': self.shared,
+                'shared_rate': self.shared / total if total else 0.0
+            }